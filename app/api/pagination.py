@@ -0,0 +1,39 @@
+# app/api/pagination.py
+"""Opaque keyset cursors + Link headers shared by list endpoints."""
+import base64
+import json
+
+from fastapi import HTTPException, Request, Response
+
+
+def encode_cursor(values: dict) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *keys: str) -> dict:
+    """Decode a cursor produced by encode_cursor; 400 if it is malformed or lacks `keys`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, dict) or any(k not in values for k in keys):
+            raise ValueError
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def decode_id_cursor(cursor: str) -> int:
+    last_id = decode_cursor(cursor, "id")["id"]
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+
+def set_next_cursor(request: Request, response: Response, next_cursor: str | None) -> None:
+    """Expose the next page as `X-Next-Cursor` and an RFC 8288 `Link: <...>; rel="next"` header."""
+    if not next_cursor:
+        return
+    url = request.url.remove_query_params("offset").include_query_params(cursor=next_cursor)
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{url}>; rel="next"'
@@ -0,0 +1,169 @@
+# app/api/v1/note_queries.py
+"""
+Statement builders shared by the sync and async note routes.
+Everything here returns SQLAlchemy 2.0 `select()` objects so either a Session or an
+AsyncSession can execute them.
+"""
+from collections import defaultdict
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import aliased, load_only
+
+from app.api.pagination import encode_cursor, decode_cursor, decode_id_cursor
+from app.db import models
+from app.db.search import search_stmt
+from app.schemas.admin import UserWithNoteSummariesOut, UserWithNotesOut
+from app.schemas.note import NOTE_PREVIEW_CHARS, NoteOut, NoteStatus, NoteSummaryOut, NoteView
+from app.schemas.user import UserInfoOut
+
+CURSOR_DESCRIPTION = "Opaque cursor from the previous page's X-Next-Cursor/Link header (takes precedence over offset)"
+VIEW_DESCRIPTION = (
+    f"'summary' returns NoteSummaryOut: no raw_text, only its first {NOTE_PREVIEW_CHARS} characters as preview"
+)
+
+_SUMMARY_COLUMNS = ("id", "user_id", "summary", "status", "created_at", "updated_at")
+
+
+def summary_view(stmt):
+    """
+    view=summary: load only the list columns and a preview of raw_text cut by SQL substr(),
+    so raw_text bodies are neither fetched nor held in memory. Rows become (Note, preview).
+    """
+    columns = [getattr(models.Note, name) for name in _SUMMARY_COLUMNS]
+    preview = func.substr(models.Note.raw_text, 1, NOTE_PREVIEW_CHARS).label("preview")
+    return stmt.options(load_only(*columns, raiseload=True)).add_columns(preview)
+
+
+def summary_out(note: models.Note, preview: str) -> NoteSummaryOut:
+    return NoteSummaryOut(
+        id=note.id, preview=preview, summary=note.summary, status=note.status,
+        created_at=note.created_at, updated_at=note.updated_at,
+    )
+
+
+def notes_from(result, view: NoteView) -> list:
+    """Rows of a notes_stmt result: ORM notes, or NoteSummaryOut for view=summary."""
+    if view == "summary":
+        return [summary_out(note, preview) for note, preview in result.all()]
+    return result.scalars().all()
+
+
+def notes_stmt(*, user_id: Optional[int] = None, status: Optional[NoteStatus] = None, view: NoteView = "full"):
+    stmt = select(models.Note)
+    if user_id is not None:
+        stmt = stmt.where(models.Note.user_id == user_id)
+    if status is not None:
+        stmt = stmt.where(models.Note.status == status.value)
+    return summary_view(stmt) if view == "summary" else stmt
+
+
+def pending_notes_stmt(user_id: int, limit: int):
+    """The caller's queued/processing notes, sent as the initial snapshot of /notes/stream."""
+    return (
+        select(models.Note)
+        .where(
+            models.Note.user_id == user_id,
+            models.Note.status.in_([NoteStatus.queued.value, NoteStatus.processing.value]),
+        )
+        .order_by(models.Note.id.desc())
+        .limit(limit)
+    )
+
+
+def paginate(stmt, limit: int, offset: int, cursor: Optional[str]):
+    """Keyset pagination on id desc when a cursor is given; plain OFFSET otherwise (backward compatible)."""
+    if cursor:
+        stmt = stmt.where(models.Note.id < decode_id_cursor(cursor))
+    stmt = stmt.order_by(models.Note.id.desc()).limit(limit)
+    if not cursor:
+        stmt = stmt.offset(offset)
+    return stmt
+
+
+def next_cursor(items: list, limit: int) -> Optional[str]:
+    if len(items) < limit:
+        return None
+    return encode_cursor({"id": items[-1].id})
+
+
+# ---------- full-text search ----------
+def search_notes_stmt(
+    dialect_name: str, q: str, *, user_id: Optional[int], status: Optional[NoteStatus], limit: int, cursor: Optional[str]
+):
+    """Best matches first, keyset-paged on (score desc, id desc); rows are (Note, score)."""
+    matches = search_stmt(dialect_name, q)
+    if user_id is not None:
+        matches = matches.where(models.Note.user_id == user_id)
+    if status is not None:
+        matches = matches.where(models.Note.status == status.value)
+    ranked = matches.subquery()
+    note = aliased(models.Note, ranked)
+    stmt = select(note, ranked.c.score)
+    if cursor:
+        score, last_id = _decode_search_cursor(cursor)
+        stmt = stmt.where(or_(ranked.c.score < score, and_(ranked.c.score == score, ranked.c.id < last_id)))
+    return stmt.order_by(ranked.c.score.desc(), ranked.c.id.desc()).limit(limit)
+
+
+def _decode_search_cursor(cursor: str) -> tuple[float, int]:
+    values = decode_cursor(cursor, "score", "id")
+    score, last_id = values["score"], values["id"]
+    if not isinstance(score, (int, float)) or not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return float(score), last_id
+
+
+def search_next_cursor(rows: list, limit: int) -> Optional[str]:
+    if len(rows) < limit:
+        return None
+    note, score = rows[-1]
+    return encode_cursor({"score": score, "id": note.id})
+
+
+# ---------- ADMIN: grouped by user ----------
+def grouped_users_stmt(after_user_id: int, limit: int):
+    return (
+        select(models.User)
+        .where(models.User.id > after_user_id)
+        .order_by(models.User.id.asc())
+        .limit(limit)
+    )
+
+
+def grouped_notes_stmt(user_ids: list[int], notes_per_user: int, status: Optional[NoteStatus], view: NoteView = "full"):
+    """
+    Newest `notes_per_user` notes of each user in one windowed query (ROW_NUMBER per user_id).
+    The window only ranks ids; notes are joined back by primary key, so the sort never carries bodies.
+    """
+    rn = func.row_number().over(
+        partition_by=models.Note.user_id, order_by=models.Note.id.desc()
+    ).label("rn")
+    ranked = select(models.Note.id, rn).where(models.Note.user_id.in_(user_ids))
+    if status is not None:
+        ranked = ranked.where(models.Note.status == status.value)
+    ranked = ranked.subquery()
+    stmt = (
+        select(models.Note)
+        .join(ranked, ranked.c.id == models.Note.id)
+        .where(ranked.c.rn <= notes_per_user)
+        .order_by(models.Note.user_id.asc(), models.Note.id.desc())
+    )
+    return summary_view(stmt) if view == "summary" else stmt
+
+
+def build_grouped(
+    users: list[models.User], result, view: NoteView = "full"
+) -> List[UserWithNotesOut] | List[UserWithNoteSummariesOut]:
+    """Attach the rows of a grouped_notes_stmt result to their users."""
+    by_user: dict[int, list] = defaultdict(list)
+    if view == "summary":
+        for n, preview in result.all():
+            by_user[n.user_id].append(summary_out(n, preview))
+        group = UserWithNoteSummariesOut
+    else:
+        for n in result.scalars().all():
+            by_user[n.user_id].append(NoteOut.model_validate(n))
+        group = UserWithNotesOut
+    return [group(user=UserInfoOut.model_validate(u), notes=by_user.get(u.id, [])) for u in users]
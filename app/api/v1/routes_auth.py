@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from redis import Redis
@@ -6,35 +7,55 @@ from datetime import datetime, timezone
 
 from app.schemas.user import UserCreate, UserOut, TokenOut
 from app.db import models
-from app.auth.hashing import hash_password, verify_password
+from app.auth.hashing import hash_password_async, verify_and_update_async
 from app.auth.jwt import create_access_token, decode_token
+from app.auth.revocation import revoke_token
 from app.auth.dependencies import bearer_scheme, get_db, get_current_user
+from app.auth.user_cache import CurrentUser
 from app.deps import get_redis
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _user_by_email(db: Session, email: str) -> models.User | None:
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def _add_user(db: Session, user: models.User) -> models.User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def _commit(db: Session) -> None:
+    db.commit()
+
+# signup/login are async so a request waiting on bcrypt holds no threadpool thread;
+# only the short DB calls go through run_in_threadpool.
 @router.post("/signup", response_model=UserOut, status_code=201)
-def signup(payload: UserCreate, db: Session = Depends(get_db)):
+async def signup(payload: UserCreate, db: Session = Depends(get_db)):
     
-    exists = db.query(models.User).filter(models.User.email == payload.email).first()
+    exists = await run_in_threadpool(_user_by_email, db, payload.email)
     if exists:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = models.User(
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password_async(payload.password),
         role=models.UserRole.AGENT.value,  # default role
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return await run_in_threadpool(_add_user, db, user)
 
 @router.post("/login", response_model=TokenOut)
-def login(payload: UserCreate, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: UserCreate, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_user_by_email, db, payload.email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    ok, new_hash = await verify_and_update_async(payload.password, user.password_hash)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # stored hash predates the current BCRYPT_ROUNDS
+        user.password_hash = new_hash
+        await run_in_threadpool(_commit, db)
 
     token, jti, ttl = create_access_token(sub=str(user.id), ver=user.token_version)
     return TokenOut(access_token=token)
@@ -58,10 +79,10 @@ def logout(
     now = int(datetime.now(timezone.utc).timestamp())
     ttl = max(exp - now, 0)
     if ttl > 0:
-        r.setex(f"revoked:{jti}", ttl, "1")
+        revoke_token(r, jti, exp, ttl)
 
     return {"detail": "Logged out"}
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: models.User = Depends(get_current_user)):
+def me(current_user: CurrentUser = Depends(get_current_user)):
     return current_user
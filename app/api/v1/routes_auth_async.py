@@ -0,0 +1,80 @@
+# app/api/v1/routes_auth_async.py
+"""Async twin of routes_auth (DB_ASYNC=1). Same paths, schemas and behavior."""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from redis.asyncio import Redis as AsyncRedis
+from datetime import datetime, timezone
+
+from app.schemas.user import UserCreate, UserOut, TokenOut
+from app.db import models
+from app.auth.hashing import hash_password_async, verify_and_update_async
+from app.auth.jwt import create_access_token, decode_token
+from app.auth.revocation import revoke_token_async
+from app.auth.dependencies import bearer_scheme, get_async_db, get_current_user_async
+from app.auth.user_cache import CurrentUser
+from app.deps import get_redis_async
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+@router.post("/signup", response_model=UserOut, status_code=201)
+async def signup(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    exists = (await db.scalars(select(models.User).where(models.User.email == payload.email))).first()
+    if exists:
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    # bcrypt runs in the dedicated hashing pool, off the event loop
+    password_hash = await hash_password_async(payload.password)
+    user = models.User(
+        email=payload.email,
+        password_hash=password_hash,
+        role=models.UserRole.AGENT.value,  # default role
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+@router.post("/login", response_model=TokenOut)
+async def login(payload: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.scalars(select(models.User).where(models.User.email == payload.email))).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    ok, new_hash = await verify_and_update_async(payload.password, user.password_hash)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # stored hash predates the current BCRYPT_ROUNDS
+        user.password_hash = new_hash
+        await db.commit()
+
+    token, jti, ttl = create_access_token(sub=str(user.id), ver=user.token_version)
+    return TokenOut(access_token=token)
+
+@router.post("/logout")
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    r: AsyncRedis = Depends(get_redis_async),
+):
+    token = credentials.credentials
+    try:
+        payload = decode_token(token)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+
+    jti = payload.get("jti")
+    exp = payload.get("exp")
+    if not jti or not exp:
+        raise HTTPException(status_code=400, detail="Malformed token")
+
+    now = int(datetime.now(timezone.utc).timestamp())
+    ttl = max(exp - now, 0)
+    if ttl > 0:
+        await revoke_token_async(r, jti, exp, ttl)
+
+    return {"detail": "Logged out"}
+
+@router.get("/me", response_model=UserOut)
+async def me(current_user: CurrentUser = Depends(get_current_user_async)):
+    return current_user
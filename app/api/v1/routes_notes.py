@@ -1,20 +1,37 @@
 # app/api/v1/routes_notes.py
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from typing import Iterator, List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from redis import Redis
-from rq import Queue
-from app.worker_jobs import summarize_note_job
 
-
-
-from app.schemas.note import NoteCreate, NoteOut, NoteStatus
-from app.schemas.admin import UserWithNotesOut
-from app.schemas.user import UserInfoOut
+from app.schemas.note import NoteBulkCreate, NoteCreate, NoteEvent, NoteOut, NoteStatus, NoteSummaryOut, NoteView
+from app.schemas.admin import UserWithNoteSummariesOut, UserWithNotesOut
 from app.db import models
+from app.db.session import SessionLocal
+from app.api.pagination import encode_cursor, decode_id_cursor, set_next_cursor
+from app.api.v1.note_queries import (
+    CURSOR_DESCRIPTION,
+    VIEW_DESCRIPTION,
+    build_grouped,
+    grouped_notes_stmt,
+    grouped_users_stmt,
+    next_cursor,
+    notes_from,
+    notes_stmt,
+    paginate,
+    pending_notes_stmt,
+    search_next_cursor,
+    search_notes_stmt,
+)
 from app.auth.dependencies import get_db, get_current_user, require_admin
+from app.auth.user_cache import CurrentUser
 from app.deps import get_redis
 from app.config import settings
+from app.jobs import BULK, enqueue_summaries
+from app.services.note_events import stream_note_events
+from app.services.notes import create_note_idempotent, create_notes_bulk
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
@@ -23,99 +40,182 @@ router = APIRouter(prefix="/notes", tags=["notes"])
 def create_note(
     payload: NoteCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     r: Redis = Depends(get_redis),
     idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
 ):
-    # Idempotency: reuse existing for same user+key
-    if idempotency_key:
-        existing = (
-            db.query(models.Note)
-            .filter(
-                models.Note.user_id == current_user.id,
-                models.Note.idempotency_key == idempotency_key,
-            )
-            .first()
-        )
-        if existing:
-            return existing
-
-    note = models.Note(
-        user_id=current_user.id,
-        raw_text=payload.raw_text,
-        status=models.NoteStatus.queued.value,
-        idempotency_key=idempotency_key,
-    )
-    db.add(note)
-    db.commit()
-    db.refresh(note)
-
-    # Enqueue background job
-    q = Queue("notes_summarize", connection=r)       
-    q.enqueue(summarize_note_job, note.id, job_timeout=600)
+    # Single INSERT ... ON CONFLICT DO NOTHING RETURNING: concurrent requests with the
+    # same key all get the same note, and only the request that created it enqueues.
+    note, created = create_note_idempotent(db, current_user.id, payload.raw_text, idempotency_key)
+    if created:
+        enqueue_summaries(r, [note.id])
     return note
 
 
+@router.post("/bulk", response_model=List[NoteOut])
+def bulk_create_notes(
+    payload: NoteBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    r: Redis = Depends(get_redis),
+):
+    """
+    Create up to BULK_MAX_ITEMS notes in one transaction: one query resolves existing
+    idempotency keys, multi-row INSERT ... RETURNING writes the rest, and all jobs
+    go into the outbox in the same transaction (one Redis pipeline with OUTBOX_ENABLED=0).
+    Returns one note per item, in order.
+    """
+    notes, created_ids = create_notes_bulk(db, current_user.id, payload.items)
+    enqueue_summaries(r, created_ids, lane=BULK, user_id=current_user.id)
+    return notes
+
+
 # ---------- LIST (current user only, regardless of role) ----------
-@router.get("", response_model=List[NoteOut])
+@router.get("", response_model=Union[List[NoteOut], List[NoteSummaryOut]])
 def list_my_notes(
+    request: Request,
+    response: Response,
     status: Optional[NoteStatus] = Query(default=None, description="Filter by status"),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    view: NoteView = Query(default="full", description=VIEW_DESCRIPTION),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
-    q = db.query(models.Note).filter(models.Note.user_id == current_user.id)
-    if status is not None:
-        q = q.filter(models.Note.status == status.value)
-    return q.order_by(models.Note.id.desc()).limit(limit).offset(offset).all()
+    stmt = notes_stmt(user_id=current_user.id, status=status, view=view)
+    items = notes_from(db.execute(paginate(stmt, limit, offset, cursor)), view)
+    set_next_cursor(request, response, next_cursor(items, limit))
+    return items
 
 
 # ---------- ADMIN: grouped by user ----------
-@router.get("/grouped-by-user", response_model=List[UserWithNotesOut])
+def _grouped_page(
+    db: Session, after_user_id: int, limit: int, notes_per_user: int, status: Optional[NoteStatus], view: NoteView
+) -> List[UserWithNotesOut] | List[UserWithNoteSummariesOut]:
+    users = db.scalars(grouped_users_stmt(after_user_id, limit)).all()
+    if not users:
+        return []
+    result = db.execute(grouped_notes_stmt([u.id for u in users], notes_per_user, status, view))
+    return build_grouped(users, result, view)
+
+
+def _stream_grouped_ndjson(
+    after_user_id: int, limit: int, notes_per_user: int, status: Optional[NoteStatus], view: NoteView
+) -> Iterator[str]:
+    """
+    Walk every user page by page and emit one JSON line per user.
+    Uses its own session (the request one is closed once streaming starts) and
+    drops ORM state after each page, so memory is bounded by limit * notes_per_user.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            page = _grouped_page(db, after_user_id, limit, notes_per_user, status, view)
+            db.expunge_all()
+            if not page:
+                return
+            for item in page:
+                yield item.model_dump_json() + "\n"
+            after_user_id = page[-1].user.id
+    finally:
+        db.close()
+
+
+@router.get("/grouped-by-user", response_model=Union[List[UserWithNotesOut], List[UserWithNoteSummariesOut]])
 def list_grouped_by_user_admin(
+    request: Request,
+    response: Response,
     status: Optional[NoteStatus] = Query(default=None, description="Optional status filter"),
+    limit: int = Query(50, ge=1, le=500, description="Users per page"),
+    notes_per_user: int = Query(50, ge=1, le=500, description="Newest N notes returned per user"),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's X-Next-Cursor/Link header"),
+    format: Literal["json", "ndjson"] = Query(
+        default="json", description="'ndjson' streams every user from the cursor onward, one JSON object per line"
+    ),
+    view: NoteView = Query(default="full", description=VIEW_DESCRIPTION),
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: CurrentUser = Depends(require_admin),
 ):
-    # Load all users
-    users = db.query(models.User).order_by(models.User.id.asc()).all()
-    if not users:
-        return []
-
-    # Load notes (optionally filtered), then group in memory
-    qn = db.query(models.Note)
-    if status is not None:
-        qn = qn.filter(models.Note.status == status.value)
-    notes = qn.order_by(models.Note.id.desc()).all()
+    after_user_id = decode_id_cursor(cursor) if cursor else 0
 
-    from collections import defaultdict
-    by_user: dict[int, list[models.Note]] = defaultdict(list)
-    for n in notes:
-        by_user[n.user_id].append(n)
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_grouped_ndjson(after_user_id, limit, notes_per_user, status, view),
+            media_type="application/x-ndjson",
+        )
 
-    # Build response
-    out: List[UserWithNotesOut] = []
-    for u in users:
-        uinfo = UserInfoOut.model_validate(u)
-        u_notes = [NoteOut.model_validate(n) for n in by_user.get(u.id, [])]
-        out.append(UserWithNotesOut(user=uinfo, notes=u_notes))
-    return out
+    page = _grouped_page(db, after_user_id, limit, notes_per_user, status, view)
+    if len(page) == limit:
+        set_next_cursor(request, response, encode_cursor({"id": page[-1].user.id}))
+    return page
 
 
 # ---------- ADMIN: all notes (flat list, optional) ----------
-@router.get("/all", response_model=List[NoteOut])
+@router.get("/all", response_model=Union[List[NoteOut], List[NoteSummaryOut]])
 def list_all_notes_admin(
+    request: Request,
+    response: Response,
     status: Optional[NoteStatus] = Query(default=None, description="Filter by status"),
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    view: NoteView = Query(default="full", description=VIEW_DESCRIPTION),
     db: Session = Depends(get_db),
-    _: models.User = Depends(require_admin),
+    _: CurrentUser = Depends(require_admin),
 ):
-    q = db.query(models.Note)
-    if status is not None:
-        q = q.filter(models.Note.status == status.value)
-    return q.order_by(models.Note.id.desc()).limit(limit).offset(offset).all()
+    stmt = notes_stmt(status=status, view=view)
+    items = notes_from(db.execute(paginate(stmt, limit, offset, cursor)), view)
+    set_next_cursor(request, response, next_cursor(items, limit))
+    return items
+
+
+# ---------- SEARCH (own notes; admins search everyone's) ----------
+@router.get("/search", response_model=List[NoteOut])
+def search_notes(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to match in the text or summary"),
+    status: Optional[NoteStatus] = Query(default=None, description="Filter by status"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Full-text search, best match first (Postgres tsvector + GIN, SQLite FTS5).
+    Full pages return the next page in X-Next-Cursor / Link, keyed on (rank, id).
+    """
+    owner = None if current_user.role == models.UserRole.ADMIN.value else current_user.id
+    stmt = search_notes_stmt(db.get_bind().dialect.name, q, user_id=owner, status=status, limit=limit, cursor=cursor)
+    rows = db.execute(stmt).all()
+    set_next_cursor(request, response, search_next_cursor(rows, limit))
+    return [note for note, _score in rows]
+
+
+# ---------- STATUS PUSH (SSE) ----------
+def _pending_events(user_id: int) -> List[NoteEvent]:
+    db = SessionLocal()
+    try:
+        notes = db.scalars(pending_notes_stmt(user_id, settings.sse_snapshot_limit)).all()
+        return [NoteEvent.model_validate(n) for n in notes]
+    finally:
+        db.close()
+
+
+@router.get("/stream", response_class=StreamingResponse)
+def stream_my_notes(current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Server-Sent Events: one `note` event (NoteEvent JSON) per status change of the
+    caller's notes. Starts with a snapshot of queued/processing notes; idle periods
+    carry `: keepalive` comments. Replaces polling GET /notes/{id}.
+    """
+    user_id = current_user.id
+    return StreamingResponse(
+        stream_note_events(user_id, lambda: run_in_threadpool(_pending_events, user_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ---------- GET BY ID ----------
@@ -123,7 +223,7 @@ def list_all_notes_admin(
 def get_note(
     note_id: int,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     note = db.get(models.Note, note_id)
     if not note:
@@ -0,0 +1,216 @@
+# app/api/v1/routes_notes_async.py
+"""Async twin of routes_notes (DB_ASYNC=1). Queries come from note_queries, shared with the sync routes."""
+from typing import AsyncIterator, List, Literal, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from redis import Redis
+
+from app.schemas.note import NoteBulkCreate, NoteCreate, NoteEvent, NoteOut, NoteStatus, NoteSummaryOut, NoteView
+from app.schemas.admin import UserWithNoteSummariesOut, UserWithNotesOut
+from app.db import models
+from app.db import session as db_session
+from app.api.pagination import encode_cursor, decode_id_cursor, set_next_cursor
+from app.api.v1.note_queries import (
+    CURSOR_DESCRIPTION,
+    VIEW_DESCRIPTION,
+    build_grouped,
+    grouped_notes_stmt,
+    grouped_users_stmt,
+    next_cursor,
+    notes_from,
+    notes_stmt,
+    paginate,
+    pending_notes_stmt,
+    search_next_cursor,
+    search_notes_stmt,
+)
+from app.auth.dependencies import get_async_db, get_current_user_async, require_admin_async
+from app.auth.user_cache import CurrentUser
+from app.deps import get_redis
+from app.config import settings
+from app.jobs import BULK, enqueue_summaries
+from app.services.note_events import stream_note_events
+from app.services.notes import create_note_idempotent_async, create_notes_bulk_async
+
+router = APIRouter(prefix="/notes", tags=["notes"])
+
+
+@router.post("", response_model=NoteOut)
+async def create_note(
+    payload: NoteCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async),
+    r: Redis = Depends(get_redis),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    note, created = await create_note_idempotent_async(db, current_user.id, payload.raw_text, idempotency_key)
+    if created:
+        # RQ only speaks sync Redis; run the enqueue in the threadpool
+        await run_in_threadpool(enqueue_summaries, r, [note.id])
+    return note
+
+
+@router.post("/bulk", response_model=List[NoteOut])
+async def bulk_create_notes(
+    payload: NoteBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async),
+    r: Redis = Depends(get_redis),
+):
+    """
+    Create up to BULK_MAX_ITEMS notes in one transaction: one query resolves existing
+    idempotency keys, multi-row INSERT ... RETURNING writes the rest, and all jobs
+    go into the outbox in the same transaction (one Redis pipeline with OUTBOX_ENABLED=0).
+    Returns one note per item, in order.
+    """
+    notes, created_ids = await create_notes_bulk_async(db, current_user.id, payload.items)
+    await run_in_threadpool(enqueue_summaries, r, created_ids, lane=BULK, user_id=current_user.id)
+    return notes
+
+
+# ---------- LIST (current user only, regardless of role) ----------
+@router.get("", response_model=Union[List[NoteOut], List[NoteSummaryOut]])
+async def list_my_notes(
+    request: Request,
+    response: Response,
+    status: Optional[NoteStatus] = Query(default=None, description="Filter by status"),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    view: NoteView = Query(default="full", description=VIEW_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async),
+):
+    stmt = notes_stmt(user_id=current_user.id, status=status, view=view)
+    items = notes_from(await db.execute(paginate(stmt, limit, offset, cursor)), view)
+    set_next_cursor(request, response, next_cursor(items, limit))
+    return items
+
+
+# ---------- ADMIN: grouped by user ----------
+async def _grouped_page(
+    db: AsyncSession, after_user_id: int, limit: int, notes_per_user: int, status: Optional[NoteStatus], view: NoteView
+) -> List[UserWithNotesOut] | List[UserWithNoteSummariesOut]:
+    users = (await db.scalars(grouped_users_stmt(after_user_id, limit))).all()
+    if not users:
+        return []
+    result = await db.execute(grouped_notes_stmt([u.id for u in users], notes_per_user, status, view))
+    return build_grouped(users, result, view)
+
+
+async def _stream_grouped_ndjson(
+    after_user_id: int, limit: int, notes_per_user: int, status: Optional[NoteStatus], view: NoteView
+) -> AsyncIterator[str]:
+    """Async version of the sync NDJSON export: own session, ORM state dropped per page."""
+    async with db_session.AsyncSessionLocal() as db:
+        while True:
+            page = await _grouped_page(db, after_user_id, limit, notes_per_user, status, view)
+            db.expunge_all()
+            if not page:
+                return
+            for item in page:
+                yield item.model_dump_json() + "\n"
+            after_user_id = page[-1].user.id
+
+
+@router.get("/grouped-by-user", response_model=Union[List[UserWithNotesOut], List[UserWithNoteSummariesOut]])
+async def list_grouped_by_user_admin(
+    request: Request,
+    response: Response,
+    status: Optional[NoteStatus] = Query(default=None, description="Optional status filter"),
+    limit: int = Query(50, ge=1, le=500, description="Users per page"),
+    notes_per_user: int = Query(50, ge=1, le=500, description="Newest N notes returned per user"),
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from the previous page's X-Next-Cursor/Link header"),
+    format: Literal["json", "ndjson"] = Query(
+        default="json", description="'ndjson' streams every user from the cursor onward, one JSON object per line"
+    ),
+    view: NoteView = Query(default="full", description=VIEW_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+    _: CurrentUser = Depends(require_admin_async),
+):
+    after_user_id = decode_id_cursor(cursor) if cursor else 0
+
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_grouped_ndjson(after_user_id, limit, notes_per_user, status, view),
+            media_type="application/x-ndjson",
+        )
+
+    page = await _grouped_page(db, after_user_id, limit, notes_per_user, status, view)
+    if len(page) == limit:
+        set_next_cursor(request, response, encode_cursor({"id": page[-1].user.id}))
+    return page
+
+
+# ---------- ADMIN: all notes (flat list, optional) ----------
+@router.get("/all", response_model=Union[List[NoteOut], List[NoteSummaryOut]])
+async def list_all_notes_admin(
+    request: Request,
+    response: Response,
+    status: Optional[NoteStatus] = Query(default=None, description="Filter by status"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    view: NoteView = Query(default="full", description=VIEW_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+    _: CurrentUser = Depends(require_admin_async),
+):
+    stmt = notes_stmt(status=status, view=view)
+    items = notes_from(await db.execute(paginate(stmt, limit, offset, cursor)), view)
+    set_next_cursor(request, response, next_cursor(items, limit))
+    return items
+
+
+# ---------- SEARCH (own notes; admins search everyone's) ----------
+@router.get("/search", response_model=List[NoteOut])
+async def search_notes(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to match in the text or summary"),
+    status: Optional[NoteStatus] = Query(default=None, description="Filter by status"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async),
+):
+    owner = None if current_user.role == models.UserRole.ADMIN.value else current_user.id
+    stmt = search_notes_stmt(db.get_bind().dialect.name, q, user_id=owner, status=status, limit=limit, cursor=cursor)
+    rows = (await db.execute(stmt)).all()
+    set_next_cursor(request, response, search_next_cursor(rows, limit))
+    return [note for note, _score in rows]
+
+
+# ---------- STATUS PUSH (SSE) ----------
+async def _pending_events(user_id: int) -> List[NoteEvent]:
+    async with db_session.AsyncSessionLocal() as db:
+        notes = (await db.scalars(pending_notes_stmt(user_id, settings.sse_snapshot_limit))).all()
+        return [NoteEvent.model_validate(n) for n in notes]
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_my_notes(current_user: CurrentUser = Depends(get_current_user_async)):
+    """Server-Sent Events for the caller's notes; see the sync route for the protocol."""
+    user_id = current_user.id
+    return StreamingResponse(
+        stream_note_events(user_id, lambda: _pending_events(user_id)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ---------- GET BY ID ----------
+@router.get("/{note_id:int}", response_model=NoteOut)
+async def get_note(
+    note_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_user_async),
+):
+    note = await db.get(models.Note, note_id)
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    # tenancy: AGENT can only access own
+    if current_user.role != models.UserRole.ADMIN.value and note.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return note
@@ -0,0 +1,51 @@
+# app/api/v1/routes_profiles.py
+"""Admin access to stored request/job profiles (see app/profiling.py). Redis only, so one router serves both DB modes."""
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+from redis.asyncio import Redis as AsyncRedis
+
+from app.config import settings
+from app.auth.dependencies import require_admin, require_admin_async
+from app.auth.user_cache import CurrentUser
+from app.deps import get_redis_async
+from app.profiling import arm_job_profiling, get_profile_data, list_profiles
+from app.schemas.admin import ArmJobProfilingIn, ArmJobProfilingOut, ProfileInfo
+
+router = APIRouter(prefix="/admin/profiles", tags=["admin"])
+
+_admin = require_admin_async if settings.db_async else require_admin
+
+@router.get("", response_model=List[ProfileInfo])
+async def list_stored_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    r: AsyncRedis = Depends(get_redis_async),
+    _: CurrentUser = Depends(_admin),
+):
+    """Newest first."""
+    return await list_profiles(r, limit)
+
+@router.post("/jobs", response_model=ArmJobProfilingOut)
+async def profile_next_jobs(
+    payload: ArmJobProfilingIn,
+    r: AsyncRedis = Depends(get_redis_async),
+    _: CurrentUser = Depends(_admin),
+):
+    """Profile the next `count` summarize jobs, whichever worker picks them up."""
+    return {"armed": await arm_job_profiling(r, payload.count)}
+
+@router.get("/{profile_id}")
+async def get_stored_profile(
+    profile_id: str,
+    r: AsyncRedis = Depends(get_redis_async),
+    _: CurrentUser = Depends(_admin),
+):
+    """Speedscope JSON; drop it on https://www.speedscope.app."""
+    data = await get_profile_data(r, profile_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=data,
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.speedscope.json"'},
+    )
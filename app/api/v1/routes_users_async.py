@@ -0,0 +1,20 @@
+# app/api/v1/routes_users_async.py
+"""Async twin of routes_users (DB_ASYNC=1)."""
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.user import UserInfoOut
+from app.db import models
+from app.auth.dependencies import get_async_db, require_admin_async
+from app.auth.user_cache import CurrentUser
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+@router.get("", response_model=List[UserInfoOut])
+async def list_users(
+    db: AsyncSession = Depends(get_async_db),
+    _: CurrentUser = Depends(require_admin_async),
+):
+    return (await db.scalars(select(models.User).order_by(models.User.id.asc()))).all()
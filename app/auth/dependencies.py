@@ -3,12 +3,18 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 bearer_scheme = HTTPBearer(auto_error=True)
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
 
+from app.db import session as db_session
 from app.db.session import SessionLocal
 from app.db import models
 from app.auth.jwt import decode_token
-from app.deps import get_redis
+from app.auth.user_cache import CurrentUser, user_cache
+from app.auth.revocation import revocation_filter, revoked_key
+from app.deps import get_redis, get_redis_async
 
 
 def get_db():
@@ -20,6 +26,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Provide an AsyncSession per request (DB_ASYNC=1)."""
+    async with db_session.AsyncSessionLocal() as db:
+        yield db
+
+
 def _raise_401(detail: str = "Unauthorized"):
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -28,12 +40,8 @@ def _raise_401(detail: str = "Unauthorized"):
     )
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
-    r: Redis = Depends(get_redis),
-) -> models.User:
-    token = credentials.credentials
+def _decode_claims(token: str) -> tuple[str, int, int]:
+    """Validate the token and return (jti, user_id, token_version)."""
     try:
         payload = decode_token(token)
     except Exception:
@@ -44,25 +52,96 @@ def get_current_user(
     ver = payload.get("ver")
     if not jti or sub is None or ver is None:
         _raise_401("Malformed token")
+    return jti, int(sub), int(ver)
 
-    # Safely check blacklist
-    try:
-        if r.exists(f"revoked:{jti}"):
-            _raise_401("Token revoked")
-    except RedisError:
-        # If Redis is briefly unavailable, treat it as not revoked
-        pass
 
-    user = db.get(models.User, int(sub))
+def _check_user(user: CurrentUser | None, ver: int) -> CurrentUser:
     if not user:
         _raise_401("User not found")
 
-    if user.token_version != int(ver):
+    if user.token_version != ver:
         _raise_401("Token outdated")
 
     return user
 
-def require_admin(user: models.User = Depends(get_current_user)) -> models.User:
+
+def _load_user(user: models.User | None) -> CurrentUser | None:
+    if user is None:
+        return None
+    cached = CurrentUser.from_model(user)
+    user_cache.put(cached)
+    return cached
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+    r: Redis = Depends(get_redis),
+) -> CurrentUser:
+    jti, user_id, ver = _decode_claims(credentials.credentials)
+
+    # Safely check blacklist; the local filter answers "definitely not revoked" without I/O
+    if revocation_filter.might_be_revoked(jti):
+        try:
+            if r.exists(revoked_key(jti)):
+                _raise_401("Token revoked")
+        except RedisError:
+            # If Redis is briefly unavailable, treat it as not revoked
+            pass
+
+    # Cache hit = no DB round trip. A version mismatch may just mean the entry is
+    # stale (invalidation still in flight), so confirm against the DB before rejecting.
+    user = user_cache.get(user_id)
+    if user is None or user.token_version != ver:
+        user = _load_user(db.get(models.User, user_id))
+    return _check_user(user, ver)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    r: AsyncRedis = Depends(get_redis_async),
+) -> CurrentUser:
+    jti, user_id, ver = _decode_claims(credentials.credentials)
+
+    if revocation_filter.might_be_revoked(jti):
+        try:
+            if await r.exists(revoked_key(jti)):
+                _raise_401("Token revoked")
+        except RedisError:
+            pass
+
+    user = user_cache.get(user_id)
+    if user is None or user.token_version != ver:
+        user = _load_user(await db.get(models.User, user_id))
+    return _check_user(user, ver)
+
+def require_admin(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if user.role != models.UserRole.ADMIN.value:
+        raise HTTPException(status_code=403, detail="Admin required")
+    return user
+
+def admin_from_token(token: str) -> CurrentUser | None:
+    """require_admin for code outside dependency injection (e.g. middleware); None unless an admin."""
+    try:
+        jti, user_id, ver = _decode_claims(token)
+    except HTTPException:
+        return None
+    if revocation_filter.might_be_revoked(jti):
+        try:
+            if get_redis().exists(revoked_key(jti)):
+                return None
+        except RedisError:
+            pass
+    user = user_cache.get(user_id)
+    if user is None or user.token_version != ver:
+        with SessionLocal() as db:
+            user = _load_user(db.get(models.User, user_id))
+    if user is None or user.token_version != ver or user.role != models.UserRole.ADMIN.value:
+        return None
+    return user
+
+async def require_admin_async(user: CurrentUser = Depends(get_current_user_async)) -> CurrentUser:
     if user.role != models.UserRole.ADMIN.value:
         raise HTTPException(status_code=403, detail="Admin required")
     return user
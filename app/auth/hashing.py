@@ -1,11 +1,62 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
-_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.config import settings
+
+# Pinning min/max to the configured cost makes needs_update() flag any hash made
+# with a different cost, so logins transparently rehash after BCRYPT_ROUNDS changes.
+_pwd = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+
+# bcrypt releases the GIL, so a dedicated thread pool gives real parallelism while
+# keeping password work from draining the threadpool that serves every other request.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_workers, thread_name_prefix="pwhash"
+)
+_slots = threading.BoundedSemaphore(settings.password_hash_workers + settings.password_hash_queue_depth)
+
+
+class PasswordHasherBusy(Exception):
+    """All hashing workers are busy and the wait queue is full; surfaced as 503 + Retry-After."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing capacity exhausted")
+        self.retry_after = retry_after
+
+
+def _submit(fn, *args) -> Future:
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy(settings.password_hash_retry_after_seconds)
+    try:
+        fut = _executor.submit(fn, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    fut.add_done_callback(lambda _: _slots.release())
+    return fut
 
 def hash_password(password: str) -> str:
     """One-way hash for storing in DB."""
-    return _pwd.hash(password)
+    return _submit(_pwd.hash, password).result()
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Verify a plaintext password against the stored hash."""
-    return _pwd.verify(plain, hashed)
+    return _submit(_pwd.verify, plain, hashed).result()
+
+def verify_and_update(plain: str, hashed: str) -> tuple[bool, str | None]:
+    """Verify and, if the stored hash uses outdated parameters, return a replacement hash."""
+    return _submit(_pwd.verify_and_update, plain, hashed).result()
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_pwd.hash, password))
+
+async def verify_and_update_async(plain: str, hashed: str) -> tuple[bool, str | None]:
+    return await asyncio.wrap_future(_submit(_pwd.verify_and_update, plain, hashed))
@@ -0,0 +1,172 @@
+# app/auth/revocation.py
+"""
+Local probabilistic filter of revoked JTIs.
+
+Only a tiny fraction of tokens is ever revoked, so instead of asking Redis about every
+request, each API process keeps Bloom filters of revoked JTIs and asks Redis only when
+the filter reports a possible hit. Filters are bucketed by token `exp`, so a bucket is
+dropped as soon as every token in it has expired anyway and memory stays bounded.
+
+Sync: /auth/logout appends (jti, exp) to the `auth:revoked` Redis stream; a background
+thread per process replays the stream at startup and then tails it. Until that replay
+finishes (or while disconnected) the filter reports "maybe" for everything, i.e. every
+request falls back to the Redis EXISTS check, which is the pre-filter behavior.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from typing import Callable
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.deps import get_redis
+
+log = logging.getLogger(__name__)
+
+REVOKED_STREAM = "auth:revoked"
+
+
+def revoked_key(jti: str) -> str:
+    return f"revoked:{jti}"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationFilter:
+    def __init__(self, *, capacity: int, error_rate: float, bucket_seconds: int):
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._bucket_seconds = bucket_seconds
+        self._buckets: dict[int, BloomFilter] = {}
+        self._lock = threading.Lock()
+        self.ready = False  # True once the stream has been replayed and is being tailed
+
+    def add(self, jti: str, exp: int) -> None:
+        bucket = int(exp) // self._bucket_seconds
+        with self._lock:
+            bf = self._buckets.get(bucket)
+            if bf is None:
+                bf = self._buckets[bucket] = BloomFilter(self._capacity, self._error_rate)
+            bf.add(jti)
+
+    def prune(self, now: float | None = None) -> None:
+        """Drop buckets whose tokens have all expired."""
+        current = int(now if now is not None else time.time()) // self._bucket_seconds
+        with self._lock:
+            for bucket in [b for b in self._buckets if b < current]:
+                del self._buckets[bucket]
+
+    def might_be_revoked(self, jti: str) -> bool:
+        if not self.ready:
+            return True
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return any(jti in bf for bf in buckets)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"ready": self.ready, "buckets": len(self._buckets)}
+
+
+revocation_filter = RevocationFilter(
+    capacity=settings.revocation_filter_capacity,
+    error_rate=settings.revocation_filter_error_rate,
+    bucket_seconds=settings.revocation_filter_bucket_seconds,
+)
+
+
+# ---- Publishing (logout) ----
+def _stream_minid() -> str:
+    # Entries older than the longest possible token lifetime can never matter again.
+    cutoff_ms = int((time.time() - settings.access_token_expire_minutes * 60) * 1000)
+    return f"{max(cutoff_ms, 0)}-0"
+
+
+def revoke_token(r: Redis, jti: str, exp: int, ttl: int) -> None:
+    with r.pipeline() as pipe:
+        pipe.setex(revoked_key(jti), ttl, "1")
+        pipe.xadd(REVOKED_STREAM, {"jti": jti, "exp": exp}, minid=_stream_minid(), approximate=True)
+        pipe.execute()
+    revocation_filter.add(jti, exp)
+
+
+async def revoke_token_async(r: AsyncRedis, jti: str, exp: int, ttl: int) -> None:
+    async with r.pipeline() as pipe:
+        pipe.setex(revoked_key(jti), ttl, "1")
+        pipe.xadd(REVOKED_STREAM, {"jti": jti, "exp": exp}, minid=_stream_minid(), approximate=True)
+        await pipe.execute()
+    revocation_filter.add(jti, exp)
+
+
+# ---- Sync thread ----
+def _apply(entries) -> str | None:
+    last_id = None
+    for entry_id, fields in entries:
+        last_id = entry_id
+        try:
+            revocation_filter.add(fields["jti"], int(fields["exp"]))
+        except (KeyError, ValueError):
+            continue
+    return last_id
+
+
+def _sync_forever(redis_factory: Callable[[], Redis], stop: threading.Event) -> None:
+    last_id = "0-0"
+    backoff = 1.0
+    while not stop.is_set():
+        try:
+            r = redis_factory()
+            # Replay whatever is still in the stream (bounded by MINID trimming)
+            while True:
+                chunk = r.xrange(REVOKED_STREAM, min=f"({last_id}" if last_id != "0-0" else "-", count=1000)
+                if not chunk:
+                    break
+                last_id = _apply(chunk) or last_id
+            revocation_filter.ready = True
+            backoff = 1.0
+            next_prune = time.monotonic()
+            while not stop.is_set():
+                resp = r.xread({REVOKED_STREAM: last_id}, count=1000, block=1000)
+                for _stream, entries in resp or []:
+                    last_id = _apply(entries) or last_id
+                if time.monotonic() >= next_prune:
+                    revocation_filter.prune()
+                    next_prune = time.monotonic() + 60
+        except (RedisError, OSError):
+            log.warning("Revocation stream sync lost; falling back to Redis checks, retrying in %.0fs", backoff)
+        finally:
+            revocation_filter.ready = False
+        stop.wait(backoff)
+        backoff = min(backoff * 2, 30.0)
+
+
+def start_revocation_sync(redis_factory: Callable[[], Redis] = get_redis) -> threading.Event:
+    """Start the background stream follower; set the returned event to stop it."""
+    stop = threading.Event()
+    if settings.revocation_filter_enabled:
+        t = threading.Thread(target=_sync_forever, args=(redis_factory, stop), name="revocation-sync", daemon=True)
+        t.start()
+    return stop
@@ -0,0 +1,197 @@
+# app/auth/user_cache.py
+"""
+Short-TTL, bounded in-process cache of the fields auth needs per request
+(user_id -> token_version, role, email), so most requests authenticate with zero DB round trips.
+
+Correctness across replicas: any commit that changes a user's token_version or role (or
+deletes the user) publishes the id on a Redis pub/sub channel; every API process listens and
+evicts. The cache is only consulted while that listener is subscribed, so a process that
+can't hear invalidations falls back to the DB instead of serving stale roles/versions.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import models
+from app.deps import get_redis
+
+log = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "auth:user-invalidate"
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Detached snapshot of the authenticated user; what route handlers receive as current_user."""
+    id: int
+    email: str
+    role: str
+    token_version: int
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_model(cls, user: models.User) -> "CurrentUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            token_version=user.token_version,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+class UserCache:
+    def __init__(self, *, ttl_seconds: float, max_size: int):
+        self._ttl = ttl_seconds
+        self._max = max_size
+        self._data: "OrderedDict[int, tuple[float, CurrentUser]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self.listening = False  # set by the invalidation listener
+
+    @property
+    def active(self) -> bool:
+        return self._max > 0 and self.listening
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        if not self.active:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[user_id]
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(user_id)
+            self._stats["hits"] += 1
+            return entry[1]
+
+    def put(self, user: CurrentUser) -> None:
+        if not self.active:
+            return
+        with self._lock:
+            self._data[user.id] = (time.monotonic() + self._ttl, user)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            for uid in user_ids:
+                if self._data.pop(int(uid), None) is not None:
+                    self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+            s["size"] = len(self._data)
+        lookups = s["hits"] + s["misses"]
+        s["hit_ratio"] = s["hits"] / lookups if lookups else 0.0
+        s["listening"] = self.listening
+        return s
+
+
+user_cache = UserCache(
+    ttl_seconds=settings.auth_user_cache_ttl_seconds,
+    max_size=settings.auth_user_cache_max_size,
+)
+
+
+# ---- Publishing: hook commits that touch token_version / role ----
+_PENDING_KEY = "auth_user_invalidations"
+
+
+def publish_invalidation(r: Redis, user_ids: Iterable[int]) -> None:
+    ids = [str(uid) for uid in user_ids]
+    if not ids:
+        return
+    try:
+        r.publish(INVALIDATION_CHANNEL, ",".join(ids))
+    except RedisError:
+        # Other replicas converge via the TTL
+        log.warning("Could not publish user cache invalidation for %s", ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_user_changes(session: Session, flush_context) -> None:
+    changed = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.deleted:
+        if isinstance(obj, models.User):
+            changed.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, models.User):
+            attrs = inspect(obj).attrs
+            if attrs.token_version.history.has_changes() or attrs.role.history.has_changes():
+                changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_user_changes(session: Session) -> None:
+    changed = session.info.pop(_PENDING_KEY, None)
+    if changed:
+        user_cache.invalidate(changed)
+        publish_invalidation(get_redis(), changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_user_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# ---- Listening: one daemon thread per API process ----
+def _listen_forever(redis_factory: Callable[[], Redis], stop: threading.Event) -> None:
+    backoff = 1.0
+    while not stop.is_set():
+        pubsub = None
+        try:
+            pubsub = redis_factory().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            # anything cached before (re)subscribing may have missed an invalidation
+            user_cache.clear()
+            user_cache.listening = True
+            backoff = 1.0
+            while not stop.is_set():
+                msg = pubsub.get_message(timeout=1.0)
+                if msg and msg.get("type") == "message":
+                    user_cache.invalidate(int(x) for x in str(msg["data"]).split(",") if x)
+        except (RedisError, OSError):
+            log.warning("User cache invalidation listener disconnected; retrying in %.0fs", backoff)
+        finally:
+            user_cache.listening = False
+            user_cache.clear()
+            if pubsub is not None:
+                try:
+                    pubsub.close()
+                except (RedisError, OSError):
+                    pass
+        stop.wait(backoff)
+        backoff = min(backoff * 2, 30.0)
+
+
+def start_invalidation_listener(redis_factory: Callable[[], Redis] = get_redis) -> threading.Event:
+    """Start the background subscriber; set the returned event to stop it."""
+    stop = threading.Event()
+    if settings.auth_user_cache_max_size > 0:
+        t = threading.Thread(
+            target=_listen_forever, args=(redis_factory, stop), name="user-cache-invalidation", daemon=True
+        )
+        t.start()
+    return stop
@@ -0,0 +1,171 @@
+# app/batch_worker.py
+"""
+Batching worker for the summarize queue.
+
+Instead of one RQ work-horse per note, this loop pops up to WORKER_BATCH_SIZE job ids
+(waiting at most WORKER_BATCH_MAX_WAIT_MS after the first one arrives), runs them through
+the summarizer as a single padded batch and writes all results in one transaction.
+
+Popped jobs go into RQ's StartedJobRegistry right away, leased for their job timeout
+(+ START_LEASE_SLACK). If the worker dies before finishing them, any batch worker's
+periodic requeue_abandoned() puts them back on their queue once the lease has run out.
+Only a crash in the few milliseconds between the pop and the registry write loses a job.
+
+Run with:  python -m app.batch_worker
+"""
+import logging
+import time
+import traceback
+
+from redis import Redis
+from rq import Queue
+from rq.exceptions import NoSuchJobError
+from rq.job import Job, JobStatus
+from rq.registry import StartedJobRegistry
+
+from app.config import settings
+from app.jobs import SUMMARIZE_JOB, SUMMARIZE_JOB_TIMEOUT, worker_queue_names
+from app.metrics import start_metrics_server
+from app.queue_metrics import record_job_waits
+from app.services.summarize import warm_up
+from app.worker_jobs import NotesFailed, summarize_notes_batch
+
+log = logging.getLogger("app.batch_worker")
+
+SUMMARIZE_FUNC_NAME = SUMMARIZE_JOB
+RESULT_TTL = 500  # same default RQ uses for finished jobs
+BLOCK_SECONDS = 1  # BLPOP timeout while idle; keeps the loop responsive to Ctrl+C
+START_LEASE_SLACK = 60  # seconds past a job's timeout before it counts as abandoned
+REAP_INTERVAL = 60  # seconds between requeue_abandoned() sweeps
+
+
+def collect_batch(conn: Redis, queues: list[Queue], batch_size: int, max_wait_ms: int) -> list[Job]:
+    """
+    Block for the first job, then keep popping until the batch is full or the window closes.
+    Queues are tried in priority order (BLPOP checks keys in the order given).
+    """
+    first = conn.blpop([q.key for q in queues], BLOCK_SECONDS)
+    if first is None:
+        return []
+
+    job_ids = [first[1].decode() if isinstance(first[1], bytes) else first[1]]
+    deadline = time.monotonic() + max_wait_ms / 1000.0
+    while len(job_ids) < batch_size:
+        # plain LPOP: rq's Queue.pop_job_id() raises on an empty queue instead of returning None
+        job_id = next((j for j in (conn.lpop(q.key) for q in queues) if j), None)
+        if job_id:
+            job_ids.append(job_id.decode() if isinstance(job_id, bytes) else job_id)
+            continue
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(0.005, remaining))
+
+    jobs = [j for j in Job.fetch_many(job_ids, connection=conn) if j is not None]
+    _mark_started(conn, jobs)
+    return jobs
+
+
+def _mark_started(conn: Redis, jobs: list[Job]) -> None:
+    with conn.pipeline() as pipe:
+        for job in jobs:
+            job.set_status(JobStatus.STARTED, pipeline=pipe)
+            job.started_job_registry.add(job, (job.timeout or SUMMARIZE_JOB_TIMEOUT) + START_LEASE_SLACK, pipeline=pipe)
+        pipe.execute()
+
+
+def requeue_abandoned(conn: Redis, queues: list[Queue]) -> int:
+    """Put jobs whose started lease ran out (their worker died) back on their queue; returns how many."""
+    requeued = 0
+    for queue in queues:
+        registry = StartedJobRegistry(queue=queue)
+        for job_id in registry.get_expired_job_ids():
+            if not conn.zrem(registry.key, job_id):
+                continue  # another worker's sweep got it first
+            try:
+                job = Job.fetch(job_id, connection=conn)
+            except NoSuchJobError:
+                continue
+            queue.enqueue_job(job)
+            requeued += 1
+    if requeued:
+        log.warning("Requeued %d jobs abandoned by a dead batch worker", requeued)
+    return requeued
+
+
+def _finish(conn: Redis, jobs: list[Job], exc_string: str | None = None) -> None:
+    with conn.pipeline() as pipe:
+        for job in jobs:
+            job.started_job_registry.remove(job, pipeline=pipe)
+            if exc_string is None:
+                job.set_status(JobStatus.FINISHED, pipeline=pipe)
+                job.finished_job_registry.add(job, RESULT_TTL, pipeline=pipe)
+            else:
+                job.set_status(JobStatus.FAILED, pipeline=pipe)
+                job.failed_job_registry.add(job, ttl=job.failure_ttl, exc_string=exc_string, pipeline=pipe)
+        pipe.execute()
+
+
+def process_batch(conn: Redis, jobs: list[Job]) -> None:
+    record_job_waits(conn, jobs)
+    summarize_jobs = [j for j in jobs if j.func_name == SUMMARIZE_FUNC_NAME]
+    other_jobs = [j for j in jobs if j.func_name != SUMMARIZE_FUNC_NAME]
+
+    # Anything that isn't a summarize job is run as-is, one by one.
+    for job in other_jobs:
+        try:
+            job.perform()
+            _finish(conn, [job])
+        except Exception:
+            _finish(conn, [job], traceback.format_exc())
+
+    if not summarize_jobs:
+        return
+
+    note_ids = [int(j.args[0]) for j in summarize_jobs]
+    started = time.perf_counter()
+    try:
+        summarize_notes_batch(note_ids)
+    except NotesFailed as exc:
+        # the batch was retried note by note: only the notes that failed alone fail their job
+        failed = [(j, exc.errors[i]) for j, i in zip(summarize_jobs, note_ids) if i in exc.errors]
+        _finish(conn, [j for j, i in zip(summarize_jobs, note_ids) if i not in exc.errors])
+        for job, exc_string in failed:
+            _finish(conn, [job], exc_string)
+        return
+    except Exception:
+        log.exception("Batch of %d notes failed", len(note_ids))
+        _finish(conn, summarize_jobs, traceback.format_exc())
+        return
+    _finish(conn, summarize_jobs)
+    log.info("Summarized %d notes in %.3fs", len(note_ids), time.perf_counter() - started)
+
+
+def run(batch_size: int | None = None, max_wait_ms: int | None = None, serve_metrics: bool = True) -> None:
+    batch_size = batch_size or settings.worker_batch_size
+    max_wait_ms = settings.worker_batch_max_wait_ms if max_wait_ms is None else max_wait_ms
+
+    # RQ stores pickled payloads, so this connection must not decode responses.
+    conn = Redis.from_url(settings.redis_url)
+    queues = [Queue(name, connection=conn) for name in worker_queue_names()]
+    log.info(
+        "Batch worker on %s (batch_size=%d, max_wait_ms=%d)",
+        [q.name for q in queues], batch_size, max_wait_ms,
+    )
+    log.info("Model warm-up took %.2fs", warm_up())
+    if serve_metrics:
+        start_metrics_server(settings.worker_metrics_port)
+
+    last_reap = 0.0
+    while True:
+        if time.monotonic() - last_reap > REAP_INTERVAL:
+            requeue_abandoned(conn, queues)
+            last_reap = time.monotonic()
+        jobs = collect_batch(conn, queues, batch_size, max_wait_ms)
+        if jobs:
+            process_batch(conn, jobs)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run()
@@ -1,7 +1,7 @@
 import enum
 from datetime import datetime
 from sqlalchemy import (
-    String, Integer, DateTime, ForeignKey, Text, UniqueConstraint
+    String, Integer, DateTime, ForeignKey, Text, UniqueConstraint, Index, text
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
@@ -40,6 +40,15 @@ class Note(Base):
     __tablename__ = "notes"
     __table_args__ = (
         UniqueConstraint("user_id", "idempotency_key", name="uq_user_id_idempotency_key"),
+        # keyset pagination (ORDER BY id DESC) served straight from the index
+        Index("ix_notes_user_id_status_id", "user_id", "status", "id"),
+        Index("ix_notes_user_id_id", "user_id", "id"),
+        Index("ix_notes_status_id", "status", "id"),
+        # QUEUE_BACKEND=pg: finds expired leases without scanning every processing note
+        Index(
+            "ix_notes_processing_lease", "lease_expires_at",
+            postgresql_where=text("status = 'processing'"), sqlite_where=text("status = 'processing'"),
+        ),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
@@ -50,7 +59,28 @@ class Note(Base):
     status: Mapped[str] = mapped_column(String(20), default=NoteStatus.queued.value, nullable=False)
     idempotency_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
+    # QUEUE_BACKEND=pg claim state (see app/pg_queue.py)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    locked_by: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     user: Mapped["User"] = relationship("User", back_populates="notes")
+
+# ---- Job outbox ----
+class JobOutbox(Base):
+    """A summarize job committed with its note; app.outbox relays it to Redis and deletes the row."""
+    __tablename__ = "job_outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    note_id: Mapped[int] = mapped_column(ForeignKey("notes.id", ondelete="CASCADE"), unique=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    lane: Mapped[str] = mapped_column(String(20), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# full-text index DDL for the notes table (not mapped; see app/db/search.py)
+from app.db import search as _search  # noqa: E402,F401
@@ -0,0 +1,87 @@
+# app/db/search.py
+"""
+Full-text index over notes.raw_text + notes.summary, one implementation per dialect.
+
+Postgres  notes.search_vector: a STORED generated tsvector (summary weighted A,
+          raw_text B) with a GIN index; matched with websearch_to_tsquery, ranked
+          with ts_rank_cd.
+SQLite    notes_fts: an external-content FTS5 table (porter stemming) kept in step
+          with notes by triggers; ranked with bm25, summary weighted 2x.
+
+Neither is a mapped column, so ORM loads never pay for the index. The DDL hangs off
+the notes table's after_create, so create_all (tests, benchmarks) builds it; existing
+databases get it from migration d8b4f6a2c173.
+"""
+import re
+
+from sqlalchemy import DDL, Float, column, event, false, func, literal_column, select, table
+
+from app.db import models
+
+SEARCH_CONFIG = "english"
+
+PG_DDL = [
+    f"""
+    ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(summary, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', raw_text), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_notes_search_vector ON notes USING gin (search_vector)",
+]
+
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE notes_fts USING fts5("
+    "raw_text, summary, content='notes', content_rowid='id', tokenize='porter unicode61')",
+    """
+    CREATE TRIGGER notes_fts_ai AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, raw_text, summary) VALUES (new.id, new.raw_text, coalesce(new.summary, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER notes_fts_ad AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, raw_text, summary)
+        VALUES ('delete', old.id, old.raw_text, coalesce(old.summary, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER notes_fts_au AFTER UPDATE OF raw_text, summary ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, raw_text, summary)
+        VALUES ('delete', old.id, old.raw_text, coalesce(old.summary, ''));
+        INSERT INTO notes_fts(rowid, raw_text, summary) VALUES (new.id, new.raw_text, coalesce(new.summary, ''));
+    END
+    """,
+]
+
+for _stmt in PG_DDL:
+    event.listen(models.Note.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+for _stmt in SQLITE_DDL:
+    event.listen(models.Note.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+event.listen(models.Note.__table__, "before_drop", DDL("DROP TABLE IF EXISTS notes_fts").execute_if(dialect="sqlite"))
+
+_fts = table("notes_fts", column("rowid"))
+_TERM = re.compile(r"\w+")
+
+
+def fts5_query(q: str) -> str:
+    """User text -> FTS5 query: every word quoted (no operator injection), all required."""
+    return " ".join('"' + t + '"' for t in _TERM.findall(q))
+
+
+def search_stmt(dialect_name: str, q: str):
+    """select(Note, score) for notes matching `q`; higher score = better match. Unordered."""
+    if dialect_name == "postgresql":
+        vector = literal_column("notes.search_vector")
+        query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), q)
+        score = func.ts_rank_cd(vector, query, type_=Float)
+        return select(models.Note, score.label("score")).where(vector.op("@@")(query))
+    if dialect_name == "sqlite":
+        fts = literal_column("notes_fts")
+        score = -func.bm25(fts, 1.0, 2.0, type_=Float)
+        match = fts5_query(q)
+        return (
+            select(models.Note, score.label("score"))
+            .join(_fts, _fts.c.rowid == models.Note.id)
+            .where(fts.op("MATCH")(match) if match else false())
+        )
+    raise ValueError(f"full-text search is not available on {dialect_name}")
@@ -1,25 +1,96 @@
 # app/db/session.py
+import os
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool, StaticPool
 from sqlalchemy.engine import make_url
 from app.config import settings
+from app.metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
 
 url = make_url(settings.database_url)
 
 engine_kwargs = dict(pool_pre_ping=True, future=True)
 connect_args = {}
+in_memory = url.drivername.startswith("sqlite") and url.database in (":memory:", "")
 
 if url.drivername.startswith("sqlite"):
     connect_args["check_same_thread"] = False
-    # keep the same in-memory DB for all connections during tests
-    if url.database in (":memory:", ""):
-        engine_kwargs["poolclass"] = StaticPool
+
+if url.drivername.startswith("postgresql+psycopg") and settings.db_pgbouncer:
+    # transaction pooling hands each transaction to any server connection, so a
+    # statement prepared on one may not exist on the next
+    connect_args["prepare_threshold"] = None
+
+
+def _pool_kwargs(async_: bool) -> dict:
+    if in_memory:
+        # keep the same in-memory DB for all connections during tests
+        return {"poolclass": StaticPool}
+    if settings.db_null_pool:
+        return {"poolclass": NullPool}
+    if settings.metrics_enabled:
+        poolclass = TimedAsyncQueuePool if async_ else TimedQueuePool
+    else:
+        poolclass = AsyncAdaptedQueuePool if async_ else QueuePool
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
 
 engine = create_engine(
     settings.database_url,
     connect_args=connect_args,
     **engine_kwargs,
+    **_pool_kwargs(async_=False),
 )
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+if settings.metrics_enabled:
+    instrument_engine(engine)
+
+# A forked child (RQ work-horse, multiprocessing) must not reuse the parent's pooled
+# connections; close=False leaves them open for the parent.
+os.register_at_fork(after_in_child=lambda: engine.dispose(close=False))
+
+
+def pool_stats(eng) -> dict:
+    """Checked-out connections vs capacity for a QueuePool engine ({} for Null/StaticPool)."""
+    pool = eng.pool
+    if not isinstance(pool, QueuePool):
+        return {}
+    # the engine's own pool, not settings: an engine built with other limits reports its real capacity
+    capacity = pool.size() + max(0, pool._max_overflow)
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "capacity": capacity,
+        "saturation": checked_out / capacity if capacity else 0.0,
+    }
+
+
+# ---- Async path (DB_ASYNC=1) ----
+# psycopg3 serves both modes under the same "postgresql+psycopg" URL;
+# SQLite needs the aiosqlite driver instead of pysqlite.
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.db_async:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_url = url.set(drivername="sqlite+aiosqlite") if url.drivername.startswith("sqlite") else url
+    async_engine_kwargs = {k: v for k, v in engine_kwargs.items() if k != "future"}
+    async_engine = create_async_engine(
+        async_url, connect_args=connect_args, **async_engine_kwargs, **_pool_kwargs(async_=True)
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+    if settings.metrics_enabled:
+        instrument_engine(async_engine.sync_engine)
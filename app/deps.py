@@ -1,7 +1,15 @@
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from functools import lru_cache
 from app.config import settings
+from app.metrics import InstrumentedAsyncRedis, InstrumentedRedis
 
 @lru_cache(maxsize=1)
 def get_redis() -> Redis:
-    return Redis.from_url(settings.redis_url, decode_responses=True)
+    cls = InstrumentedRedis if settings.metrics_enabled else Redis
+    return cls.from_url(settings.redis_url, decode_responses=True)
+
+@lru_cache(maxsize=1)
+def get_redis_async() -> AsyncRedis:
+    cls = InstrumentedAsyncRedis if settings.metrics_enabled else AsyncRedis
+    return cls.from_url(settings.redis_url, decode_responses=True)
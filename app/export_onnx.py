@@ -0,0 +1,53 @@
+# app/export_onnx.py
+"""
+Export the summarizer to ONNX and int8-quantize it for SUMMARIZER_BACKEND=onnx.
+
+    python -m app.export_onnx                       # MODEL_LOCAL_DIR -> MODEL_LOCAL_DIR/onnx
+    python -m app.export_onnx --model t5-small --out /models/t5-small/onnx --arch avx2
+
+Writes encoder/decoder/decoder-with-past graphs (fp32 and *_quantized.onnx) plus the
+tokenizer, so the output directory is self-contained. Needs torch + optimum at export
+time only.
+"""
+import argparse
+import os
+
+from app.services.summarize_llm import MODEL_LOCAL_DIR, SUMMARIZER_MODEL
+from app.services.summarize_onnx import ONNX_FILES, ONNX_MODEL_DIR
+
+
+def export(model_id: str, out_dir: str, arch: str = "avx2", quantize: bool = True) -> None:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_id, export=True, use_cache=True)
+    model.save_pretrained(out_dir)
+    AutoTokenizer.from_pretrained(model_id).save_pretrained(out_dir)
+    print("Exported:", model_id, "->", out_dir)
+
+    if not quantize:
+        return
+    # Dynamic quantization: int8 weights, activations quantized on the fly; no calibration set.
+    qconfig = getattr(AutoQuantizationConfig, arch)(is_static=False, per_channel=False)
+    for name in ONNX_FILES:
+        quantizer = ORTQuantizer.from_pretrained(out_dir, file_name=f"{name}.onnx")
+        quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+        print("Quantized:", f"{name}.onnx", "->", f"{name}_quantized.onnx")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--model", default=MODEL_LOCAL_DIR or SUMMARIZER_MODEL, help="local dir or Hub id")
+    ap.add_argument("--out", default=ONNX_MODEL_DIR, help="default: ONNX_MODEL_DIR (MODEL_LOCAL_DIR/onnx)")
+    ap.add_argument("--arch", default="avx2", choices=["avx2", "avx512", "avx512_vnni", "arm64"])
+    ap.add_argument("--no-quantize", action="store_true")
+    args = ap.parse_args()
+    if not args.out:
+        ap.error("set MODEL_LOCAL_DIR/ONNX_MODEL_DIR or pass --out")
+    export(args.model, args.out, arch=args.arch, quantize=not args.no_quantize)
+
+
+if __name__ == "__main__":
+    main()
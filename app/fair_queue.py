@@ -0,0 +1,126 @@
+# app/fair_queue.py
+"""
+Per-user fair-share queue in Redis (weighted round-robin across user_ids).
+
+Layout (prefix = "sched:bulk"):
+  {prefix}:user:{uid}   list of items for one user, FIFO
+  {prefix}:ring         list of user ids that have items; rotated on every turn
+  {prefix}:members      set mirroring the ring, so a user is only in it once
+  {prefix}:weights      optional hash uid -> items per turn (default: quantum)
+  {prefix}:pending      total items across all users
+  {prefix}:processing:{feeder}  items a feeder popped but has not acked yet
+
+push() may run anywhere; it is one Lua script, so a user's items and its ring entry
+appear together. pop() is meant for a single feeder (see app.scheduler), which only
+races with pushes. A user is dropped from the ring under WATCH on its list, so a push
+landing in between keeps it scheduled. Given a processing list, pop() moves items into
+it atomically; the feeder acks once they are enqueued, and in_flight() finds the lists a
+crashed feeder left behind.
+"""
+from redis import Redis
+from redis.client import Pipeline
+from redis.exceptions import WatchError
+
+PUSH_LUA = """
+redis.call('RPUSH', KEYS[1], unpack(ARGV, 2))
+if redis.call('SADD', KEYS[2], ARGV[1]) == 1 then
+  redis.call('RPUSH', KEYS[3], ARGV[1])
+end
+redis.call('INCRBY', KEYS[4], #ARGV - 1)
+"""
+
+# LPOP with a count returns false on an empty list
+TAKE_LUA = """
+local items = redis.call('LPOP', KEYS[1], ARGV[1])
+if not items then
+  return {}
+end
+redis.call('RPUSH', KEYS[2], unpack(items))
+return items
+"""
+
+# Lua's unpack() is bounded by the C stack; big imports are pushed in chunks.
+PUSH_CHUNK = 1000
+
+
+class FairQueue:
+    def __init__(self, r: Redis, prefix: str = "sched:bulk"):
+        self.r = r
+        self.prefix = prefix
+        self.ring = f"{prefix}:ring"
+        self.members = f"{prefix}:members"
+        self.weights = f"{prefix}:weights"
+        self.pending_key = f"{prefix}:pending"
+        self._push = r.register_script(PUSH_LUA)
+        self._take = r.register_script(TAKE_LUA)
+
+    def user_key(self, user_id) -> str:
+        return f"{self.prefix}:user:{user_id}"
+
+    def processing_key(self, feeder: str) -> str:
+        return f"{self.prefix}:processing:{feeder}"
+
+    def push(self, user_id: int, items: list[str], pipeline: Pipeline | None = None) -> None:
+        keys = [self.user_key(user_id), self.members, self.ring, self.pending_key]
+        for start in range(0, len(items), PUSH_CHUNK):
+            self._push(keys=keys, args=[user_id, *items[start:start + PUSH_CHUNK]], client=pipeline)
+
+    def set_weight(self, user_id: int, weight: int) -> None:
+        self.r.hset(self.weights, user_id, weight)
+
+    def pending(self) -> int:
+        return int(self.r.get(self.pending_key) or 0)
+
+    def users(self) -> int:
+        return self.r.scard(self.members)
+
+    def pop(self, n: int, quantum: int = 1, processing: str | None = None) -> list[tuple[str, str]]:
+        """
+        Up to n (user_id, item) pairs, taking `weight` items from each user per turn.
+        With `processing`, the items are also moved onto that list until ack().
+        """
+        out: list[tuple[str, str]] = []
+        turns = 0
+        max_turns = n + self.r.llen(self.ring)
+        while len(out) < n and turns < max_turns:
+            turns += 1
+            uid = self.r.lmove(self.ring, self.ring, "LEFT", "RIGHT")
+            if uid is None:
+                break
+            uid = uid.decode() if isinstance(uid, bytes) else uid
+            weight = self.r.hget(self.weights, uid)
+            take = min(int(weight) if weight else quantum, n - len(out))
+            if processing:
+                items = self._take(keys=[self.user_key(uid), processing], args=[take])
+            else:
+                items = self.r.lpop(self.user_key(uid), take) or []
+            out.extend((uid, i.decode() if isinstance(i, bytes) else i) for i in items)
+            self._retire_if_empty(uid)
+        if out:
+            self.r.decrby(self.pending_key, len(out))
+        return out
+
+    def ack(self, processing: str) -> None:
+        self.r.delete(processing)
+
+    def in_flight(self) -> dict[str, list[str]]:
+        """Processing lists left by feeders: key -> items popped but never acked."""
+        out = {}
+        for key in self.r.scan_iter(match=self.processing_key("*")):
+            key = key.decode() if isinstance(key, bytes) else key
+            out[key] = [i.decode() if isinstance(i, bytes) else i for i in self.r.lrange(key, 0, -1)]
+        return out
+
+    def _retire_if_empty(self, uid: str) -> None:
+        key = self.user_key(uid)
+        with self.r.pipeline(transaction=True) as pipe:
+            try:
+                pipe.watch(key)
+                if pipe.llen(key):
+                    return
+                pipe.multi()
+                pipe.lrem(self.ring, 0, uid)
+                pipe.srem(self.members, uid)
+                pipe.execute()
+            except WatchError:
+                pass  # a push arrived: the user still has work and stays in the ring
@@ -0,0 +1,101 @@
+"""
+Enqueue helpers for background jobs, shared by every route that creates notes.
+
+Two lanes (SCHED_ENABLED=1):
+  interactive  single notes from POST /notes -> RQ queue "{RQ_QUEUE_NAME}:interactive"
+  bulk         POST /notes/bulk -> per-user FairQueue; app.scheduler releases jobs to
+               "{RQ_QUEUE_NAME}:bulk" round-robin across users, a few at a time
+Workers listen on interactive, then the legacy "{RQ_QUEUE_NAME}", then bulk, so an
+interactive note never waits behind a bulk backlog.
+
+With OUTBOX_ENABLED=1 the API does not call Redis at all: jobs are committed to the
+job_outbox table with the notes and app.outbox relays them through push_jobs.
+Every job id is note_job_id(note_id), so a redelivered note is recognisable.
+"""
+import time
+
+from redis import Redis
+from redis.client import Pipeline
+from rq import Queue
+
+from app.config import settings
+from app.fair_queue import FairQueue
+
+# Enqueued by dotted path: RQ resolves it in the worker, so the API never imports
+# app.worker_jobs and, through it, the summarizer backends.
+SUMMARIZE_JOB = "app.worker_jobs.summarize_note_job"
+SUMMARIZE_JOB_TIMEOUT = 600
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+LANES = (INTERACTIVE, BULK)
+
+
+def lane_queue_name(lane: str) -> str:
+    return f"{settings.rq_queue_name}:{lane}"
+
+
+def worker_queue_names() -> list[str]:
+    """Strict priority order for workers; the legacy queue drains jobs enqueued before lanes existed."""
+    return [lane_queue_name(INTERACTIVE), settings.rq_queue_name, lane_queue_name(BULK)]
+
+
+def bulk_queue(r: Redis) -> FairQueue:
+    return FairQueue(r, prefix="sched:bulk")
+
+
+def note_job_id(note_id: int) -> str:
+    return f"note-{note_id}"
+
+
+def _job_data(note_id: int, lane: str, submitted_at: float):
+    return Queue.prepare_data(
+        SUMMARIZE_JOB,
+        (note_id,),
+        timeout=SUMMARIZE_JOB_TIMEOUT,
+        job_id=note_job_id(note_id),
+        meta={"lane": lane, "submitted_at": submitted_at},
+    )
+
+
+def enqueue_lane(
+    r: Redis, queue_name: str, lane: str, items: list[tuple[int, float]], pipeline: Pipeline | None = None
+) -> None:
+    """
+    Put (note_id, submitted_at) pairs on an RQ queue; many ids go out in a single Redis pipeline.
+    With `pipeline`, the jobs are only queued on it and the caller executes it.
+    """
+    if not items:
+        return
+    q = Queue(queue_name, connection=r)
+    if len(items) == 1 and pipeline is None:
+        note_id, submitted_at = items[0]
+        q.enqueue(
+            SUMMARIZE_JOB, note_id, job_timeout=SUMMARIZE_JOB_TIMEOUT, job_id=note_job_id(note_id),
+            meta={"lane": lane, "submitted_at": submitted_at},
+        )
+        return
+    q.enqueue_many([_job_data(note_id, lane, submitted_at) for note_id, submitted_at in items], pipeline=pipeline)
+
+
+def enqueue_summaries(r: Redis, note_ids: list[int], *, lane: str = INTERACTIVE, user_id: int | None = None) -> None:
+    """Enqueue one summarize job per note on the given lane."""
+    if not note_ids or settings.queue_backend == "pg":
+        return  # pg backend: the committed queued notes are the jobs (see app.pg_queue)
+    if settings.outbox_enabled:
+        return  # already committed to job_outbox with the notes (see app.outbox)
+    now = time.time()
+    push_jobs(r, [(i, now) for i in note_ids], lane=lane, user_id=user_id)
+
+
+def push_jobs(
+    r: Redis, items: list[tuple[int, float]], *, lane: str, user_id: int | None = None, pipeline: Pipeline | None = None
+) -> None:
+    """Route (note_id, submitted_at) pairs to their lane's queue (queued on `pipeline` if given)."""
+    if not settings.sched_enabled:
+        enqueue_lane(r, settings.rq_queue_name, lane, items, pipeline)
+        return
+    if lane == BULK and user_id is not None:
+        bulk_queue(r).push(user_id, [f"{i}:{t}" for i, t in items], pipeline)
+        return
+    enqueue_lane(r, lane_queue_name(lane), lane, items, pipeline)
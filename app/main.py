@@ -1,12 +1,50 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+
+from app.config import settings
+from app.auth.user_cache import start_invalidation_listener, user_cache
+from app.auth.revocation import start_revocation_sync, revocation_filter
+from app.auth.hashing import PasswordHasherBusy
+from app.services.note_events import note_events
+from app.ratelimit import RateLimitMiddleware, rate_limiter
+from app.deps import get_redis
+from app.db import session as db_session
+from app.db.session import pool_stats
+from app.jobs import worker_queue_names
+from app.metrics import MetricsMiddleware, QueueCollector, register_collector, render_latest
+from app.profiling import ProfilingMiddleware, instrument_sync_endpoints
+from app.api.v1.routes_profiles import router as profiles_router
+
+if settings.db_async:
+    from app.api.v1.routes_auth_async import router as auth_router
+    from app.api.v1.routes_notes_async import router as notes_router
+    from app.api.v1.routes_users_async import router as users_router
+else:
+    from app.api.v1.routes_auth import router as auth_router
+    from app.api.v1.routes_notes import router as notes_router
+    from app.api.v1.routes_users import router as users_router
+
 
-from app.api.v1.routes_auth import router as auth_router
-from app.api.v1.routes_notes import router as notes_router
-from app.api.v1.routes_users import router as users_router 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop_user_cache = start_invalidation_listener()
+    stop_revocation = start_revocation_sync()
+    yield
+    stop_user_cache.set()
+    stop_revocation.set()
+    await note_events.close()
 
-app = FastAPI(title="Notes AI API", version="1.0.0")
 
+app = FastAPI(title="Notes AI API", version="1.0.0", lifespan=lifespan)
+
+if settings.profiling_enabled:
+    # innermost: profiles cover the app itself, and requests refused by the rate limiter are never profiled
+    app.add_middleware(ProfilingMiddleware)
+# added before CORS so CORS stays outermost and 429s still carry CORS headers
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -14,11 +52,57 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if settings.metrics_enabled:
+    # outermost, so rate-limited and CORS-preflight requests are timed too
+    app.add_middleware(MetricsMiddleware)
+
+
+def _process_gauges() -> dict:
+    uc = user_cache.stats()
+    pool = pool_stats(db_session.async_engine.sync_engine if settings.db_async else db_session.engine)
+    return {
+        "auth_user_cache_hits": ("User cache hits since start", uc["hits"]),
+        "auth_user_cache_misses": ("User cache misses since start", uc["misses"]),
+        "auth_user_cache_size": ("Users cached in this process", uc["size"]),
+        "revocation_filter_ready": ("1 once the local revocation filter is in sync", revocation_filter.stats()["ready"]),
+        "ratelimit_local_decisions": ("Requests admitted from a local token lease", rate_limiter.stats["local"]),
+        "ratelimit_redis_calls": ("Token bucket calls to Redis", rate_limiter.stats["redis"]),
+        "ratelimit_limited": ("Requests rejected with 429", rate_limiter.stats["limited"]),
+        "sse_connections": ("Open /notes/stream connections", note_events.connections),
+        **({
+            "db_pool_checked_out": ("DB connections in use", pool["checked_out"]),
+            "db_pool_idle": ("Idle pooled DB connections", pool["idle"]),
+            "db_pool_capacity": ("DB_POOL_SIZE + DB_MAX_OVERFLOW", pool["capacity"]),
+            "db_pool_saturation": ("Checked-out connections / capacity", pool["saturation"]),
+        } if pool else {}),
+    }
+
+
+if settings.metrics_enabled:
+    register_collector(QueueCollector(get_redis, worker_queue_names, _process_gauges))
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many concurrent logins, retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
 app.include_router(auth_router, prefix="/api/v1")
 app.include_router(notes_router, prefix="/api/v1")
-app.include_router(users_router, prefix="/api/v1")
\ No newline at end of file
+app.include_router(users_router, prefix="/api/v1")
+app.include_router(profiles_router, prefix="/api/v1")
+
+if settings.profiling_enabled:
+    instrument_sync_endpoints(app)
@@ -0,0 +1,294 @@
+# app/metrics.py
+"""
+Prometheus metrics for the API and the workers (served at GET /metrics).
+
+Cardinality is bounded by construction: routes are labelled by their template
+("/api/v1/notes/{note_id:int}", never the concrete path), status by class (2xx..5xx),
+Redis calls by command name, SQL by statement verb, queues by the fixed lane names.
+
+DB time per request is collected from SQLAlchemy cursor events into a contextvar the
+middleware sets up, so it works for sync handlers (threadpool copies the context) and
+async ones (SQLAlchemy's greenlets inherit it).
+
+Workers that run several processes (WORKER_MODE=pool) need PROMETHEUS_MULTIPROC_DIR;
+the pool sets one up itself when WORKER_METRICS_PORT is set.
+"""
+import contextvars
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.client import Pipeline
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1)
+MODEL_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120)
+TTD_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600, 4 * 3600)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds", "Total SQL time per HTTP request", ["route"], buckets=FAST_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement latency", ["verb"], buckets=FAST_BUCKETS)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", buckets=FAST_BUCKETS + (5, 30)
+)
+DB_POOL_TIMEOUTS = Counter("db_pool_checkout_timeouts", "Checkouts that gave up after DB_POOL_TIMEOUT")
+REDIS_SECONDS = Histogram("redis_command_duration_seconds", "Redis call latency", ["command"], buckets=FAST_BUCKETS)
+
+# worker side
+MODEL_SECONDS = Histogram(
+    "summarize_model_seconds", "Model inference time per batch call", ["backend"], buckets=MODEL_BUCKETS
+)
+NOTE_TIME_TO_DONE = Histogram(
+    "note_time_to_done_seconds", "Note creation to done/failed", ["status"], buckets=TTD_BUCKETS
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "job_queue_wait_seconds", "API accept to job start", ["lane"], buckets=TTD_BUCKETS
+)
+
+_SQL_VERBS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+_HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+# ---- per-request DB stats ----
+class RequestStats:
+    __slots__ = ("db_queries", "db_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    verb = statement.lstrip()[:6].split(None, 1)[0].upper() if statement else ""
+    DB_QUERY_SECONDS.labels(verb if verb in _SQL_VERBS else "OTHER").observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(engine) -> None:
+    """Attach timing listeners to a sync Engine (use async_engine.sync_engine for the async one)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class _TimedCheckout:
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except sa_exc.TimeoutError:
+            DB_POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records how long each checkout waited (including connect time for new connections)."""
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+# ---- Redis ----
+def _command_label(args) -> str:
+    name = args[0] if args else "?"
+    return (name.decode() if isinstance(name, bytes) else str(name)).split(" ")[0].upper()
+
+
+class InstrumentedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            REDIS_SECONDS.labels("PIPELINE").observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):
+    """Redis client that times every command (pipelines as one PIPELINE call)."""
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            REDIS_SECONDS.labels(_command_label(args)).observe(time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedAsyncPipeline(AsyncPipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_SECONDS.labels("PIPELINE").observe(time.perf_counter() - started)
+
+
+class InstrumentedAsyncRedis(AsyncRedis):
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_SECONDS.labels(_command_label(args)).observe(time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return InstrumentedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+# ---- HTTP ----
+class MetricsMiddleware:
+    """Pure ASGI: times the request and records DB work done on its behalf."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"] if scope["method"] in _HTTP_METHODS else "OTHER"
+            HTTP_LATENCY.labels(method, template, f"{status['code'] // 100}xx").observe(
+                time.perf_counter() - started
+            )
+            DB_QUERIES_PER_REQUEST.labels(template).observe(stats.db_queries)
+            DB_TIME_PER_REQUEST.labels(template).observe(stats.db_seconds)
+
+
+# ---- scrape-time gauges ----
+class QueueCollector:
+    """Queue depth/oldest-job age per RQ queue plus in-process cache stats, read at scrape time."""
+
+    def __init__(self, redis_factory: Callable[[], Redis], queue_names: Callable[[], list[str]], extra: Callable[[], dict]):
+        self.redis_factory = redis_factory
+        self.queue_names = queue_names
+        self.extra = extra
+
+    def collect(self):
+        depth = GaugeMetricFamily("rq_queue_depth", "Jobs waiting in the RQ queue", labels=["queue"])
+        age = GaugeMetricFamily("rq_queue_oldest_job_age_seconds", "Age of the job at the head of the queue", labels=["queue"])
+        try:
+            r = self.redis_factory()
+            names = self.queue_names()
+            with r.pipeline(transaction=False) as pipe:
+                for name in names:
+                    pipe.llen(f"rq:queue:{name}")
+                    pipe.lindex(f"rq:queue:{name}", 0)
+                raw = pipe.execute()
+            heads = raw[1::2]
+            with r.pipeline(transaction=False) as pipe:
+                for head in heads:
+                    pipe.hget(f"rq:job:{head.decode() if isinstance(head, bytes) else head}", "enqueued_at")
+                enqueued = pipe.execute() if any(heads) else [None] * len(heads)
+            now = time.time()
+            for name, n, head, ts in zip(names, raw[0::2], heads, enqueued):
+                depth.add_metric([name], n)
+                age.add_metric([name], _age(ts, now) if head else 0.0)
+        except Exception:
+            pass  # a scrape must never fail because Redis is slow or down
+        yield depth
+        yield age
+
+        for name, (help_text, value) in self.extra().items():
+            g = GaugeMetricFamily(name, help_text)
+            g.add_metric([], float(value))
+            yield g
+
+
+def _age(ts, now: float) -> float:
+    if not ts:
+        return 0.0
+    s = ts.decode() if isinstance(ts, bytes) else ts
+    try:
+        dt = datetime.strptime(s, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return 0.0
+    return max(0.0, now - dt.timestamp())
+
+
+# ---- exposition ----
+_custom_collectors: list = []
+
+
+def register_collector(collector) -> None:
+    _custom_collectors.append(collector)
+    REGISTRY.register(collector)
+
+
+def _registry():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        reg = CollectorRegistry()
+        multiprocess.MultiProcessCollector(reg)
+        for c in _custom_collectors:
+            reg.register(c)
+        return reg
+    return REGISTRY
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve /metrics for a worker process (or the pool supervisor, aggregating its children)."""
+    if port > 0:
+        start_http_server(port, registry=_registry())
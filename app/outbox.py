@@ -0,0 +1,156 @@
+# app/outbox.py
+"""
+Transactional outbox for summarize jobs (OUTBOX_ENABLED=1, QUEUE_BACKEND=rq).
+
+Note creation inserts one job_outbox row per created note in the same transaction,
+so a note and its job commit (or roll back) together and the request never waits on
+Redis. The relay drains the table in batches of OUTBOX_BATCH_SIZE:
+
+    SELECT ... FROM job_outbox ORDER BY id LIMIT n FOR UPDATE SKIP LOCKED
+    -> push_jobs per lane and user, all in one MULTI with the sent markers
+    -> DELETE the rows, COMMIT
+
+Delivery is at-least-once: if Redis fails the rows stay and are retried; if the relay
+dies between the push and the commit they are pushed again. Redeliveries are dropped
+by note id: the push and an outbox:sent:{id} marker (SET NX, SENT_TTL_SECONDS) go out
+in one MULTI, and a note with a marker is skipped. That covers the bulk lane too, whose
+FairQueue items have no RQ job yet (summarize_note_job is itself a no-op for a done note).
+
+Run with:  python -m app.outbox   (several relays may run; SKIP LOCKED splits the rows)
+"""
+import logging
+import time
+from datetime import datetime, timezone
+
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import models
+from app.jobs import push_jobs
+
+log = logging.getLogger("app.outbox")
+
+SENT_KEY = "outbox:sent:{}"
+SENT_TTL_SECONDS = 24 * 3600
+
+
+# ---- producer side (API, inside the note's transaction) ----
+def _outbox_wanted() -> bool:
+    return settings.outbox_enabled and settings.queue_backend != "pg"
+
+
+def _rows(note_ids: list[int], lane: str, user_id: int) -> list[dict]:
+    return [{"note_id": i, "user_id": user_id, "lane": lane} for i in note_ids]
+
+
+def stage_jobs(db: Session, note_ids: list[int], *, lane: str, user_id: int) -> None:
+    """Call before commit: the jobs become visible to the relay together with the notes."""
+    if note_ids and _outbox_wanted():
+        db.execute(insert(models.JobOutbox), _rows(note_ids, lane, user_id))
+
+
+async def stage_jobs_async(db: AsyncSession, note_ids: list[int], *, lane: str, user_id: int) -> None:
+    if note_ids and _outbox_wanted():
+        await db.execute(insert(models.JobOutbox), _rows(note_ids, lane, user_id))
+
+
+# ---- relay ----
+def _submitted_at(created_at: datetime) -> float:
+    # created_at is naive UTC; queue-wait metrics then include the time spent in the outbox
+    return created_at.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _already_relayed(r: Redis, note_ids: list[int]) -> set[int]:
+    with r.pipeline(transaction=False) as pipe:
+        for note_id in note_ids:
+            pipe.exists(SENT_KEY.format(note_id))
+        found = pipe.execute()
+    return {note_id for note_id, hit in zip(note_ids, found) if hit}
+
+
+def relay_once(db: Session, r: Redis, limit: int | None = None) -> int:
+    """Push one batch of outbox rows to Redis and delete them; returns rows relayed."""
+    rows = db.scalars(
+        select(models.JobOutbox)
+        .order_by(models.JobOutbox.id)
+        .limit(limit or settings.outbox_batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not rows:
+        db.rollback()  # release the (empty) snapshot between polls
+        return 0
+
+    skip = _already_relayed(r, [row.note_id for row in rows])
+    groups: dict[tuple[str, int], list[tuple[int, float]]] = {}
+    for row in rows:
+        if row.note_id not in skip:
+            groups.setdefault((row.lane, row.user_id), []).append((row.note_id, _submitted_at(row.created_at)))
+    if groups:
+        with r.pipeline(transaction=True) as pipe:
+            for (lane, user_id), items in groups.items():
+                push_jobs(r, items, lane=lane, user_id=user_id, pipeline=pipe)
+                for note_id, _ in items:
+                    pipe.set(SENT_KEY.format(note_id), 1, nx=True, ex=SENT_TTL_SECONDS)
+            pipe.execute()
+
+    db.execute(delete(models.JobOutbox).where(models.JobOutbox.id.in_([row.id for row in rows])))
+    db.commit()
+    if skip:
+        log.info("Dropped %d redelivered outbox rows: %s", len(skip), sorted(skip))
+    return len(rows)
+
+
+def drain(db: Session, r: Redis) -> int:
+    """Relay until the outbox is empty; returns rows relayed."""
+    total = 0
+    while True:
+        n = relay_once(db, r)
+        total += n
+        if n == 0:
+            return total
+
+
+def outbox_stats(db: Session) -> dict:
+    """Backlog and age of the oldest unrelayed job."""
+    pending, oldest = db.execute(
+        select(func.count(models.JobOutbox.id), func.min(models.JobOutbox.created_at))
+    ).one()
+    db.rollback()
+    age = (datetime.utcnow() - oldest).total_seconds() if oldest else 0.0
+    return {"pending": pending, "oldest_age_s": round(age, 3)}
+
+
+def run() -> None:
+    from app.db.session import SessionLocal
+
+    # Job payloads are pickled; keep this connection non-decoding like the workers'.
+    r = Redis.from_url(settings.redis_url)
+    interval = settings.outbox_poll_ms / 1000.0
+    log.info("Outbox relay started (batch_size=%d)", settings.outbox_batch_size)
+    last_stats = 0.0
+    db = SessionLocal()
+    try:
+        while True:
+            try:
+                relayed = relay_once(db, r)
+                if time.monotonic() - last_stats > 60:
+                    log.info("Outbox stats: %s", outbox_stats(db))
+                    last_stats = time.monotonic()
+                if relayed < settings.outbox_batch_size:
+                    time.sleep(interval)
+            except (RedisError, OSError, SQLAlchemyError):
+                log.exception("Relay failed; rows stay in the outbox, retrying")
+                db.rollback()
+                time.sleep(1.0)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run()
@@ -0,0 +1,197 @@
+# app/pg_queue.py
+"""
+Postgres-native job queue (QUEUE_BACKEND=pg): the notes table is the queue.
+
+A queued note *is* the job, so there is nothing to enqueue after commit and nothing
+to drift: creating notes only sends NOTIFY (delivered on commit) to wake idle workers.
+Workers claim up to PG_QUEUE_BATCH_SIZE notes at a time with
+
+    UPDATE notes SET status='processing', lease_expires_at=..., attempts=attempts+1
+    WHERE id IN (SELECT id ... ORDER BY id LIMIT n FOR UPDATE SKIP LOCKED) RETURNING ...
+
+so concurrent workers never block on or double-claim a row, and feed the whole claim
+to one batched model call. A claim is a lease: if the worker dies, the note is claimed
+again once lease_expires_at passes (PG_QUEUE_LEASE_SECONDS). Failures go back to queued
+with an exponential not-before time (PG_QUEUE_RETRY_DELAY_SECONDS, doubling) until
+PG_QUEUE_MAX_ATTEMPTS, then the note is marked failed.
+
+Lanes and fair share are RQ-backend features; this backend claims oldest first.
+
+Run with:  python -m app.pg_queue   (or WORKER_MODE=pool, which uses this loop when QUEUE_BACKEND=pg)
+"""
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.metrics import QUEUE_WAIT_SECONDS
+
+log = logging.getLogger("app.pg_queue")
+
+CHANNEL = "notes_queued"
+
+_QUEUED = models.NoteStatus.queued.value
+_PROCESSING = models.NoteStatus.processing.value
+_FAILED = models.NoteStatus.failed.value
+
+
+# ---- producer side (API) ----
+def _notify_wanted(dialect_name: str) -> bool:
+    return settings.queue_backend == "pg" and dialect_name == "postgresql"
+
+
+def notify_queued(db: Session) -> None:
+    """Call before commit: NOTIFY is transactional, so workers wake only once the notes are visible."""
+    if _notify_wanted(db.get_bind().dialect.name):
+        db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": CHANNEL})
+
+
+async def notify_queued_async(db: AsyncSession) -> None:
+    if _notify_wanted(db.get_bind().dialect.name):
+        await db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": CHANNEL})
+
+
+# ---- consumer side (workers) ----
+def claim_stmt(worker_id: str, limit: int, now: datetime, lease_seconds: int):
+    lease = timedelta(seconds=lease_seconds)
+    Note = models.Note
+    expired = or_(
+        Note.lease_expires_at < now,
+        # processing without a lease: left behind by an RQ worker before the switch
+        and_(Note.lease_expires_at.is_(None), Note.updated_at < now - lease),
+    )
+    # on a queued note, lease_expires_at is a retry's not-before time
+    ready = or_(Note.lease_expires_at.is_(None), Note.lease_expires_at <= now)
+    candidates = (
+        select(Note.id)
+        .where(or_(and_(Note.status == _QUEUED, ready), and_(Note.status == _PROCESSING, expired)))
+        .order_by(Note.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Note)
+        .where(Note.id.in_(candidates.scalar_subquery()))
+        .values(
+            status=_PROCESSING,
+            attempts=Note.attempts + 1,
+            lease_expires_at=now + lease,
+            locked_by=worker_id,
+            updated_at=now,
+        )
+        .returning(Note)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim(db: Session, worker_id: str, limit: int) -> list[int]:
+    """
+    Claim up to `limit` notes and commit the claim; returns their ids. Notes already past
+    PG_QUEUE_MAX_ATTEMPTS are marked failed instead of being returned.
+    """
+    now = datetime.utcnow()  # same naive-UTC clock as created_at/updated_at
+    notes = db.scalars(claim_stmt(worker_id, limit, now, settings.pg_queue_lease_seconds)).all()
+    claimed, exhausted = [], []
+    for n in sorted(notes, key=lambda n: n.id):
+        if n.attempts > settings.pg_queue_max_attempts:
+            n.status, n.lease_expires_at, n.locked_by = _FAILED, None, None
+            exhausted.append(n.id)
+            continue
+        claimed.append(n.id)
+        if n.attempts == 1:
+            QUEUE_WAIT_SECONDS.labels("pg").observe(max(0.0, (now - n.created_at).total_seconds()))
+    db.commit()
+    if exhausted:
+        log.warning("Notes %s failed after %d attempts", exhausted, settings.pg_queue_max_attempts)
+    return claimed
+
+
+def retry_at(attempts: int, now: datetime) -> datetime:
+    delay = min(settings.pg_queue_lease_seconds, settings.pg_queue_retry_delay_seconds * 2 ** max(0, attempts - 1))
+    return now + timedelta(seconds=delay)
+
+
+def work_once(worker_id: str, batch_size: int | None = None) -> int:
+    """Claim one batch and summarize it; returns the number of notes claimed."""
+    from app.worker_jobs import summarize_claimed_notes  # worker-only: pulls in the summarizer
+
+    db = SessionLocal()
+    try:
+        ids = claim(db, worker_id, batch_size or settings.pg_queue_batch_size)
+        if ids:
+            summarize_claimed_notes(db, ids, settings.pg_queue_max_attempts, worker_id)
+        return len(ids)
+    finally:
+        db.close()
+
+
+class Waker:
+    """LISTEN on CHANNEL from a dedicated autocommit connection; plain sleep on other databases."""
+
+    def __init__(self, database_url: str):
+        from sqlalchemy.engine import make_url
+
+        url = make_url(database_url)
+        self._dsn = None
+        if url.get_backend_name() == "postgresql":
+            self._dsn = url.set(drivername="postgresql").render_as_string(hide_password=False)
+        self._conn = None
+
+    def wait(self, timeout: float) -> None:
+        if self._dsn is None:
+            time.sleep(timeout)
+            return
+        import psycopg
+
+        try:
+            if self._conn is None or self._conn.closed:
+                self._conn = psycopg.connect(self._dsn, autocommit=True)
+                self._conn.execute(f"LISTEN {CHANNEL}")
+            for _ in self._conn.notifies(timeout=timeout, stop_after=1):
+                pass
+        except psycopg.Error:
+            log.warning("LISTEN connection failed; polling every %.0fs", timeout, exc_info=True)
+            self.close()
+            time.sleep(timeout)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def run(batch_size: int | None = None, serve_metrics: bool = True) -> None:
+    from app.metrics import start_metrics_server
+    from app.services.summarize import warm_up
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"[:64]
+    waker = Waker(settings.pg_queue_listen_url or settings.database_url)
+    log.info("Postgres queue worker %s (batch_size=%d, lease=%ds)", worker_id,
+             batch_size or settings.pg_queue_batch_size, settings.pg_queue_lease_seconds)
+    log.info("Model warm-up took %.2fs", warm_up())
+    if serve_metrics:
+        start_metrics_server(settings.worker_metrics_port)
+
+    while True:
+        try:
+            claimed = work_once(worker_id, batch_size)
+        except SQLAlchemyError:
+            log.exception("Claim failed; retrying")
+            time.sleep(1.0)
+            continue
+        if not claimed:
+            waker.wait(settings.pg_queue_poll_seconds)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run()
@@ -0,0 +1,275 @@
+# app/profiling.py
+"""
+On-demand profiling of single requests and worker jobs (pyinstrument, speedscope format).
+
+A request is profiled when an admin sends `X-Profile: 1` (same checks as require_admin;
+the header is ignored for anyone else) or when PROFILE_SAMPLE_RATE picks it. The
+response carries `X-Profile-Id`; fetch the profile from GET /api/v1/admin/profiles/{id}
+and open it in https://www.speedscope.app. Profiles live in Redis for
+PROFILE_TTL_SECONDS (newest PROFILE_MAX_STORED kept), so any replica can serve them.
+
+Sync endpoints run in Starlette's threadpool, where a profiler started on the event
+loop can't see them, so instrument_sync_endpoints() wraps them to profile their thread
+as well; both sessions are merged into one profile.
+
+Jobs: @profiled_job profiles the next N jobs armed with POST /api/v1/admin/profiles/jobs
+(or PROFILE_JOB_SAMPLE_RATE) — inference and DB writes included.
+
+pyinstrument is only imported once something is actually profiled.
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import logging
+import random
+import time
+import uuid
+from typing import Callable, Optional
+
+from fastapi.routing import APIRoute
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth.dependencies import admin_from_token
+from app.config import settings
+from app.deps import get_redis, get_redis_async
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "profile:"
+INDEX_KEY = "profiles:index"
+ARMED_JOBS_KEY = "profiles:jobs:armed"
+ARMED_JOBS_TTL = 3600
+
+# Take one armed job: decrement only while positive and drop the key at zero, in one
+# step, so concurrent workers never profile more than `count` jobs nor leave it negative.
+TAKE_ARMED_LUA = """
+local n = tonumber(redis.call('GET', KEYS[1]))
+if not n then
+  return 0
+end
+if n <= 1 then
+  redis.call('DEL', KEYS[1])
+else
+  redis.call('DECR', KEYS[1])
+end
+if n > 0 then
+  return 1
+end
+return 0
+"""
+_take_armed = None  # TAKE_ARMED_LUA registered on the worker's Redis client, built on first use
+
+# long-lived or self-referential paths are never profiled
+EXCLUDED_PATHS = ("/health", "/metrics", "/api/v1/admin/profiles")
+EXCLUDED_SUFFIXES = ("/stream",)
+
+# per-thread sessions of the request being profiled (sync endpoints append theirs)
+_thread_sessions: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("profile_thread_sessions", default=None)
+
+
+def _profiler(async_mode: str):
+    from pyinstrument import Profiler
+
+    return Profiler(interval=settings.profile_interval_ms / 1000.0, async_mode=async_mode)
+
+
+def render_speedscope(sessions: list) -> str:
+    from pyinstrument.renderers import SpeedscopeRenderer
+    from pyinstrument.session import Session
+
+    return SpeedscopeRenderer().render(functools.reduce(Session.combine, sessions))
+
+
+# ---- storage ----
+def _queue_store(pipe, profile_id: str, meta: dict, data: str) -> None:
+    key = KEY_PREFIX + profile_id
+    pipe.hset(key, mapping={"meta": json.dumps(meta), "data": data})
+    pipe.expire(key, settings.profile_ttl_seconds)
+    pipe.zadd(INDEX_KEY, {profile_id: meta["created_at"]})
+    pipe.zremrangebyrank(INDEX_KEY, 0, -(settings.profile_max_stored + 1))
+    pipe.zremrangebyscore(INDEX_KEY, "-inf", meta["created_at"] - settings.profile_ttl_seconds)
+
+
+def save_profile(r: Redis, profile_id: str, meta: dict, sessions: list) -> None:
+    data = render_speedscope(sessions)
+    with r.pipeline(transaction=False) as pipe:
+        _queue_store(pipe, profile_id, meta, data)
+        pipe.execute()
+
+
+async def save_profile_async(r: AsyncRedis, profile_id: str, meta: dict, sessions: list) -> None:
+    data = await run_in_threadpool(render_speedscope, sessions)
+    async with r.pipeline(transaction=False) as pipe:
+        _queue_store(pipe, profile_id, meta, data)
+        await pipe.execute()
+
+
+async def list_profiles(r: AsyncRedis, limit: int) -> list[dict]:
+    ids = await r.zrevrange(INDEX_KEY, 0, limit - 1)
+    if not ids:
+        return []
+    async with r.pipeline(transaction=False) as pipe:
+        for pid in ids:
+            pipe.hget(KEY_PREFIX + (pid.decode() if isinstance(pid, bytes) else pid), "meta")
+        metas = await pipe.execute()
+    return [json.loads(m) for m in metas if m]  # expired entries drop out
+
+
+async def get_profile_data(r: AsyncRedis, profile_id: str) -> Optional[str]:
+    data = await r.hget(KEY_PREFIX + profile_id, "data")
+    return data.decode() if isinstance(data, bytes) else data
+
+
+async def arm_job_profiling(r: AsyncRedis, count: int) -> int:
+    await r.set(ARMED_JOBS_KEY, count, ex=ARMED_JOBS_TTL)
+    return count
+
+
+# ---- requests ----
+def _excluded(path: str) -> bool:
+    return path.startswith(EXCLUDED_PATHS) or path.endswith(EXCLUDED_SUFFIXES)
+
+
+def _profile_thread(call: Callable) -> Callable:
+    @functools.wraps(call)
+    def wrapper(*args, **kwargs):
+        sessions = _thread_sessions.get()
+        if sessions is None:
+            return call(*args, **kwargs)
+        profiler = _profiler("disabled")
+        profiler.start()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            sessions.append(profiler.stop())
+
+    return wrapper
+
+
+def instrument_sync_endpoints(app) -> None:
+    """Let profiled requests see inside sync endpoints (call after the routers are included)."""
+    for route in app.routes:
+        if isinstance(route, APIRoute) and not asyncio.iscoroutinefunction(route.dependant.call):
+            route.dependant.call = _profile_thread(route.dependant.call)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI; requests that aren't profiled only pay for a header scan."""
+
+    def __init__(self, app: ASGIApp, redis_factory: Optional[Callable[[], AsyncRedis]] = None):
+        self.app = app
+        self.redis_factory = redis_factory
+        self.header = settings.profile_header.lower().encode("latin-1")
+
+    async def _trigger(self, scope: Scope) -> Optional[str]:
+        headers = dict(scope.get("headers") or ())
+        if headers.get(self.header, b"").strip() in (b"1", b"true"):
+            scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                if await run_in_threadpool(admin_from_token, token.strip()):
+                    return "header"
+            return None
+        if settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _excluded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        trigger = await self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sessions: list = []
+        token = _thread_sessions.set(sessions)
+        profiler = _profiler("enabled")
+        started = time.time()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sessions.insert(0, profiler.stop())
+            _thread_sessions.reset(token)
+            meta = {
+                "id": profile_id,
+                "kind": "request",
+                "name": f"{scope['method']} {getattr(scope.get('route'), 'path', scope['path'])}",
+                "trigger": trigger,
+                "status": str(status["code"]),
+                "duration_ms": round((time.time() - started) * 1000, 1),
+                "created_at": started,
+            }
+            try:
+                r = self.redis_factory() if self.redis_factory else get_redis_async()
+                await save_profile_async(r, profile_id, meta, sessions)
+            except (RedisError, OSError):
+                log.warning("Could not store profile %s", profile_id, exc_info=True)
+
+
+# ---- jobs ----
+def _job_trigger(r: Redis) -> Optional[str]:
+    if settings.profile_job_sample_rate > 0 and random.random() < settings.profile_job_sample_rate:
+        return "sampled"
+    global _take_armed
+    try:
+        if _take_armed is None or _take_armed.registered_client is not r:
+            _take_armed = r.register_script(TAKE_ARMED_LUA)
+        if _take_armed(keys=[ARMED_JOBS_KEY]):
+            return "armed"
+    except RedisError:
+        pass
+    return None
+
+
+def profiled_job(func: Callable) -> Callable:
+    """Profile a worker job when it's armed or sampled; otherwise a single script call (EVALSHA) per job."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        r = get_redis()
+        trigger = _job_trigger(r)
+        if trigger is None:
+            return func(*args, **kwargs)
+        profile_id = uuid.uuid4().hex
+        profiler = _profiler("disabled")
+        started = time.time()
+        outcome = "error"
+        profiler.start()
+        try:
+            result = func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            session = profiler.stop()
+            meta = {
+                "id": profile_id,
+                "kind": "job",
+                "name": f"{func.__name__}({', '.join(map(repr, args))[:200]})",
+                "trigger": trigger,
+                "status": outcome,
+                "duration_ms": round((time.time() - started) * 1000, 1),
+                "created_at": started,
+            }
+            try:
+                save_profile(r, profile_id, meta, [session])
+                log.info("Stored job profile %s for %s", profile_id, meta["name"])
+            except (RedisError, OSError):
+                log.warning("Could not store profile %s", profile_id, exc_info=True)
+
+    return wrapper
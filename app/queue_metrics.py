@@ -0,0 +1,85 @@
+# app/queue_metrics.py
+"""
+Queue-wait histograms per scheduling lane, shared by every worker via Redis.
+
+Wait = job start - the moment the API accepted the note (job.meta["submitted_at"]),
+so time spent in the fair-share queue before the feeder released a bulk job counts too.
+"""
+import time
+from datetime import timezone
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+from app.metrics import QUEUE_WAIT_SECONDS
+
+WAIT_KEY_PREFIX = "sched:wait:"
+WAIT_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900, 3600, float("inf"))
+
+
+def _bucket(seconds: float) -> str:
+    for b in WAIT_BUCKETS:
+        if seconds <= b:
+            return "inf" if b == float("inf") else f"{b:g}"
+    return "inf"
+
+
+def job_wait_seconds(job, now: float) -> float | None:
+    submitted = (job.meta or {}).get("submitted_at")
+    if submitted is None and job.enqueued_at is not None:
+        submitted = job.enqueued_at.replace(tzinfo=timezone.utc).timestamp()
+    return None if submitted is None else max(0.0, now - float(submitted))
+
+
+def record_job_waits(r: Redis, jobs: list, now: float | None = None) -> None:
+    """Best effort: one pipeline for the whole batch."""
+    now = time.time() if now is None else now
+    try:
+        with r.pipeline(transaction=False) as pipe:
+            for job in jobs:
+                wait = job_wait_seconds(job, now)
+                if wait is None:
+                    continue
+                lane = (job.meta or {}).get("lane", "legacy")
+                QUEUE_WAIT_SECONDS.labels(lane).observe(wait)
+                key = WAIT_KEY_PREFIX + lane
+                pipe.hincrby(key, _bucket(wait), 1)
+                pipe.hincrby(key, "count", 1)
+                pipe.hincrbyfloat(key, "sum", wait)
+            pipe.execute()
+    except (RedisError, OSError):
+        pass
+
+
+def _quantile(buckets: dict[str, int], count: int, q: float) -> float:
+    """Upper bound of the bucket holding the q-quantile."""
+    if not count:
+        return 0.0
+    seen = 0
+    for b in WAIT_BUCKETS:
+        label = "inf" if b == float("inf") else f"{b:g}"
+        seen += buckets.get(label, 0)
+        if seen >= q * count:
+            return b
+    return float("inf")
+
+
+def lane_wait_stats(r: Redis, lanes: list[str]) -> dict:
+    """{lane: {count, mean_s, p50_le_s, p95_le_s}} from the shared histograms."""
+    with r.pipeline(transaction=False) as pipe:
+        for lane in lanes:
+            pipe.hgetall(WAIT_KEY_PREFIX + lane)
+        raw = pipe.execute()
+    out = {}
+    for lane, h in zip(lanes, raw):
+        h = {(k.decode() if isinstance(k, bytes) else k): v for k, v in h.items()}
+        count = int(h.pop("count", 0))
+        total = float(h.pop("sum", 0.0))
+        buckets = {k: int(v) for k, v in h.items()}
+        out[lane] = {
+            "count": count,
+            "mean_s": round(total / count, 3) if count else 0.0,
+            "p50_le_s": _quantile(buckets, count, 0.50),
+            "p95_le_s": _quantile(buckets, count, 0.95),
+        }
+    return out
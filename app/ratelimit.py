@@ -0,0 +1,241 @@
+# app/ratelimit.py
+"""
+Per-client rate limiting: Redis token buckets + a local token lease.
+
+Each request is charged to a bucket keyed by (rule, identity): the JWT `sub` for
+authenticated API calls, the client IP for /auth/* and anonymous calls. Buckets live
+in Redis and are updated by one Lua script (refill + take is atomic, clock = Redis
+TIME), so every API replica shares the same budget.
+
+Fast path: instead of taking one token per request, a replica leases up to
+RATE_LIMIT_LEASE_MAX tokens at once — but never more than half of what's left — and
+spends them locally. A client far under its limit costs one Redis call per lease;
+one near its limit degrades to exact per-request accounting. Leased tokens are
+already deducted in Redis, so leases can only under-admit, never exceed the limit.
+
+If Redis is unreachable the limiter fails open and stops calling Redis for
+RATE_LIMIT_FAILOPEN_SECONDS, so an outage doesn't add a timeout to every request.
+"""
+import hashlib
+import json
+import logging
+import math
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.auth.jwt import decode_token
+from app.config import settings
+from app.deps import get_redis_async
+
+log = logging.getLogger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+
+# KEYS[1] bucket hash; ARGV rate/s, burst, max tokens to lease.
+# Returns {granted, retry_after_ms}.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local want = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or burst
+local ts = tonumber(b[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local granted = 0
+local retry_ms = 0
+if tokens >= 1 then
+  granted = math.max(1, math.min(want, math.floor(tokens / 2)))
+  tokens = tokens - granted
+else
+  retry_ms = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {granted, retry_ms}
+"""
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    method: str       # "*" matches any
+    path_prefix: str
+    rate: float       # tokens per second
+    burst: int
+    by_ip: bool = False
+
+
+# Longest prefix wins; RATE_LIMIT_RULES (JSON list of the same fields) replaces these.
+DEFAULT_RULES = [
+    Rule("login", "POST", "/api/v1/auth/login", rate=0.5, burst=10, by_ip=True),
+    Rule("signup", "POST", "/api/v1/auth/signup", rate=0.2, burst=5, by_ip=True),
+    Rule("auth", "*", "/api/v1/auth", rate=5, burst=20, by_ip=True),
+    Rule("create_note", "POST", "/api/v1/notes", rate=5, burst=20),
+    Rule("api", "*", "/api/", rate=20, burst=60),
+]
+
+
+def load_rules(raw: str) -> list[Rule]:
+    rules = [Rule(**r) for r in json.loads(raw)] if raw.strip() else list(DEFAULT_RULES)
+    return sorted(rules, key=lambda r: len(r.path_prefix), reverse=True)
+
+
+def match_rule(rules: list[Rule], method: str, path: str) -> Optional[Rule]:
+    for r in rules:
+        if path.startswith(r.path_prefix) and r.method in ("*", method):
+            return r
+    return None
+
+
+class _TokenSubjects:
+    """token -> (sub, exp) so the limiter doesn't re-verify the same JWT on every request."""
+
+    def __init__(self, max_size: int = 10_000):
+        self._data: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._max = max_size
+        self._lock = threading.Lock()
+
+    def sub(self, token: str) -> Optional[str]:
+        key = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+        now = time.time()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit and hit[1] > now:
+                self._data.move_to_end(key)
+                return hit[0]
+        try:
+            payload = decode_token(token)
+        except Exception:
+            return None
+        sub, exp = str(payload.get("sub") or ""), float(payload.get("exp") or 0)
+        if not sub:
+            return None
+        with self._lock:
+            self._data[key] = (sub, exp)
+            if len(self._data) > self._max:
+                self._data.popitem(last=False)
+        return sub
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        *,
+        rules: list[Rule],
+        redis_factory: Callable[[], AsyncRedis] = get_redis_async,
+        lease_max: int = 10,
+        lease_ttl: float = 1.0,
+        failopen_seconds: float = 5.0,
+        max_local_keys: int = 100_000,
+    ):
+        self.rules = rules
+        self.redis_factory = redis_factory
+        self.lease_max = lease_max
+        self.lease_ttl = lease_ttl
+        self.failopen_seconds = failopen_seconds
+        self._leases: "OrderedDict[str, list]" = OrderedDict()  # key -> [tokens, expires_at]
+        self._max_local = max_local_keys
+        self._redis_down_until = 0.0
+        self._script = None
+        self.subjects = _TokenSubjects()
+        self.stats = {"local": 0, "redis": 0, "limited": 0, "failopen": 0}
+
+    def _take_local(self, key: str, now: float) -> bool:
+        lease = self._leases.get(key)
+        if lease and lease[0] > 0 and lease[1] > now:
+            lease[0] -= 1
+            return True
+        return False
+
+    async def hit(self, rule: Rule, identity: str) -> tuple[bool, float]:
+        """(allowed, retry_after_seconds) for one request."""
+        key = f"{KEY_PREFIX}{rule.name}:{identity}"
+        now = time.monotonic()
+        if self._take_local(key, now):
+            self.stats["local"] += 1
+            return True, 0.0
+        if now < self._redis_down_until:
+            self.stats["failopen"] += 1
+            return True, 0.0
+
+        try:
+            r = self.redis_factory()
+            if self._script is None or self._script.registered_client is not r:
+                self._script = r.register_script(TOKEN_BUCKET_LUA)
+            granted, retry_ms = await self._script(keys=[key], args=[rule.rate, rule.burst, self.lease_max])
+        except (RedisError, OSError):
+            log.warning("Rate limiter can't reach Redis; failing open for %.0fs", self.failopen_seconds)
+            self._redis_down_until = now + self.failopen_seconds
+            self.stats["failopen"] += 1
+            return True, 0.0
+
+        self.stats["redis"] += 1
+        granted = int(granted)
+        if granted <= 0:
+            self.stats["limited"] += 1
+            return False, int(retry_ms) / 1000.0
+        if granted > 1:
+            self._leases[key] = [granted - 1, now + self.lease_ttl]
+            self._leases.move_to_end(key)
+            if len(self._leases) > self._max_local:
+                self._leases.popitem(last=False)
+        return True, 0.0
+
+    def identity(self, scope: Scope, rule: Rule) -> str:
+        if not rule.by_ip:
+            for name, value in scope.get("headers") or ():
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer" and token:
+                        sub = self.subjects.sub(token.strip())
+                        if sub:
+                            return f"user:{sub}"
+                    break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware), so streaming responses pass through untouched."""
+
+    def __init__(self, app: ASGIApp, limiter: Optional["RateLimiter"] = None):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = self.limiter or rate_limiter
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+        rule = match_rule(limiter.rules, scope["method"], scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        allowed, retry_after = await limiter.hit(rule, limiter.identity(scope, rule))
+        if allowed:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": "Rate limit exceeded"},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+        await response(scope, receive, send)
+
+
+rate_limiter = RateLimiter(
+    rules=load_rules(settings.rate_limit_rules),
+    lease_max=settings.rate_limit_lease_max,
+    failopen_seconds=settings.rate_limit_failopen_seconds,
+)
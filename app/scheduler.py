@@ -0,0 +1,143 @@
+# app/scheduler.py
+"""
+Fair-share feeder for the bulk lane.
+
+Keeps the RQ bulk queue shallow (SCHED_BULK_LOW_WATER jobs): whenever workers drain
+it below that, the next jobs are taken round-robin across users from the FairQueue
+(SCHED_BULK_QUANTUM per user per turn, or the user's weight in sched:bulk:weights).
+A 50k-note import therefore only ever holds a handful of slots, and a second user's
+import starts draining immediately instead of after the first one finishes.
+
+Only one feeder is active at a time (Redis lease), so it is safe to run one per worker host.
+Popped items sit on the feeder's processing list until they are enqueued; a feeder that
+takes the lease first re-enqueues whatever a crashed predecessor left there.
+
+Run with:  python -m app.scheduler
+"""
+import logging
+import os
+import socket
+import time
+
+from redis import Redis
+from redis.exceptions import RedisError
+from rq import Queue
+from rq.job import Job
+
+from app.config import settings
+from app.jobs import BULK, LANES, bulk_queue, enqueue_lane, lane_queue_name, note_job_id
+from app.queue_metrics import lane_wait_stats
+
+log = logging.getLogger("app.scheduler")
+
+LEADER_KEY = "sched:feeder:leader"
+LEADER_TTL_MS = 10_000
+
+# Take the lease if free, or renew it only if it is still ours: one step, so a feeder
+# whose lease just expired can't extend the new leader's.
+HOLD_LEASE_LUA = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+  return 1
+end
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  redis.call('PEXPIRE', KEYS[1], ARGV[2])
+  return 1
+end
+return 0
+"""
+_hold_lease_script = None  # registered on the feeder's Redis client on first use
+
+
+def _release(r: Redis, raw_items: list[str]) -> None:
+    items = []
+    for item in raw_items:
+        note_id, submitted_at = item.split(":", 1)
+        items.append((int(note_id), float(submitted_at)))
+    enqueue_lane(r, lane_queue_name(BULK), BULK, items)
+
+
+def feed_once(r: Redis, feeder: str = "feeder") -> int:
+    """Top the RQ bulk queue up to the low-water mark; returns jobs released."""
+    room = settings.sched_bulk_low_water - r.llen(Queue.redis_queue_namespace_prefix + lane_queue_name(BULK))
+    if room <= 0:
+        return 0
+    fq = bulk_queue(r)
+    processing = fq.processing_key(feeder)
+    popped = fq.pop(room, quantum=settings.sched_bulk_quantum, processing=processing)
+    _release(r, [item for _uid, item in popped])
+    fq.ack(processing)
+    return len(popped)
+
+
+def recover(r: Redis) -> int:
+    """Re-enqueue items feeders popped but never acked; returns jobs released."""
+    fq = bulk_queue(r)
+    released = 0
+    for key, raw_items in fq.in_flight().items():
+        # The feeder may have died after enqueueing: skip jobs RQ already knows about.
+        with r.pipeline(transaction=False) as pipe:
+            for item in raw_items:
+                pipe.exists(Job.key_for(note_job_id(int(item.split(":", 1)[0]))))
+            known = pipe.execute()
+        todo = [item for item, exists in zip(raw_items, known) if not exists]
+        _release(r, todo)
+        fq.ack(key)
+        released += len(todo)
+    return released
+
+
+def _hold_lease(r: Redis, me: str) -> bool:
+    global _hold_lease_script
+    if _hold_lease_script is None or _hold_lease_script.registered_client is not r:
+        _hold_lease_script = r.register_script(HOLD_LEASE_LUA)
+    return bool(_hold_lease_script(keys=[LEADER_KEY], args=[me, LEADER_TTL_MS]))
+
+
+def lane_stats(r: Redis) -> dict:
+    """Backlog and queue-wait per lane."""
+    waits = lane_wait_stats(r, list(LANES))
+    fq = bulk_queue(r)
+    with r.pipeline(transaction=False) as pipe:
+        for lane in LANES:
+            pipe.llen(Queue.redis_queue_namespace_prefix + lane_queue_name(lane))
+        depths = pipe.execute()
+    for lane, depth in zip(LANES, depths):
+        waits[lane]["rq_depth"] = depth
+    waits[BULK]["fair_queue_pending"] = fq.pending()
+    waits[BULK]["fair_queue_users"] = fq.users()
+    return waits
+
+
+def run() -> None:
+    # Job payloads are pickled; keep this connection non-decoding like the workers'.
+    r = Redis.from_url(settings.redis_url)
+    me = f"{socket.gethostname()}:{os.getpid()}"
+    interval = settings.sched_feed_interval_ms / 1000.0
+    log.info("Bulk feeder started (low_water=%d, quantum=%d)", settings.sched_bulk_low_water, settings.sched_bulk_quantum)
+    last_stats = 0.0
+    leading = False
+    while True:
+        try:
+            if not _hold_lease(r, me):
+                leading = False
+                time.sleep(LEADER_TTL_MS / 2000.0)
+                continue
+            if not leading:
+                recovered = recover(r)
+                if recovered:
+                    log.info("Re-enqueued %d bulk jobs left in flight by a previous feeder", recovered)
+                leading = True
+            released = feed_once(r, me)
+            if time.monotonic() - last_stats > 60:
+                log.info("Lane stats: %s", lane_stats(r))
+                last_stats = time.monotonic()
+            if not released:
+                time.sleep(interval)
+        except (RedisError, OSError):
+            log.exception("Feeder lost Redis; retrying")
+            time.sleep(1.0)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run()
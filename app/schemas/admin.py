@@ -1,9 +1,28 @@
 # app/schemas/admin.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 from app.schemas.user import UserInfoOut
-from app.schemas.note import NoteOut
+from app.schemas.note import NoteOut, NoteSummaryOut
 
 class UserWithNotesOut(BaseModel):
     user: UserInfoOut
     notes: List[NoteOut]
+
+class UserWithNoteSummariesOut(BaseModel):
+    user: UserInfoOut
+    notes: List[NoteSummaryOut]
+
+class ProfileInfo(BaseModel):
+    id: str
+    kind: str          # "request" | "job"
+    name: str          # "GET /api/v1/notes/{note_id}" or "summarize_note_job(42)"
+    trigger: str       # "header" | "sampled" | "armed"
+    status: str
+    duration_ms: float
+    created_at: float  # unix seconds
+
+class ArmJobProfilingIn(BaseModel):
+    count: int = Field(1, ge=1, le=100)
+
+class ArmJobProfilingOut(BaseModel):
+    armed: int
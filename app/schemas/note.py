@@ -1,6 +1,13 @@
 from datetime import datetime
 from enum import Enum
-from pydantic import BaseModel, ConfigDict
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field
+
+BULK_MAX_ITEMS = 1000
+NOTE_PREVIEW_CHARS = 200
+
+# list endpoints: "full" = NoteOut, "summary" = NoteSummaryOut (raw_text never read)
+NoteView = Literal["full", "summary"]
 
 class NoteStatus(str, Enum):
     queued = "queued"
@@ -11,6 +18,13 @@ class NoteStatus(str, Enum):
 class NoteCreate(BaseModel):
     raw_text: str
 
+class NoteBulkItem(BaseModel):
+    raw_text: str
+    idempotency_key: str | None = Field(default=None, max_length=64)
+
+class NoteBulkCreate(BaseModel):
+    items: list[NoteBulkItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
 class NoteOut(BaseModel):
     id: int
     raw_text: str
@@ -20,3 +34,23 @@ class NoteOut(BaseModel):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class NoteSummaryOut(BaseModel):
+    """List projection of a note: no raw_text, just its first NOTE_PREVIEW_CHARS characters."""
+    id: int
+    preview: str
+    summary: str | None
+    status: NoteStatus
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+class NoteEvent(BaseModel):
+    """Status change pushed over GET /notes/stream."""
+    id: int
+    status: NoteStatus
+    summary: str | None
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,168 @@
+# app/services/long_doc.py
+"""
+Map-reduce summarization for notes longer than the model's input window.
+
+Instead of letting the tokenizer truncate (silently dropping everything after the
+first window), long texts are split on token boundaries into overlapping chunks,
+every chunk of every note in the batch is summarized together (map), and the joined
+partial summaries are summarized again (reduce). If the joined partials are still
+too long the reduce step recurses; each round shrinks the input by roughly
+chunk_tokens / summary_tokens, so total model work stays linear in note length.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Protocol
+
+log = logging.getLogger(__name__)
+
+
+class Tokenizer(Protocol):
+    def encode(self, text: str, add_special_tokens: bool = ...) -> list[int]: ...
+    def decode(self, ids: list[int], skip_special_tokens: bool = ...) -> str: ...
+
+
+def split_tokens(ids: list[int], chunk_tokens: int, overlap: int) -> list[list[int]]:
+    """Windows of chunk_tokens ids, each sharing `overlap` ids with the previous one."""
+    if len(ids) <= chunk_tokens:
+        return [ids]
+    step = max(1, chunk_tokens - overlap)
+    chunks = []
+    for start in range(0, len(ids), step):
+        chunks.append(ids[start:start + chunk_tokens])
+        if start + chunk_tokens >= len(ids):
+            break
+    return chunks
+
+
+class LongDocStats:
+    """Per-stage counters/timings for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "long_docs": 0,
+            "chunks": 0,
+            "reduce_rounds": 0,
+            "truncated_docs": 0,
+            "tokenize_seconds": 0.0,
+            "map_seconds": 0.0,
+            "reduce_seconds": 0.0,
+        }
+
+    def add(self, **values) -> None:
+        with self._lock:
+            for k, v in values.items():
+                self._stats[k] += v
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {k: round(v, 4) if isinstance(v, float) else v for k, v in self._stats.items()}
+
+
+long_doc_stats = LongDocStats()
+
+
+def _batched(summarize_batch: Callable[[list[str]], list[str]], texts: list[str], batch_size: int) -> list[str]:
+    out: list[str] = []
+    for i in range(0, len(texts), batch_size):
+        out.extend(summarize_batch(texts[i:i + batch_size]))
+    return out
+
+
+def summarize_long(
+    texts: list[str],
+    summarize_batch: Callable[[list[str]], list[str]],
+    tokenizer: Tokenizer,
+    *,
+    chunk_tokens: int,
+    overlap: int,
+    batch_size: int,
+    max_rounds: int = 3,
+) -> list[str]:
+    """
+    Drop-in wrapper around a batch summarizer: texts that fit in chunk_tokens go
+    straight through (in the same batched call as the chunks of long texts); longer
+    ones are map-reduced. Output order matches input order.
+    """
+    started = time.perf_counter()
+    ids = [tokenizer.encode(t or "", add_special_tokens=False) for t in texts]
+    tokenize_s = time.perf_counter() - started
+
+    pending = [i for i, x in enumerate(ids) if len(x) > chunk_tokens]
+    if not pending:
+        long_doc_stats.add(tokenize_seconds=tokenize_s)
+        return summarize_batch(texts)
+
+    long_set = set(pending)
+    direct = [i for i in range(len(texts)) if i not in long_set]
+    out: list[str] = [""] * len(texts)
+    map_s = reduce_s = 0.0
+    n_chunks = rounds = truncated = 0
+
+    while pending:
+        rounds += 1
+        work: list[str] = []
+        owners: list[int] = []
+        for i in pending:
+            windows = split_tokens(ids[i], chunk_tokens, overlap)
+            if rounds >= max_rounds and len(windows) > 1:
+                # bounded depth: keep the first window rather than recursing forever, but say so
+                windows = windows[:1]
+                truncated += 1
+                log.warning("Long note still exceeds %d tokens after %d rounds; truncating", chunk_tokens, rounds)
+            n_chunks += len(windows)
+            work.extend(tokenizer.decode(w, skip_special_tokens=True) for w in windows)
+            owners.extend([i] * len(windows))
+        if rounds == 1:
+            # short notes ride along with the first map pass
+            work.extend(texts[i] for i in direct)
+            owners.extend(direct)
+
+        t0 = time.perf_counter()
+        partials = _batched(summarize_batch, work, batch_size)
+        if rounds == 1:
+            map_s += time.perf_counter() - t0
+        else:
+            reduce_s += time.perf_counter() - t0
+
+        grouped: dict[int, list[str]] = {}
+        for i, part in zip(owners, partials):
+            grouped.setdefault(i, []).append(part)
+        if rounds == 1:
+            for i in direct:
+                out[i] = grouped[i][0]
+
+        # join partials; those that now fit get one final (batched) reduce, the rest recurse
+        final: list[int] = []
+        joined: dict[int, str] = {}
+        next_pending: list[int] = []
+        for i in pending:
+            parts = [p for p in grouped[i] if p]
+            if len(parts) <= 1:
+                out[i] = parts[0] if parts else ""
+                continue
+            joined[i] = "\n".join(parts)
+            ids[i] = tokenizer.encode(joined[i], add_special_tokens=False)
+            (next_pending if len(ids[i]) > chunk_tokens else final).append(i)
+        if final:
+            t0 = time.perf_counter()
+            for i, summary in zip(final, _batched(summarize_batch, [joined[i] for i in final], batch_size)):
+                out[i] = summary
+            reduce_s += time.perf_counter() - t0
+        pending = next_pending
+
+    long_doc_stats.add(
+        long_docs=len(long_set),
+        chunks=n_chunks,
+        reduce_rounds=rounds,
+        truncated_docs=truncated,
+        tokenize_seconds=tokenize_s,
+        map_seconds=map_s,
+        reduce_seconds=reduce_s,
+    )
+    log.info(
+        "Long-doc summarize: %d notes, %d chunks, %d rounds, tokenize %.3fs, map %.3fs, reduce %.3fs",
+        len(long_set), n_chunks, rounds, tokenize_s, map_s, reduce_s,
+    )
+    return out
@@ -0,0 +1,189 @@
+# app/services/note_events.py
+"""
+Note status push over Server-Sent Events.
+
+Workers publish a NoteEvent to `notes:events:{user_id}` whenever a note moves to
+processing/done/failed. Each API process holds ONE pattern subscription
+(`notes:events:*`) and fans messages out to per-connection asyncio queues, so an
+idle SSE client costs a queue and a suspended generator, not a Redis connection.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from app.config import settings
+from app.db import models
+from app.deps import get_redis_async
+from app.schemas.note import NoteEvent
+
+log = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "notes:events:"
+# sentinel put on a subscriber's queue when it fell too far behind; the stream ends and
+# the client reconnects (EventSource does so on its own) to pick up a fresh snapshot
+_OVERFLOW = None
+
+
+def channel(user_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+def publish_note_events(r: Redis, notes: Iterable[models.Note]) -> None:
+    """Publish the current state of each note to its owner's channel. Best effort."""
+    try:
+        pipe = r.pipeline(transaction=False)
+        for n in notes:
+            pipe.publish(channel(n.user_id), NoteEvent.model_validate(n).model_dump_json())
+        pipe.execute()
+    except (RedisError, OSError):
+        log.warning("Could not publish note events; SSE clients will see them on reconnect")
+
+
+class NoteEventBroker:
+    """Process-wide fan-out from one Redis pattern subscription to many local queues."""
+
+    def __init__(
+        self,
+        redis_factory: Callable[[], AsyncRedis] = get_redis_async,
+        queue_size: int = settings.sse_queue_size,
+        subscribe_timeout: float = settings.sse_subscribe_timeout_seconds,
+    ):
+        self.redis_factory = redis_factory
+        self.queue_size = queue_size
+        self.subscribe_timeout = subscribe_timeout
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._task: asyncio.Task | None = None
+        self._ready: asyncio.Event | None = None
+
+    @property
+    def connections(self) -> int:
+        return sum(len(qs) for qs in self._subscribers.values())
+
+    async def subscribe(self, user_id: int) -> asyncio.Queue:
+        """
+        Register a queue for user_id; returns once the Redis subscription is live.
+        Raises asyncio.TimeoutError if it isn't within subscribe_timeout (Redis unreachable).
+        """
+        self._ensure_running()
+        q: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(q)
+        try:
+            await asyncio.wait_for(self._ready.wait(), self.subscribe_timeout)
+        except asyncio.TimeoutError:
+            self.unsubscribe(user_id, q)
+            raise
+        return q
+
+    def unsubscribe(self, user_id: int, q: asyncio.Queue) -> None:
+        qs = self._subscribers.get(user_id)
+        if qs is not None:
+            qs.discard(q)
+            if not qs:
+                del self._subscribers[user_id]
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._ready = asyncio.Event()
+            self._task = loop.create_task(self._run(), name="note-events-broker")
+
+    def _dispatch(self, ch: str, data: str) -> None:
+        try:
+            user_id = int(ch[len(CHANNEL_PREFIX):])
+        except ValueError:
+            return
+        for q in list(self._subscribers.get(user_id, ())):
+            try:
+                q.put_nowait(data)
+            except asyncio.QueueFull:
+                # slow consumer: drop its backlog and tell it to reconnect
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(_OVERFLOW)
+                self.unsubscribe(user_id, q)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.redis_factory().pubsub(ignore_subscribe_messages=True)
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                self._ready.set()
+                backoff = 1.0
+                while True:
+                    msg = await pubsub.get_message(timeout=1.0)
+                    if msg and msg.get("type") == "pmessage":
+                        self._dispatch(str(msg["channel"]), str(msg["data"]))
+            except (RedisError, OSError):
+                self._ready.clear()  # new subscribers wait (bounded) for the reconnect
+                log.warning("Note event subscriber disconnected; retrying in %.0fs", backoff)
+                # connected clients may have missed events: make them reconnect for a snapshot
+                for user_id, qs in list(self._subscribers.items()):
+                    for q in list(qs):
+                        while not q.empty():
+                            q.get_nowait()
+                        q.put_nowait(_OVERFLOW)
+                        self.unsubscribe(user_id, q)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except (RedisError, OSError):
+                        pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+note_events = NoteEventBroker()
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def stream_note_events(
+    user_id: int,
+    snapshot: Callable[[], Awaitable[list[NoteEvent]]],
+    broker: NoteEventBroker = note_events,
+    heartbeat: float = settings.sse_heartbeat_seconds,
+) -> AsyncIterator[str]:
+    """
+    SSE body for one client: subscribe first, then send the pending-note snapshot (so
+    nothing between the two is lost), then live events with comment heartbeats that
+    keep proxies from closing idle connections. If the subscription can't be made the
+    stream ends at once and the client retries.
+    """
+    try:
+        q = await broker.subscribe(user_id)
+    except asyncio.TimeoutError:
+        yield "retry: 3000\n\n"
+        return
+    try:
+        yield "retry: 3000\n\n"
+        for ev in await snapshot():
+            yield _sse("note", ev.model_dump_json())
+        while True:
+            try:
+                data = await asyncio.wait_for(q.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if data is _OVERFLOW:
+                return
+            yield _sse("note", data)
+    finally:
+        broker.unsubscribe(user_id, q)
@@ -0,0 +1,203 @@
+# app/services/notes.py
+"""
+Race-free idempotent note creation.
+
+Keyed inserts use INSERT ... ON CONFLICT DO NOTHING RETURNING (Postgres/SQLite): a row that
+comes back was created by us; no row means the key is taken, possibly by a request that
+committed a moment ago, and the existing note is read instead. Either way a duplicate
+key can no longer surface as an IntegrityError/500.
+
+Created notes get their summarize job in the same transaction (app.outbox.stage_jobs,
+and a NOTIFY for the pg backend), so a committed note always has a job behind it.
+"""
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.jobs import BULK, INTERACTIVE
+from app.outbox import stage_jobs, stage_jobs_async
+from app.pg_queue import notify_queued, notify_queued_async
+from app.schemas.note import NoteBulkItem, NoteOut
+
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def note_insert(dialect_name: str, *, skip_conflicts: bool):
+    """INSERT INTO notes; with skip_conflicts, rows hitting uq_user_id_idempotency_key are dropped."""
+    make_insert = _UPSERT_INSERTS.get(dialect_name)
+    if make_insert is None:
+        return insert(models.Note)
+    stmt = make_insert(models.Note)
+    if skip_conflicts:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "idempotency_key"])
+    return stmt
+
+
+def existing_keys_stmt(user_id: int, keys: set[str]):
+    return select(models.Note).where(
+        models.Note.user_id == user_id,
+        models.Note.idempotency_key.in_(keys),
+    )
+
+
+def _row(user_id: int, raw_text: str, idempotency_key: str | None) -> dict:
+    return {
+        "user_id": user_id,
+        "raw_text": raw_text,
+        "status": models.NoteStatus.queued.value,
+        "idempotency_key": idempotency_key,
+    }
+
+
+def _single_insert_stmt(dialect_name: str, row: dict):
+    stmt = note_insert(dialect_name, skip_conflicts=bool(row["idempotency_key"]))
+    return stmt.values(**row).returning(models.Note)
+
+
+# ---------- single note ----------
+def create_note_idempotent(
+    db: Session, user_id: int, raw_text: str, idempotency_key: str | None
+) -> tuple[NoteOut, bool]:
+    """
+    Insert the note, or return the one already stored under (user_id, idempotency_key).
+    Returns (note, created); only created notes need a summarize job.
+    """
+    stmt = _single_insert_stmt(db.get_bind().dialect.name, _row(user_id, raw_text, idempotency_key))
+    try:
+        note = db.scalars(stmt).first()
+    except IntegrityError:
+        # dialects without ON CONFLICT support: the loser of the race lands here
+        if not idempotency_key:
+            raise
+        db.rollback()
+        note = None
+    if note is not None:
+        out = NoteOut.model_validate(note)  # before commit expires it
+        stage_jobs(db, [note.id], lane=INTERACTIVE, user_id=user_id)
+        notify_queued(db)
+        db.commit()
+        return out, True
+
+    existing = db.scalars(existing_keys_stmt(user_id, {idempotency_key})).one()
+    return NoteOut.model_validate(existing), False
+
+
+async def create_note_idempotent_async(
+    db: AsyncSession, user_id: int, raw_text: str, idempotency_key: str | None
+) -> tuple[NoteOut, bool]:
+    """Async twin of create_note_idempotent."""
+    stmt = _single_insert_stmt(db.get_bind().dialect.name, _row(user_id, raw_text, idempotency_key))
+    try:
+        note = (await db.scalars(stmt)).first()
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        await db.rollback()
+        note = None
+    if note is not None:
+        out = NoteOut.model_validate(note)
+        await stage_jobs_async(db, [note.id], lane=INTERACTIVE, user_id=user_id)
+        await notify_queued_async(db)
+        await db.commit()
+        return out, True
+
+    existing = (await db.scalars(existing_keys_stmt(user_id, {idempotency_key}))).one()
+    return NoteOut.model_validate(existing), False
+
+
+# ---------- bulk ----------
+def _bulk_rows(user_id: int, items: list[NoteBulkItem], existing: dict[str, models.Note]) -> tuple[list[dict], list[dict]]:
+    """(unkeyed rows, keyed rows) still to insert; keys already stored or repeated earlier are skipped."""
+    seen = set(existing)
+    plain, keyed = [], []
+    for item in items:
+        key = item.idempotency_key
+        if key:
+            if key in seen:
+                continue
+            seen.add(key)
+            keyed.append(_row(user_id, item.raw_text, key))
+        else:
+            plain.append(_row(user_id, item.raw_text, None))
+    return plain, keyed
+
+
+def _plain_insert_stmt(dialect_name: str):
+    # no key -> no conflict possible, so rows map back 1:1 in parameter order
+    return note_insert(dialect_name, skip_conflicts=False).returning(models.Note, sort_by_parameter_order=True)
+
+
+def _keyed_insert_stmt(dialect_name: str):
+    # rows lost to a concurrent insert are skipped and matched back by key instead
+    return note_insert(dialect_name, skip_conflicts=True).returning(models.Note)
+
+
+def _bulk_response(
+    items: list[NoteBulkItem], by_key: dict[str, models.Note], plain_created: list[models.Note]
+) -> list[NoteOut]:
+    """One NoteOut per request item, in request order; repeated keys resolve to the same note."""
+    fresh = iter(plain_created)
+    return [
+        NoteOut.model_validate(by_key[i.idempotency_key] if i.idempotency_key else next(fresh))
+        for i in items
+    ]
+
+
+def create_notes_bulk(db: Session, user_id: int, items: list[NoteBulkItem]) -> tuple[list[NoteOut], list[int]]:
+    """
+    One key lookup, at most two multi-row INSERT ... RETURNING statements, one commit.
+    Returns (notes in request order, ids that were actually created).
+    """
+    dialect = db.get_bind().dialect.name
+    keys = {i.idempotency_key for i in items if i.idempotency_key}
+    by_key = {n.idempotency_key: n for n in db.scalars(existing_keys_stmt(user_id, keys))} if keys else {}
+
+    plain, keyed = _bulk_rows(user_id, items, by_key)
+    plain_created = db.scalars(_plain_insert_stmt(dialect), plain).all() if plain else []
+    keyed_created = db.scalars(_keyed_insert_stmt(dialect), keyed).all() if keyed else []
+    by_key.update({n.idempotency_key: n for n in keyed_created})
+
+    lost = keys - by_key.keys()
+    if lost:
+        by_key.update({n.idempotency_key: n for n in db.scalars(existing_keys_stmt(user_id, lost))})
+
+    # serialize before commit expires the instances (avoids a refresh per row)
+    out = _bulk_response(items, by_key, plain_created)
+    created_ids = [n.id for n in [*plain_created, *keyed_created]]
+    if created_ids:
+        stage_jobs(db, created_ids, lane=BULK, user_id=user_id)
+        notify_queued(db)
+    db.commit()
+    return out, created_ids
+
+
+async def create_notes_bulk_async(
+    db: AsyncSession, user_id: int, items: list[NoteBulkItem]
+) -> tuple[list[NoteOut], list[int]]:
+    """Async twin of create_notes_bulk."""
+    dialect = db.get_bind().dialect.name
+    keys = {i.idempotency_key for i in items if i.idempotency_key}
+    by_key = {}
+    if keys:
+        by_key = {n.idempotency_key: n for n in await db.scalars(existing_keys_stmt(user_id, keys))}
+
+    plain, keyed = _bulk_rows(user_id, items, by_key)
+    plain_created = (await db.scalars(_plain_insert_stmt(dialect), plain)).all() if plain else []
+    keyed_created = (await db.scalars(_keyed_insert_stmt(dialect), keyed)).all() if keyed else []
+    by_key.update({n.idempotency_key: n for n in keyed_created})
+
+    lost = keys - by_key.keys()
+    if lost:
+        by_key.update({n.idempotency_key: n for n in await db.scalars(existing_keys_stmt(user_id, lost))})
+
+    out = _bulk_response(items, by_key, plain_created)
+    created_ids = [n.id for n in [*plain_created, *keyed_created]]
+    if created_ids:
+        await stage_jobs_async(db, created_ids, lane=BULK, user_id=user_id)
+        await notify_queued_async(db)
+    await db.commit()
+    return out, created_ids
@@ -1,8 +1,75 @@
 # app/services/summarize.py
 import os
-from app.services.summarize_llm import summarize_text_llm
+import time
 
-BACKEND = os.getenv("SUMMARIZER_BACKEND", "llm").lower()  # "llm" or "rule"
+from app.deps import get_redis
+from app.metrics import MODEL_SECONDS
+from app.services import summarize_llm, summarize_onnx
+from app.services.long_doc import long_doc_stats, summarize_long
+from app.services.summarize_llm import (
+    MODEL_LOCAL_DIR,
+    SUMMARIZER_MODEL,
+    SUM_MAX_INPUT_TOKENS,
+    SUM_MAX_OUTPUT_TOKENS,
+    SUM_MIN_OUTPUT_TOKENS,
+    _prefix,
+    summarize_texts_llm,
+)
+from app.services.summarize_onnx import ONNX_MODEL_DIR, ONNX_QUANTIZED, summarize_texts_onnx
+from app.services.summary_cache import SummaryCache, cache_key
+
+BACKEND = os.getenv("SUMMARIZER_BACKEND", "llm").lower()  # "llm", "onnx" or "rule"
+
+# Long notes: map-reduce over overlapping token windows instead of truncating (0 disables)
+SUM_LONG_DOC_ENABLED = os.getenv("SUM_LONG_DOC_ENABLED", "1") == "1"
+SUM_CHUNK_OVERLAP_TOKENS = int(os.getenv("SUM_CHUNK_OVERLAP_TOKENS", "64"))
+SUM_CHUNK_BATCH_SIZE = int(os.getenv("SUM_CHUNK_BATCH_SIZE", "16"))
+SUM_REDUCE_MAX_ROUNDS = int(os.getenv("SUM_REDUCE_MAX_ROUNDS", "3"))
+
+# Summary cache (model backends only; the rule backend is cheaper than a lookup)
+SUM_CACHE_ENABLED = os.getenv("SUM_CACHE_ENABLED", "1") == "1"
+SUM_CACHE_LOCAL_SIZE = int(os.getenv("SUM_CACHE_LOCAL_SIZE", "1024"))
+SUM_CACHE_TTL_SECONDS = int(os.getenv("SUM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+SUM_CACHE_REDIS_MAX_ENTRIES = int(os.getenv("SUM_CACHE_REDIS_MAX_ENTRIES", "100000"))
+
+summary_cache = SummaryCache(
+    redis_factory=get_redis,
+    local_size=SUM_CACHE_LOCAL_SIZE,
+    ttl_seconds=SUM_CACHE_TTL_SECONDS,
+    redis_max_entries=SUM_CACHE_REDIS_MAX_ENTRIES,
+)
+
+def _model_id() -> str:
+    if BACKEND == "onnx":
+        # int8 output can differ from fp32, so the two must not share cache entries
+        model = f"onnx:{ONNX_MODEL_DIR}:{'int8' if ONNX_QUANTIZED else 'fp32'}"
+    else:
+        model = f"{BACKEND}:{MODEL_LOCAL_DIR or SUMMARIZER_MODEL}"
+    if SUM_LONG_DOC_ENABLED:
+        model += f":chunk{SUM_MAX_INPUT_TOKENS}/{SUM_CHUNK_OVERLAP_TOKENS}/{SUM_REDUCE_MAX_ROUNDS}"
+    return model
+
+def _summarize_batch(texts: list[str]) -> list[str]:
+    with MODEL_SECONDS.labels(BACKEND).time():
+        if BACKEND == "onnx":
+            return summarize_texts_onnx(texts)
+        return summarize_texts_llm(texts)
+
+def _summarize_model(texts: list[str]) -> list[str]:
+    if not SUM_LONG_DOC_ENABLED:
+        return _summarize_batch(texts)
+    tokenizer = (summarize_onnx if BACKEND == "onnx" else summarize_llm).get_tokenizer()
+    # window budget leaves room for the task prefix and special tokens the model adds
+    reserve = len(tokenizer.encode(_prefix(), add_special_tokens=False)) + tokenizer.num_special_tokens_to_add()
+    return summarize_long(
+        texts,
+        _summarize_batch,
+        tokenizer,
+        chunk_tokens=SUM_MAX_INPUT_TOKENS - reserve,
+        overlap=SUM_CHUNK_OVERLAP_TOKENS,
+        batch_size=SUM_CHUNK_BATCH_SIZE,
+        max_rounds=SUM_REDUCE_MAX_ROUNDS,
+    )
 
 def summarize_text_rule(text: str) -> str:
     t = (text or "").strip()
@@ -13,4 +80,48 @@ def summarize_text_rule(text: str) -> str:
 def summarize_text(text: str) -> str:
     if BACKEND == "rule":
         return summarize_text_rule(text)
-    return summarize_text_llm(text)
+    return summarize_texts([text])[0]
+
+def summarize_texts(texts: list[str]) -> list[str]:
+    """Batch variant of summarize_text; one model call for all cache misses."""
+    if BACKEND == "rule":
+        return [summarize_text_rule(t) for t in texts]
+    if not SUM_CACHE_ENABLED:
+        return _summarize_model(texts)
+
+    keys = [
+        cache_key(t, model_id=_model_id(), max_tokens=SUM_MAX_OUTPUT_TOKENS, min_tokens=SUM_MIN_OUTPUT_TOKENS)
+        for t in texts
+    ]
+    out = summary_cache.get_many(keys)
+
+    # Identical texts inside one batch only go through the model once.
+    miss_keys = list(dict.fromkeys(k for k, v in zip(keys, out) if v is None))
+    if miss_keys:
+        first_text = {}
+        for k, t in zip(keys, texts):
+            first_text.setdefault(k, t)
+        started = time.perf_counter()
+        fresh = _summarize_model([first_text[k] for k in miss_keys])
+        summary_cache.record_model_time(time.perf_counter() - started)
+
+        by_key = dict(zip(miss_keys, fresh))
+        summary_cache.put_many({k: v for k, v in by_key.items() if v}, now=time.time())
+        out = [v if v is not None else by_key[k] for k, v in zip(keys, out)]
+    return out
+
+def warm_up() -> float:
+    """Load the model and run one tiny batch so the first real job doesn't pay for it."""
+    if BACKEND == "rule":
+        return 0.0
+    started = time.perf_counter()
+    _summarize_batch(["Warm-up note: load weights and initialize the runtime."])
+    return time.perf_counter() - started
+
+def cache_stats() -> dict:
+    """Hit/miss counters for this process and across all workers."""
+    return {"process": summary_cache.stats(), "shared": summary_cache.shared_stats()}
+
+def long_doc_summary_stats() -> dict:
+    """Chunk counts and per-stage (tokenize/map/reduce) timings for this process."""
+    return long_doc_stats.stats()
@@ -1,7 +1,6 @@
 # app/services/summarize_llm.py
 import os
 from functools import lru_cache
-from transformers import pipeline
 
 SUM_MAX_INPUT_TOKENS = int(os.getenv("SUM_MAX_INPUT_TOKENS", "512"))
 SUM_MAX_OUTPUT_TOKENS = int(os.getenv("SUM_MAX_OUTPUT_TOKENS", "128"))
@@ -24,7 +23,10 @@ def _get_pipeline():
     """
     Prefer a local baked directory (MODEL_LOCAL_DIR). If not present and we're online,
     fall back to the Hub id (SUMMARIZER_MODEL). In offline mode without local files, error.
+    transformers (and torch) are imported here, on first use, so importing this module stays cheap.
     """
+    from transformers import pipeline
+
     kwargs = dict(
         task="summarization",
         framework="pt",
@@ -46,18 +48,36 @@ def _get_pipeline():
     # Online fallback (not recommended for Koyeb)
     return pipeline(model=SUMMARIZER_MODEL, tokenizer=SUMMARIZER_MODEL, **kwargs)
 
-def summarize_text_llm(text: str) -> str:
-    pipe = _get_pipeline()
+def get_tokenizer():
+    return _get_pipeline().tokenizer
+
+def _prefix() -> str:
     # T5 benefits from "summarize:" prefix; harmless for others.
-    prefix = "summarize: " if "t5" in (MODEL_LOCAL_DIR + SUMMARIZER_MODEL).lower() else ""
-    t = (text or "").strip()
-    if not t:
-        return ""
+    return "summarize: " if "t5" in (MODEL_LOCAL_DIR + SUMMARIZER_MODEL).lower() else ""
+
+def summarize_text_llm(text: str) -> str:
+    return summarize_texts_llm([text])[0]
 
+def summarize_texts_llm(texts: list[str]) -> list[str]:
+    """
+    Summarize several texts with a single padded forward pass.
+    Output order matches input order; empty inputs map to "" without touching the model.
+    """
+    cleaned = [(t or "").strip() for t in texts]
+    out = [""] * len(cleaned)
+    todo = [i for i, t in enumerate(cleaned) if t]
+    if not todo:
+        return out
+
+    pipe = _get_pipeline()
+    prefix = _prefix()
     outs = pipe(
-        prefix + t,
+        [prefix + cleaned[i] for i in todo],
+        batch_size=len(todo),
         truncation=True,
         max_length=SUM_MAX_OUTPUT_TOKENS,
         min_length=SUM_MIN_OUTPUT_TOKENS,
     )
-    return (outs[0]["summary_text"] or "").strip()
+    for i, o in zip(todo, outs):
+        out[i] = (o["summary_text"] or "").strip()
+    return out
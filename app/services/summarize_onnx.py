@@ -0,0 +1,98 @@
+# app/services/summarize_onnx.py
+"""
+ONNX Runtime backend (SUMMARIZER_BACKEND=onnx).
+
+Runs the encoder/decoder exported by `python -m app.export_onnx` (int8 dynamic
+quantization, decoder-with-past so generation reuses the KV cache instead of
+re-running the decoder over the whole prefix each step). optimum/onnxruntime are
+imported on first use so the other backends don't need them installed.
+"""
+import os
+from functools import lru_cache
+
+from app.services.summarize_llm import (
+    HF_OFFLINE,
+    MODEL_LOCAL_DIR,
+    SUM_MAX_INPUT_TOKENS,
+    SUM_MAX_OUTPUT_TOKENS,
+    SUM_MIN_OUTPUT_TOKENS,
+    _prefix,
+)
+
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "").strip() or (
+    os.path.join(MODEL_LOCAL_DIR, "onnx") if MODEL_LOCAL_DIR else ""
+)
+ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "1") == "1"
+ONNX_NUM_THREADS = int(os.getenv("ONNX_NUM_THREADS", "0"))  # 0 = let ORT decide
+
+ONNX_FILES = ("encoder_model", "decoder_model", "decoder_with_past_model")
+
+
+def onnx_file_names(quantized: bool = ONNX_QUANTIZED) -> dict:
+    suffix = "_quantized.onnx" if quantized else ".onnx"
+    enc, dec, dec_past = (name + suffix for name in ONNX_FILES)
+    return {"encoder_file_name": enc, "decoder_file_name": dec, "decoder_with_past_file_name": dec_past}
+
+
+@lru_cache(maxsize=1)
+def _get_model():
+    """Load (tokenizer, model, generation kwargs) once per process."""
+    if not ONNX_MODEL_DIR or not os.path.isdir(ONNX_MODEL_DIR):
+        raise RuntimeError(
+            f"ONNX_MODEL_DIR '{ONNX_MODEL_DIR}' not found. Run `python -m app.export_onnx` "
+            f"(writes into MODEL_LOCAL_DIR/onnx by default)."
+        )
+
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer
+
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if ONNX_NUM_THREADS > 0:
+        opts.intra_op_num_threads = ONNX_NUM_THREADS
+
+    tokenizer = AutoTokenizer.from_pretrained(ONNX_MODEL_DIR, local_files_only=HF_OFFLINE)
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        ONNX_MODEL_DIR,
+        use_cache=True,
+        provider="CPUExecutionProvider",
+        session_options=opts,
+        local_files_only=HF_OFFLINE,
+        **onnx_file_names(),
+    )
+
+    # Same decoding settings the HF summarization pipeline would apply for this model
+    # (beam count, length penalty, ...), so quality matches the PyTorch backend.
+    gen_kwargs = dict((model.config.task_specific_params or {}).get("summarization", {}))
+    gen_kwargs.pop("prefix", None)
+    gen_kwargs.update(max_length=SUM_MAX_OUTPUT_TOKENS, min_length=SUM_MIN_OUTPUT_TOKENS)
+    return tokenizer, model, gen_kwargs
+
+
+def get_tokenizer():
+    return _get_model()[0]
+
+
+def summarize_texts_onnx(texts: list[str]) -> list[str]:
+    """Same contract as summarize_texts_llm: one padded generate() call, order preserved."""
+    cleaned = [(t or "").strip() for t in texts]
+    out = [""] * len(cleaned)
+    todo = [i for i, t in enumerate(cleaned) if t]
+    if not todo:
+        return out
+
+    tokenizer, model, gen_kwargs = _get_model()
+    prefix = _prefix()
+    enc = tokenizer(
+        [prefix + cleaned[i] for i in todo],
+        padding=True,
+        truncation=True,
+        max_length=SUM_MAX_INPUT_TOKENS,
+        return_tensors="pt",
+    )
+    ids = model.generate(**enc, **gen_kwargs)
+    decoded = tokenizer.batch_decode(ids, skip_special_tokens=True, clean_up_tokenization_spaces=True)
+    for i, text in zip(todo, decoded):
+        out[i] = (text or "").strip()
+    return out
@@ -0,0 +1,165 @@
+# app/services/summary_cache.py
+"""
+Content-addressed cache for model summaries.
+
+Key = sha256(normalized text + model id + generation params), so the same pasted
+boilerplate is summarized once no matter how many notes contain it.
+Two tiers: a small in-process LRU, then a shared Redis tier (TTL + bounded size).
+"""
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from redis import Redis
+from redis.exceptions import RedisError
+
+KEY_PREFIX = "sumcache:v1:"
+INDEX_KEY = "sumcache:index"   # zset: key -> insertion time, used for size-bounded eviction
+STATS_KEY = "sumcache:stats"   # hash: shared hit/miss counters across workers
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalize and collapse whitespace so trivially different copies share a key."""
+    t = unicodedata.normalize("NFC", text or "")
+    return " ".join(t.split())
+
+
+def cache_key(text: str, *, model_id: str, max_tokens: int, min_tokens: int) -> str:
+    h = hashlib.sha256()
+    h.update(f"{model_id}\x00{max_tokens}\x00{min_tokens}\x00".encode())
+    h.update(normalize_text(text).encode())
+    return KEY_PREFIX + h.hexdigest()
+
+
+class SummaryCache:
+    def __init__(
+        self,
+        *,
+        redis_factory: Optional[Callable[[], Redis]],
+        local_size: int = 1024,
+        ttl_seconds: int = 7 * 24 * 3600,
+        redis_max_entries: int = 100_000,
+    ):
+        self._redis_factory = redis_factory
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        self._local_size = local_size
+        self._ttl = ttl_seconds
+        self._redis_max = redis_max_entries
+        self._lock = threading.Lock()
+        self._stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "model_seconds": 0.0,
+        }
+
+    # ---- counters ----
+    def stats(self) -> dict:
+        """Process-local counters plus an estimate of model time saved by hits."""
+        with self._lock:
+            s = dict(self._stats)
+        hits = s["local_hits"] + s["redis_hits"]
+        lookups = hits + s["misses"]
+        avg_miss = s["model_seconds"] / s["misses"] if s["misses"] else 0.0
+        s["hit_ratio"] = hits / lookups if lookups else 0.0
+        s["est_seconds_saved"] = hits * avg_miss
+        return s
+
+    def record_model_time(self, seconds: float) -> None:
+        with self._lock:
+            self._stats["model_seconds"] += seconds
+
+    def _count(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[field] += n
+
+    # ---- local tier ----
+    def _local_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            val = self._local.get(key)
+            if val is not None:
+                self._local.move_to_end(key)
+            return val
+
+    def _local_put(self, key: str, value: str) -> None:
+        if self._local_size <= 0:
+            return
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_size:
+                self._local.popitem(last=False)
+
+    def _redis(self) -> Optional[Redis]:
+        return self._redis_factory() if self._redis_factory else None
+
+    # ---- public API ----
+    def get_many(self, keys: list[str]) -> list[Optional[str]]:
+        out: list[Optional[str]] = [self._local_get(k) for k in keys]
+        local_hits = sum(1 for v in out if v is not None)
+        redis_hits = 0
+
+        pending = [i for i, v in enumerate(out) if v is None]
+        r = self._redis()
+        if pending and r is not None:
+            try:
+                values = r.mget([keys[i] for i in pending])
+            except RedisError:
+                values = [None] * len(pending)
+            for i, v in zip(pending, values):
+                if v is not None:
+                    out[i] = v
+                    self._local_put(keys[i], v)
+            redis_hits = sum(1 for v in values if v is not None)
+
+        misses = sum(1 for v in out if v is None)
+        self._count("local_hits", local_hits)
+        self._count("redis_hits", redis_hits)
+        self._count("misses", misses)
+        if r is not None and keys:
+            # shared counters come from the same `out` as the local ones, in one go
+            try:
+                with r.pipeline(transaction=False) as pipe:
+                    pipe.hincrby(STATS_KEY, "lookups", len(keys))
+                    pipe.hincrby(STATS_KEY, "hits", local_hits + redis_hits)
+                    pipe.hincrby(STATS_KEY, "misses", misses)
+                    pipe.execute()
+            except RedisError:
+                pass
+        return out
+
+    def put_many(self, items: dict[str, str], now: float) -> None:
+        for k, v in items.items():
+            self._local_put(k, v)
+
+        r = self._redis()
+        if not items or r is None:
+            return
+        try:
+            with r.pipeline(transaction=False) as pipe:
+                for k, v in items.items():
+                    pipe.setex(k, self._ttl, v)
+                pipe.zadd(INDEX_KEY, {k: now for k in items})
+                # entries whose TTL already expired no longer count toward the bound
+                pipe.zremrangebyscore(INDEX_KEY, "-inf", now - self._ttl)
+                pipe.zcard(INDEX_KEY)
+                size = pipe.execute()[-1]
+            if size > self._redis_max:
+                evicted = [k for k, _ in r.zpopmin(INDEX_KEY, size - self._redis_max)]
+                if evicted:
+                    r.delete(*evicted)
+        except RedisError:
+            pass
+
+    def shared_stats(self) -> dict:
+        """Counters aggregated across all workers sharing the Redis tier."""
+        r = self._redis()
+        if r is None:
+            return {}
+        try:
+            raw = r.hgetall(STATS_KEY) or {}
+        except RedisError:
+            return {}
+        return {k: int(v) for k, v in raw.items()}
@@ -1,10 +1,23 @@
 # app/worker_jobs.py
+import logging
+import traceback
+from datetime import datetime
+
+from rq import get_current_job
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from tenacity import retry, wait_exponential, stop_after_attempt
 
 from app.db.session import SessionLocal
 from app.db import models
-from app.services.summarize import summarize_text  # <- use the new API
+from app.deps import get_redis
+from app.metrics import NOTE_TIME_TO_DONE
+from app.profiling import profiled_job
+from app.queue_metrics import record_job_waits
+from app.services.note_events import publish_note_events
+from app.services.summarize import summarize_text, summarize_texts  # <- use the new API
+
+log = logging.getLogger(__name__)
 
 
 @retry(wait=wait_exponential(min=1, max=10), stop=stop_after_attempt(3), reraise=True)
@@ -12,8 +25,23 @@ def _summarize_with_retry(text: str) -> str:
     return summarize_text(text)
 
 
+@retry(wait=wait_exponential(min=1, max=10), stop=stop_after_attempt(3), reraise=True)
+def _summarize_batch_with_retry(texts: list[str]) -> list[str]:
+    return summarize_texts(texts)
+
+
+def _record_time_to_done(notes) -> None:
+    now = datetime.utcnow()  # created_at is naive UTC
+    for n in notes:
+        NOTE_TIME_TO_DONE.labels(n.status).observe(max(0.0, (now - n.created_at).total_seconds()))
+
+
+@profiled_job
 def summarize_note_job(note_id: int) -> None:
     """Background job: summarize a note and store result. Idempotent + retries."""
+    job = get_current_job()
+    if job is not None:
+        record_job_waits(job.connection, [job])
     db: Session = SessionLocal()
     try:
         note = db.get(models.Note, note_id)
@@ -27,6 +55,7 @@ def summarize_note_job(note_id: int) -> None:
         # Mark processing
         note.status = "processing"
         db.commit()
+        publish_note_events(get_redis(), [note])
 
         try:
             summary = _summarize_with_retry(note.raw_text or "")
@@ -37,5 +66,133 @@ def summarize_note_job(note_id: int) -> None:
             raise
         finally:
             db.commit()
+            publish_note_events(get_redis(), [note])
+            _record_time_to_done([note])
+    finally:
+        db.close()
+
+
+def _publish_batch(db: Session, ids: list[int]) -> list[models.Note]:
+    # one SELECT refreshes every expired note before publishing, instead of one per note
+    notes = db.scalars(select(models.Note).where(models.Note.id.in_(ids))).all()
+    publish_note_events(get_redis(), notes)
+    return notes
+
+
+class NotesFailed(Exception):
+    """Raised by summarize_notes_batch after the rest of the batch was saved; errors: note id -> traceback."""
+
+    def __init__(self, errors: dict[int, str]):
+        super().__init__(f"{len(errors)} notes failed to summarize")
+        self.errors = errors
+
+
+def _summarize_each_on_failure(texts: list[str], ids: list[int], errors: dict[int, str]) -> list[str | None]:
+    """One batched call; if it fails, one call per text so a bad note doesn't fail its neighbours."""
+    try:
+        return _summarize_batch_with_retry(texts)
+    except Exception:
+        if len(texts) == 1:
+            errors[ids[0]] = traceback.format_exc()
+            return [None]
+        log.exception("Batch of %d notes failed, retrying one by one", len(texts))
+    out: list[str | None] = []
+    for note_id, text in zip(ids, texts):
+        try:
+            out.append(_summarize_batch_with_retry([text])[0])
+        except Exception:
+            errors[note_id] = traceback.format_exc()
+            out.append(None)
+    return out
+
+
+@profiled_job
+def summarize_notes_batch(note_ids: list[int]) -> list[int]:
+    """
+    Batch counterpart of summarize_note_job: one padded model call for all notes,
+    results written back in a single transaction. Returns the ids actually summarized.
+    If the batch call fails each note is retried alone; notes that still fail are saved
+    as failed with the rest and reported by raising NotesFailed.
+    """
+    db: Session = SessionLocal()
+    try:
+        notes = (
+            db.query(models.Note)
+            .filter(models.Note.id.in_(note_ids))
+            .order_by(models.Note.id.asc())
+            .all()
+        )
+        # Idempotency: skip notes that are already summarized
+        notes = [n for n in notes if not (n.status == "done" and n.summary)]
+        if not notes:
+            return []
+
+        ids = [n.id for n in notes]
+        for n in notes:
+            n.status = "processing"
+        db.commit()
+        _publish_batch(db, ids)
+
+        errors: dict[int, str] = {}
+        try:
+            summaries = _summarize_each_on_failure([n.raw_text or "" for n in notes], ids, errors)
+            for n, summary in zip(notes, summaries):
+                if n.id in errors:
+                    n.status = "failed"
+                else:
+                    n.summary = summary
+                    n.status = "done"
+        except Exception:
+            for n in notes:
+                n.status = "failed"
+            raise
+        finally:
+            # every note's final status is committed and published once, after its own attempt
+            db.commit()
+            _record_time_to_done(_publish_batch(db, ids))
+        if errors:
+            raise NotesFailed(errors)
+        return ids
     finally:
         db.close()
+
+
+def summarize_claimed_notes(db: Session, note_ids: list[int], max_attempts: int, worker_id: str) -> None:
+    """
+    QUEUE_BACKEND=pg counterpart of summarize_notes_batch: the notes are already claimed
+    (status processing, leased) by app.pg_queue. A failed batch goes back to queued,
+    not claimable before its retry time, until a note has used max_attempts; then failed.
+    Results are written only where locked_by is still worker_id: a note whose lease ran
+    out and was reclaimed belongs to its new owner.
+    """
+    from app.pg_queue import retry_at
+
+    notes = db.scalars(
+        select(models.Note).where(models.Note.id.in_(note_ids)).order_by(models.Note.id.asc())
+    ).all()
+    publish_note_events(get_redis(), notes)
+    try:
+        summaries = _summarize_batch_with_retry([n.raw_text or "" for n in notes])
+        changes = {n.id: {"summary": s, "status": "done", "lease_expires_at": None} for n, s in zip(notes, summaries)}
+    except Exception:
+        log.exception("Batch of %d claimed notes failed", len(notes))
+        now = datetime.utcnow()
+        changes = {}
+        for n in notes:
+            status = "failed" if n.attempts >= max_attempts else "queued"
+            changes[n.id] = {"status": status, "lease_expires_at": retry_at(n.attempts, now) if status == "queued" else None}
+
+    kept = []
+    for note_id, values in changes.items():
+        result = db.execute(
+            update(models.Note)
+            .where(models.Note.id == note_id, models.Note.locked_by == worker_id)
+            .values(locked_by=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            kept.append(note_id)
+    db.commit()
+    if len(kept) < len(changes):
+        log.warning("Lost the lease on %d notes; left them to their new owner", len(changes) - len(kept))
+    _record_time_to_done([n for n in _publish_batch(db, kept) if n.status != "queued"])
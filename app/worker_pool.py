@@ -0,0 +1,187 @@
+# app/worker_pool.py
+"""
+Pool of persistent, model-holding worker processes (WORKER_MODE=pool).
+
+`rq worker` forks a fresh work-horse per job, so the lru_cached pipeline is loaded
+again after every fork. Here a small supervisor starts WORKER_CONCURRENCY children
+with the *spawn* start method; each child pins its intra-op thread count, loads and
+warms the model once, then consumes the RQ queue in-process (SimpleWorker, or the
+batching loop with WORKER_POOL_LOOP=batch) for its whole life. Dead children are
+restarted with backoff.
+
+The parent never imports torch: forking a process that already started OpenMP/MKL
+thread pools can deadlock, so each child loads its own copy of the weights instead.
+
+Run with:  python -m app.worker_pool
+"""
+import logging
+import multiprocessing as mp
+import os
+import signal
+import tempfile
+import time
+from typing import Callable
+
+from app.config import settings
+
+log = logging.getLogger("app.worker_pool")
+
+RESTART_BACKOFF_MAX = 30.0
+HEALTHY_AFTER = 60.0  # a child that ran this long resets its restart backoff
+STOP_TIMEOUT = 30.0  # seconds a child gets to finish its current job on shutdown
+
+
+def thread_budget(concurrency: int, override: int = 0) -> int:
+    """Intra-op threads per child so that concurrency * threads <= cores."""
+    if override > 0:
+        return override
+    return max(1, (os.cpu_count() or 1) // max(1, concurrency))
+
+
+def _pin_threads(threads: int) -> None:
+    # must happen before torch/onnxruntime are imported for OpenMP/MKL to honour it
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "ONNX_NUM_THREADS"):
+        os.environ.setdefault(var, str(threads))
+    try:
+        import torch
+    except ImportError:  # onnx/rule backends don't need torch
+        return
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def child_main(index: int, threads: int, loop: str) -> None:
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s %(levelname)s [w{index}] %(name)s: %(message)s")
+    _pin_threads(threads)
+
+    from app.services.summarize import warm_up
+
+    log.info("Worker %d: %d intra-op threads, warm-up took %.2fs", index, threads, warm_up())
+
+    if settings.queue_backend == "pg":
+        from app import pg_queue
+
+        pg_queue.run(serve_metrics=False)
+        return
+
+    if loop == "batch":
+        from app import batch_worker
+
+        batch_worker.run(serve_metrics=False)  # the supervisor serves the aggregated metrics
+        return
+
+    from redis import Redis
+    from rq import Queue, SimpleWorker
+
+    from app.jobs import worker_queue_names
+
+    # RQ stores pickled payloads, so this connection must not decode responses.
+    conn = Redis.from_url(settings.redis_url)
+    queues = [Queue(name, connection=conn) for name in worker_queue_names()]
+    worker = SimpleWorker(queues, connection=conn)
+    worker.work(with_scheduler=False)
+
+
+class Supervisor:
+    """Keep `concurrency` spawned children alive until stop() is called."""
+
+    def __init__(self, target: Callable, concurrency: int, args: tuple = ()):
+        self.target = target
+        self.concurrency = concurrency
+        self.args = args
+        self.restarts = 0
+        self._ctx = mp.get_context("spawn")
+        self._procs: dict[int, mp.Process] = {}
+        self._backoff: dict[int, float] = {}
+        self._next_restart_at: dict[int, float] = {}
+        self._started_at: dict[int, float] = {}
+        self._stopping = False
+
+    def _start(self, index: int) -> None:
+        p = self._ctx.Process(target=self.target, args=(index, *self.args), name=f"worker-{index}", daemon=False)
+        p.start()
+        self._procs[index] = p
+        self._started_at[index] = time.monotonic()
+
+    def start(self) -> None:
+        for i in range(self.concurrency):
+            self._start(i)
+
+    def check(self) -> None:
+        """Restart children that exited once their backoff has passed; call periodically, never blocks."""
+        now = time.monotonic()
+        for index, p in list(self._procs.items()):
+            if self._stopping or p.is_alive():
+                continue
+            if index not in self._next_restart_at:
+                if now - self._started_at[index] > HEALTHY_AFTER:
+                    self._backoff.pop(index, None)
+                backoff = self._backoff.get(index, 0.5)
+                log.warning("Worker %d exited with code %s; restarting in %.1fs", index, p.exitcode, backoff)
+                self._next_restart_at[index] = now + backoff
+                self._backoff[index] = min(backoff * 2, RESTART_BACKOFF_MAX)
+            if now < self._next_restart_at[index]:
+                continue  # other slots are still checked meanwhile
+            del self._next_restart_at[index]
+            self.restarts += 1
+            self._start(index)
+
+    def stop(self) -> None:
+        self._stopping = True
+        for p in self._procs.values():
+            if p.is_alive():
+                p.terminate()  # SIGTERM: RQ does a warm shutdown after the current job
+        deadline = time.monotonic() + STOP_TIMEOUT
+        for p in self._procs.values():
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive():
+                p.kill()
+                p.join()
+
+    def alive(self) -> int:
+        return sum(p.is_alive() for p in self._procs.values())
+
+
+def _setup_metrics() -> None:
+    """Children write per-process metric files; the supervisor serves their aggregate."""
+    if settings.worker_metrics_port <= 0:
+        return
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="notes-worker-metrics-")
+    from app.metrics import start_metrics_server
+
+    start_metrics_server(settings.worker_metrics_port)
+
+
+def run(concurrency: int | None = None) -> None:
+    concurrency = concurrency or settings.worker_concurrency
+    _setup_metrics()
+    threads = thread_budget(concurrency, settings.worker_torch_threads)
+    sup = Supervisor(child_main, concurrency, args=(threads, settings.worker_pool_loop))
+    log.info(
+        "Starting %d '%s' workers on '%s*' with %d intra-op threads each",
+        concurrency, settings.worker_pool_loop, settings.rq_queue_name, threads,
+    )
+
+    stop = False
+
+    def _on_signal(signum, _frame):
+        nonlocal stop
+        stop = True
+
+    signal.signal(signal.SIGTERM, _on_signal)
+    signal.signal(signal.SIGINT, _on_signal)
+
+    sup.start()
+    try:
+        while not stop:
+            time.sleep(1.0)
+            sup.check()
+    finally:
+        log.info("Stopping workers")
+        sup.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    run()
@@ -0,0 +1,50 @@
+# bench/bench_batch_inference.py
+"""
+Compare summarizer throughput (notes/second) at different batch sizes.
+
+    python -m bench.bench_batch_inference --notes 64 --batch-sizes 1,4,8,16
+
+Runs the configured model backend in-process (MODEL_LOCAL_DIR / SUMMARIZER_MODEL);
+no DB or Redis needed.
+"""
+import argparse
+import json
+import time
+
+from app.services.summarize_llm import _get_pipeline, summarize_texts_llm
+from bench.corpus import notes
+
+
+def run(total: int, batch_size: int) -> dict:
+    texts = notes(total)
+    started = time.perf_counter()
+    for i in range(0, total, batch_size):
+        summarize_texts_llm(texts[i:i + batch_size])
+    elapsed = time.perf_counter() - started
+    return {
+        "batch_size": batch_size,
+        "notes": total,
+        "seconds": round(elapsed, 3),
+        "notes_per_second": round(total / elapsed, 2),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--notes", type=int, default=64, help="notes per batch-size run")
+    ap.add_argument("--batch-sizes", default="1,4,8,16")
+    args = ap.parse_args()
+
+    # Load + warm up once so the first run doesn't pay for model loading.
+    _get_pipeline()
+    summarize_texts_llm(notes(1))
+
+    results = [run(args.notes, int(bs)) for bs in args.batch_sizes.split(",")]
+    base = results[0]["notes_per_second"]
+    for r in results:
+        r["speedup_vs_first"] = round(r["notes_per_second"] / base, 2)
+        print(json.dumps(r))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# bench/bench_login_vs_reads.py
+"""
+Login throughput vs. note-read latency under a concurrent login burst.
+
+    uvicorn app.main:app --port 8000
+    python -m bench.bench_login_vs_reads --url http://localhost:8000 --logins 50 --readers 50 --duration 20
+
+Phase 1 runs only the readers (GET /api/v1/notes) to get a baseline; phase 2 runs the
+readers alongside `--logins` clients hammering POST /api/v1/auth/login. A healthy setup
+keeps read p95 close to baseline (`read_p95_vs_baseline` near 1.0) while login either
+completes or gets fast 503s. Run it against the default sync server: the sync read
+handlers share Starlette's 40-thread pool, so this is the mode where a login burst
+would show up as read latency if bcrypt waits held threads.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+from bench.load_test import _login, summarize_latencies
+
+
+async def _loop(fn, deadline, latencies, statuses):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            status = await fn()
+        except httpx.HTTPError:
+            status = "conn"
+        latencies.append(time.perf_counter() - started)
+        statuses[status] += 1
+
+
+async def run(url: str, logins: int, readers: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=logins + readers + 8)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        reader_headers = [await _login(client) for _ in range(readers)]
+        creds = {"email": f"login-{uuid.uuid4().hex[:12]}@example.com", "password": "Passw0rd!"}
+        await client.post("/api/v1/auth/signup", json=creds)
+
+        def reader(h):
+            async def call():
+                return (await client.get("/api/v1/notes?limit=20", headers=h)).status_code
+            return call
+
+        async def login_call():
+            return (await client.post("/api/v1/auth/login", json=creds)).status_code
+
+        async def phase(with_logins: bool) -> dict:
+            read_lat, read_st = [], Counter()
+            login_lat, login_st = [], Counter()
+            started = time.perf_counter()
+            deadline = started + duration
+            tasks = [_loop(reader(h), deadline, read_lat, read_st) for h in reader_headers]
+            if with_logins:
+                tasks += [_loop(login_call, deadline, login_lat, login_st) for _ in range(logins)]
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - started
+            out = {"reads": {"rps": round(len(read_lat) / elapsed, 1), **summarize_latencies(read_lat)}}
+            if with_logins:
+                out["logins"] = {
+                    "ok_per_s": round(login_st[200] / elapsed, 1),
+                    "rejected_503": login_st[503],
+                    **summarize_latencies(login_lat),
+                }
+            return out
+
+        baseline, burst = await phase(False), await phase(True)
+        return {
+            "baseline": baseline,
+            "with_login_burst": burst,
+            "read_p95_vs_baseline": round(burst["reads"]["p95_ms"] / max(baseline["reads"]["p95_ms"], 0.01), 2),
+        }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--logins", type=int, default=50, help="concurrent login clients")
+    ap.add_argument("--readers", type=int, default=50, help="concurrent note-read clients")
+    ap.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    args = ap.parse_args()
+    print(json.dumps(asyncio.run(run(args.url, args.logins, args.readers, args.duration))))
+
+
+if __name__ == "__main__":
+    main()
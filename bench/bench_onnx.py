@@ -0,0 +1,128 @@
+# bench/bench_onnx.py
+"""
+PyTorch (SUMMARIZER_BACKEND=llm) vs ONNX Runtime int8 (SUMMARIZER_BACKEND=onnx).
+
+    python -m app.export_onnx            # once
+    python -m bench.bench_onnx --notes 32 --batch-size 8
+
+Each backend runs in its own subprocess so RSS numbers aren't polluted by the other
+model. Reports single-note latency, batched throughput, resident memory, and
+ROUGE-L F1 of the ONNX summaries against the PyTorch ones on the fixed corpus.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from bench.corpus import notes
+from bench.load_test import summarize_latencies
+
+BACKENDS = ("llm", "onnx")
+
+
+def _summarizer(backend: str):
+    if backend == "onnx":
+        from app.services.summarize_onnx import _get_model, summarize_texts_onnx
+        return _get_model, summarize_texts_onnx
+    from app.services.summarize_llm import _get_pipeline, summarize_texts_llm
+    return _get_pipeline, summarize_texts_llm
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_backend(backend: str, total: int, batch_size: int) -> dict:
+    load, summarize = _summarizer(backend)
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    load()
+    load_s = time.perf_counter() - started
+    summarize(notes(1))  # warm-up
+
+    texts = notes(total)
+    latencies, summaries = [], []
+    for t in texts:
+        s = time.perf_counter()
+        summaries.extend(summarize([t]))
+        latencies.append(time.perf_counter() - s)
+
+    started = time.perf_counter()
+    for i in range(0, total, batch_size):
+        summarize(texts[i:i + batch_size])
+    elapsed = time.perf_counter() - started
+
+    return {
+        "backend": backend,
+        "load_seconds": round(load_s, 2),
+        **summarize_latencies(latencies),
+        "batch_size": batch_size,
+        "notes_per_second": round(total / elapsed, 2),
+        "rss_model_mb": round(_rss_mb() - rss_before, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "summaries": summaries,
+    }
+
+
+def _lcs(a: list[str], b: list[str]) -> int:
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b):
+            cur.append(prev[j] + 1 if x == y else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """ROUGE-L F1 on lowercased whitespace tokens."""
+    c, r = candidate.lower().split(), reference.lower().split()
+    if not c or not r:
+        return float(c == r)
+    lcs = _lcs(c, r)
+    if lcs == 0:
+        return 0.0
+    p, rec = lcs / len(c), lcs / len(r)
+    return 2 * p * rec / (p + rec)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--notes", type=int, default=32)
+    ap.add_argument("--batch-size", type=int, default=8)
+    ap.add_argument("--backend", choices=BACKENDS, help=argparse.SUPPRESS)  # subprocess mode
+    args = ap.parse_args()
+
+    if args.backend:
+        print(json.dumps(run_backend(args.backend, args.notes, args.batch_size)))
+        return
+
+    results = {}
+    for backend in BACKENDS:
+        proc = subprocess.run(
+            [sys.executable, "-m", "bench.bench_onnx", "--backend", backend,
+             "--notes", str(args.notes), "--batch-size", str(args.batch_size)],
+            check=True, capture_output=True, text=True,
+        )
+        results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    scores = [rouge_l(o, r) for o, r in zip(results["onnx"]["summaries"], results["llm"]["summaries"])]
+    for backend in BACKENDS:
+        r = {k: v for k, v in results[backend].items() if k != "summaries"}
+        print(json.dumps(r))
+    print(json.dumps({
+        "rouge_l_f1_onnx_vs_llm": round(sum(scores) / len(scores), 4),
+        "rouge_l_f1_min": round(min(scores), 4),
+        "p50_speedup": round(results["llm"]["p50_ms"] / results["onnx"]["p50_ms"], 2),
+        "throughput_speedup": round(results["onnx"]["notes_per_second"] / results["llm"]["notes_per_second"], 2),
+    }))
+
+
+if __name__ == "__main__":
+    main()
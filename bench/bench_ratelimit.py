@@ -0,0 +1,109 @@
+# bench/bench_ratelimit.py
+"""
+Per-request overhead of the rate limiter.
+
+    python -m bench.bench_ratelimit --redis-url redis://localhost:6379/0 --requests 20000
+
+Times RateLimiter.hit() for a client far under its limit (local lease fast path) and
+for exact per-request accounting (lease_max=1, one Lua call per request), plus the
+middleware on a no-op ASGI app vs the bare app. Without --redis-url it uses fakeredis,
+which only shows the Python-side cost.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from bench.load_test import percentile
+from app.ratelimit import RateLimiter, RateLimitMiddleware, Rule
+
+
+def _factory(url: str | None):
+    if url:
+        from redis.asyncio import Redis
+
+        client = Redis.from_url(url)
+        return lambda: client
+    import fakeredis
+    import fakeredis.aioredis
+
+    server = fakeredis.FakeServer()
+    client = fakeredis.aioredis.FakeRedis(server=server)
+    return lambda: client
+
+
+async def _time_hits(limiter: RateLimiter, n: int, identities: int) -> list[float]:
+    rule = limiter.rules[0]
+    out = []
+    for i in range(n):
+        started = time.perf_counter()
+        await limiter.hit(rule, f"user:{i % identities}")
+        out.append(time.perf_counter() - started)
+    return out
+
+
+async def _noop_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _time_asgi(app, n: int) -> list[float]:
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(_msg):
+        pass
+
+    out = []
+    for i in range(n):
+        scope = {
+            "type": "http", "method": "GET", "path": "/api/v1/notes", "headers": [],
+            "client": (f"10.0.{i % 250}.1", 1234),
+        }
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        out.append(time.perf_counter() - started)
+    return out
+
+
+def _us(lat: list[float]) -> dict:
+    lat = sorted(lat)
+    return {f"p{p}_us": round(percentile(lat, p) * 1e6, 1) for p in (50, 95, 99)}
+
+
+async def main_async(url: str | None, n: int) -> None:
+    # generous limit so we measure overhead, not 429s
+    rule = Rule("bench", "*", "/", rate=1e6, burst=10**6)
+    factory = _factory(url)
+
+    fast = RateLimiter(rules=[rule], redis_factory=factory, lease_max=100)
+    exact = RateLimiter(rules=[rule], redis_factory=factory, lease_max=1)
+    for name, limiter in (("lease_fast_path", fast), ("per_request_redis", exact)):
+        lat = await _time_hits(limiter, n, identities=100)
+        print(json.dumps({"mode": name, "requests": n, "redis_calls": limiter.stats["redis"], **_us(lat)}))
+
+    from app.config import settings
+
+    settings.rate_limit_enabled = True
+    wrapped = RateLimitMiddleware(_noop_app, limiter=RateLimiter(rules=[rule], redis_factory=factory, lease_max=100))
+    base = await _time_asgi(_noop_app, n)
+    with_mw = await _time_asgi(wrapped, n)
+    b, m = _us(base), _us(with_mw)
+    print(json.dumps({
+        "mode": "middleware_overhead",
+        "requests": n,
+        "p50_overhead_us": round(m["p50_us"] - b["p50_us"], 1),
+        "p99_overhead_us": round(m["p99_us"] - b["p99_us"], 1),
+    }))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--redis-url", default=None)
+    ap.add_argument("--requests", type=int, default=20000)
+    args = ap.parse_args()
+    asyncio.run(main_async(args.redis_url, args.requests))
+
+
+if __name__ == "__main__":
+    main()
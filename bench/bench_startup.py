@@ -0,0 +1,103 @@
+# bench/bench_startup.py
+"""
+API cold-start import cost, and a guard that the ML stack stays out of it.
+
+    python -m bench.bench_startup --runs 5 --top 15
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and reports
+wall time, the cumulative import time of app.main, peak RSS and the slowest modules.
+Exits 1 if any of FORBIDDEN was imported (torch, transformers, ... belong to the
+workers only), printing the import chain that pulled it in.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+FORBIDDEN = ("torch", "transformers", "onnxruntime", "optimum", "sentencepiece")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) in the order Python printed them (children first)."""
+    out = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            out.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return out
+
+
+def import_chain(rows: list[tuple[str, int, int, int]], module: str) -> list[str]:
+    """Who imported `module`: each parent is the next row printed one level shallower."""
+    idx = next((i for i, r in enumerate(rows) if r[0] == module), None)
+    if idx is None:
+        return []
+    chain, depth = [module], rows[idx][3]
+    for name, _s, _c, d in rows[idx + 1:]:
+        if d < depth:
+            chain.append(name)
+            depth = d
+    return list(reversed(chain))
+
+
+def import_profile(target: str = "app.main", env: dict | None = None) -> dict:
+    """Import `target` in a fresh interpreter with -X importtime."""
+    code = (
+        f"import {target}, resource, sys; "
+        "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stdout)"
+    )
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env={**os.environ, **(env or {})},
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    rows = parse_importtime(proc.stderr)
+    modules = {r[0] for r in rows}
+    forbidden = [m for m in FORBIDDEN if m in modules]
+    return {
+        "wall_s": wall,
+        "import_s": next((r[2] for r in rows if r[0] == target), 0) / 1e6,
+        "max_rss_mb": int(proc.stdout.split()[-1]) / 1024,  # ru_maxrss is KiB on Linux
+        "modules": len(modules),
+        "rows": rows,
+        "forbidden": {m: import_chain(rows, m) for m in forbidden},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15, help="slowest modules (self time) to list")
+    ap.add_argument("--target", default="app.main")
+    args = ap.parse_args()
+
+    runs = [import_profile(args.target) for _ in range(args.runs)]
+    last = runs[-1]
+    slowest = sorted(last["rows"], key=lambda r: r[1], reverse=True)[: args.top]
+    print(json.dumps({
+        "target": args.target,
+        "runs": args.runs,
+        "wall_s_median": round(statistics.median(r["wall_s"] for r in runs), 3),
+        "import_s_median": round(statistics.median(r["import_s"] for r in runs), 3),
+        "max_rss_mb": round(max(r["max_rss_mb"] for r in runs), 1),
+        "modules": last["modules"],
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for name, self_us, _c, _d in slowest},
+    }))
+    if last["forbidden"]:
+        for module, chain in last["forbidden"].items():
+            print(f"FORBIDDEN import {module}: {' -> '.join(chain)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
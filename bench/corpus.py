@@ -0,0 +1,36 @@
+# bench/corpus.py
+"""Fixed sample notes shared by the benchmarks so runs are comparable."""
+
+SAMPLE_NOTES = [
+    "Morning unfurled like a slow ribbon across the rooftops as kettles hissed, buses sighed, and sparrows "
+    "rehearsed brave little arias on sagging wires. Keys clinked by doorways, screens woke, and bread steamed "
+    "under butter's bright rush. In the pause before meetings and messages, someone watered a fern, another "
+    "tied a shoe, and a child asked why clouds move.",
+    "Customer called about a delayed shipment of twelve office chairs. The order was placed on the 3rd and "
+    "promised within five business days, but tracking has not updated since the package left the regional "
+    "hub. I opened a ticket with the carrier, offered a 10% discount on the next order, and promised a "
+    "follow-up call by Thursday afternoon.",
+    "Weekly sync: the data team finished migrating the reporting jobs to the new warehouse. Two dashboards "
+    "still read from the legacy tables and will be switched next sprint. Action items: Ana to update the "
+    "runbook, Deniz to remove the old cron entries, and everyone to review the cost report before Friday.",
+    "Site visit notes. The north entrance ramp is too steep for the delivery carts and the loading dock light "
+    "is broken. Facilities agreed to install a temporary ramp and replace the light this week. The tenant "
+    "asked whether the parking lot could be repainted before the holiday season.",
+    "Interview debrief for the backend role. Strong on SQL and API design, a bit light on distributed "
+    "systems. Whiteboard exercise went well; candidate asked good questions about on-call and deployment. "
+    "Recommendation: move to the final round with a focus on system design.",
+    "Incident summary: between 02:10 and 02:45 UTC the notes API returned elevated 5xx errors because the "
+    "database connection pool was exhausted after a long-running migration. The migration was paused, the "
+    "pool recovered, and we are adding alerting on pool saturation and lock wait time.",
+    "Call with the supplier about the Q3 price increase. They proposed 8% across the board; we countered with "
+    "4% and a twelve-month volume commitment. They will come back with a revised quote next week, and we "
+    "should prepare a comparison against the two alternative vendors.",
+    "Onboarding checklist for the new support agents: create accounts, assign the shadowing schedule, share "
+    "the escalation matrix, and book the product walkthrough. The first week focuses on reading closed "
+    "tickets and answering low-priority email under supervision.",
+]
+
+
+def notes(n: int) -> list[str]:
+    """Return n notes, cycling through the fixed sample corpus."""
+    return [SAMPLE_NOTES[i % len(SAMPLE_NOTES)] for i in range(n)]
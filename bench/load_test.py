@@ -0,0 +1,111 @@
+# bench/load_test.py
+"""
+Closed-loop HTTP load test against a running API (sync vs async comparison).
+
+Start the API once per mode, then point this script at it:
+
+    DB_ASYNC=0 uvicorn app.main:app --port 8000 --workers 1
+    python -m bench.load_test --url http://localhost:8000 --concurrency 500 --duration 30 --label sync
+
+    DB_ASYNC=1 uvicorn app.main:app --port 8000 --workers 1
+    python -m bench.load_test --url http://localhost:8000 --concurrency 500 --duration 30 --label async
+
+Each virtual client signs up once, creates a few notes, then loops GET /api/v1/notes
+(auth lookup + list query) until the duration is over. Prints one JSON line with
+requests/second and p50/p95/p99 latency.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+import httpx
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def summarize_latencies(latencies: list[float]) -> dict:
+    """p50/p95/p99/max in milliseconds."""
+    lat = sorted(latencies)
+    return {
+        "p50_ms": round(percentile(lat, 50) * 1000, 2),
+        "p95_ms": round(percentile(lat, 95) * 1000, 2),
+        "p99_ms": round(percentile(lat, 99) * 1000, 2),
+        "max_ms": round(lat[-1] * 1000, 2) if lat else 0.0,
+    }
+
+
+async def _login(client: httpx.AsyncClient) -> dict:
+    creds = {"email": f"load-{uuid.uuid4().hex[:12]}@example.com", "password": "Passw0rd!"}
+    await client.post("/api/v1/auth/signup", json=creds)
+    r = await client.post("/api/v1/auth/login", json=creds)
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    for i in range(3):
+        await client.post("/api/v1/notes", json={"raw_text": f"load test note {i}"}, headers=headers)
+    return headers
+
+
+async def _client_loop(client, headers, deadline, latencies, errors, path):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            r = await client.get(path, headers=headers)
+            if r.status_code != 200:
+                errors.append(r.status_code)
+        except httpx.HTTPError:
+            errors.append("conn")
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(url: str, concurrency: int, duration: float, path: str) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        # Log everyone in before the clock starts (bcrypt would otherwise dominate).
+        sem = asyncio.Semaphore(32)
+
+        async def setup():
+            async with sem:
+                return await _login(client)
+
+        all_headers = await asyncio.gather(*(setup() for _ in range(concurrency)))
+
+        latencies: list[float] = []
+        errors: list = []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(_client_loop(client, h, deadline, latencies, errors, path) for h in all_headers)
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        **summarize_latencies(latencies),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--concurrency", type=int, default=500)
+    ap.add_argument("--duration", type=float, default=30.0, help="seconds")
+    ap.add_argument("--path", default="/api/v1/notes?limit=20")
+    ap.add_argument("--label", default="", help="free-form tag, e.g. sync/async")
+    args = ap.parse_args()
+
+    result = asyncio.run(run(args.url, args.concurrency, args.duration, args.path))
+    print(json.dumps({"label": args.label, **result}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""notes keyset pagination indexes
+
+Revision ID: 7c1e4a9b2d31
+Revises: 02d05fd77346
+Create Date: 2026-10-18 10:12:41.518220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9b2d31'
+down_revision: Union[str, None] = '02d05fd77346'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_notes_user_id_status_id', 'notes', ['user_id', 'status', 'id'], unique=False)
+    op.create_index('ix_notes_user_id_id', 'notes', ['user_id', 'id'], unique=False)
+    op.create_index('ix_notes_status_id', 'notes', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notes_status_id', table_name='notes')
+    op.drop_index('ix_notes_user_id_id', table_name='notes')
+    op.drop_index('ix_notes_user_id_status_id', table_name='notes')
@@ -0,0 +1,35 @@
+"""notes claim/lease columns for the Postgres queue backend
+
+Revision ID: b3f8d2a6c915
+Revises: 7c1e4a9b2d31
+Create Date: 2026-10-18 14:05:12.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8d2a6c915'
+down_revision: Union[str, None] = '7c1e4a9b2d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notes', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('notes', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('notes', sa.Column('locked_by', sa.String(length=64), nullable=True))
+    op.create_index(
+        'ix_notes_processing_lease', 'notes', ['lease_expires_at'], unique=False,
+        postgresql_where=sa.text("status = 'processing'"), sqlite_where=sa.text("status = 'processing'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notes_processing_lease', table_name='notes')
+    op.drop_column('notes', 'locked_by')
+    op.drop_column('notes', 'lease_expires_at')
+    op.drop_column('notes', 'attempts')
@@ -0,0 +1,65 @@
+"""notes full-text search: tsvector + GIN (Postgres), FTS5 (SQLite)
+
+Revision ID: d8b4f6a2c173
+Revises: e5a1c7d3f048
+Create Date: 2026-10-18 18:02:37.604115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b4f6a2c173'
+down_revision: Union[str, None] = 'e5a1c7d3f048'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        # adding a STORED generated column rewrites notes once; the GIN build then reads it
+        op.execute("""
+            ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(summary, '')), 'A') ||
+                setweight(to_tsvector('english', raw_text), 'B')
+            ) STORED
+        """)
+        op.execute("CREATE INDEX ix_notes_search_vector ON notes USING gin (search_vector)")
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE notes_fts USING fts5("
+            "raw_text, summary, content='notes', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute("""
+            CREATE TRIGGER notes_fts_ai AFTER INSERT ON notes BEGIN
+                INSERT INTO notes_fts(rowid, raw_text, summary) VALUES (new.id, new.raw_text, coalesce(new.summary, ''));
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER notes_fts_ad AFTER DELETE ON notes BEGIN
+                INSERT INTO notes_fts(notes_fts, rowid, raw_text, summary)
+                VALUES ('delete', old.id, old.raw_text, coalesce(old.summary, ''));
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER notes_fts_au AFTER UPDATE OF raw_text, summary ON notes BEGIN
+                INSERT INTO notes_fts(notes_fts, rowid, raw_text, summary)
+                VALUES ('delete', old.id, old.raw_text, coalesce(old.summary, ''));
+                INSERT INTO notes_fts(rowid, raw_text, summary) VALUES (new.id, new.raw_text, coalesce(new.summary, ''));
+            END
+        """)
+        op.execute("INSERT INTO notes_fts(rowid, raw_text, summary) SELECT id, raw_text, coalesce(summary, '') FROM notes")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_notes_search_vector")
+        op.execute("ALTER TABLE notes DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('notes_fts_ai', 'notes_fts_ad', 'notes_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS notes_fts")
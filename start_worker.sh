@@ -16,5 +16,23 @@ for i in range(60):
 print("DB not ready after 60s"); sys.exit(1)
 PY
 
+if [ "${WORKER_MODE:-rq}" = "pool" ]; then
+  echo "Starting preloaded worker pool..."
+  exec python -m app.worker_pool
+fi
+
+if [ "${QUEUE_BACKEND:-rq}" = "pg" ]; then
+  echo "Starting Postgres queue worker..."
+  exec python -m app.pg_queue
+fi
+
+if [ "${WORKER_MODE:-rq}" = "batch" ]; then
+  echo "Starting batching worker..."
+  exec python -m app.batch_worker
+fi
+
 echo "Starting RQ worker..."
-exec rq worker --url "${REDIS_URL}" "${RQ_QUEUE_NAME}"
+# every job runs in a forked work-horse that exits afterwards, so a pool would only leak connections
+export DB_NULL_POOL="${DB_NULL_POOL:-1}"
+# strict priority: interactive lane, legacy queue, then the fair-shared bulk lane
+exec rq worker --url "${REDIS_URL}" "${RQ_QUEUE_NAME}:interactive" "${RQ_QUEUE_NAME}" "${RQ_QUEUE_NAME}:bulk"
@@ -10,17 +10,25 @@ sys.path.insert(0, str(ROOT))
 os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
 os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
 os.environ.setdefault("SUMMARIZER_BACKEND", "rule")  # keep tests fast & deterministic
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")  # tests/test_ratelimit.py turns it on explicitly
 
 import pytest
 import fakeredis
+import fakeredis.aioredis
 
 from app.main import app
-from app.deps import get_redis
+from app.deps import get_redis, get_redis_async
 from app.db.base import Base
 from app.db.session import engine, SessionLocal
 
+# one in-memory Redis shared by every client the app asks for (sync and async)
+_fake_server = fakeredis.FakeServer()
+
 def _fake_redis():
-    return fakeredis.FakeStrictRedis(decode_responses=True)
+    return fakeredis.FakeStrictRedis(server=_fake_server, decode_responses=True)
+
+def _fake_redis_async():
+    return fakeredis.aioredis.FakeRedis(server=_fake_server, decode_responses=True)
 
 @pytest.fixture(autouse=True, scope="session")
 def _create_schema_once():
@@ -35,5 +43,7 @@ def _db_session_clean():
 @pytest.fixture(autouse=True)
 def _override_redis_dep():
     app.dependency_overrides[get_redis] = _fake_redis
+    app.dependency_overrides[get_redis_async] = _fake_redis_async
     yield
     app.dependency_overrides.pop(get_redis, None)
+    app.dependency_overrides.pop(get_redis_async, None)
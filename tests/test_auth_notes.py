@@ -1,4 +1,5 @@
 # tests/test_auth_notes.py
+import json
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -60,3 +61,141 @@ def test_admin_only_routes_guarded():
     r = client.get("/api/v1/notes/all", headers=headers_user)
     assert r.status_code in (401, 403)
 
+
+def test_cursor_pagination_walks_all_pages():
+    _signup(email="pager@example.com")
+    headers = _auth_headers(_login(email="pager@example.com").json()["access_token"])
+    created = [
+        client.post("/api/v1/notes", json={"raw_text": f"note {i}"}, headers=headers).json()["id"]
+        for i in range(5)
+    ]
+
+    seen, cursor = [], None
+    while True:
+        url = "/api/v1/notes?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        r = client.get(url, headers=headers)
+        assert r.status_code == 200
+        seen += [n["id"] for n in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        assert 'rel="next"' in r.headers["Link"]
+
+    assert seen == sorted(created, reverse=True)
+
+    r = client.get("/api/v1/notes?cursor=not-a-cursor", headers=headers)
+    assert r.status_code == 400
+
+def _admin_headers(email="boss@example.com", password="Adm1n!pass"):
+    from app.db.session import SessionLocal
+    from app.seed import ensure_admin
+
+    db = SessionLocal()
+    try:
+        ensure_admin(db, email, password)
+    finally:
+        db.close()
+    return _auth_headers(_login(email=email, password=password).json()["access_token"])
+
+
+def test_grouped_by_user_pages_and_streams():
+    admin = _admin_headers()
+    _signup(email="grouped@example.com")
+    headers = _auth_headers(_login(email="grouped@example.com").json()["access_token"])
+    for i in range(3):
+        client.post("/api/v1/notes", json={"raw_text": f"g {i}"}, headers=headers)
+
+    users, cursor = [], None
+    while True:
+        url = "/api/v1/notes/grouped-by-user?limit=1&notes_per_user=2" + (f"&cursor={cursor}" if cursor else "")
+        r = client.get(url, headers=admin)
+        assert r.status_code == 200, r.text
+        users += r.json()
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    mine = next(u for u in users if u["user"]["email"] == "grouped@example.com")
+    assert [n["raw_text"] for n in mine["notes"]] == ["g 2", "g 1"]
+
+    r = client.get("/api/v1/notes/grouped-by-user?format=ndjson&limit=1&notes_per_user=2", headers=admin)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [u["user"]["id"] for u in lines] == [u["user"]["id"] for u in users]
+
+def test_bulk_create_is_ordered_and_idempotent():
+    from app.db.session import SessionLocal
+    from app.deps import get_redis
+    from app.jobs import bulk_queue
+    from app.outbox import drain
+
+    _signup(email="bulk@example.com")
+    headers = _auth_headers(_login(email="bulk@example.com").json()["access_token"])
+    conn = app.dependency_overrides[get_redis]()
+    queue = bulk_queue(conn)  # bulk lane, fair-shared per user
+    before = queue.pending()
+
+    def relay():
+        with SessionLocal() as db:
+            drain(db, conn)
+
+    items = [
+        {"raw_text": "first", "idempotency_key": "k1"},
+        {"raw_text": "no key"},
+        {"raw_text": "dup of first", "idempotency_key": "k1"},
+        {"raw_text": "second", "idempotency_key": "k2"},
+    ]
+    r = client.post("/api/v1/notes/bulk", json={"items": items}, headers=headers)
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert [n["raw_text"] for n in out] == ["first", "no key", "first", "second"]
+    assert out[0]["id"] == out[2]["id"]
+    relay()
+    assert queue.pending() - before == 3
+
+    # replay: keyed items resolve to the existing rows, only the unkeyed one is new
+    again = client.post("/api/v1/notes/bulk", json={"items": items}, headers=headers).json()
+    assert [n["id"] for n in again][::2] == [n["id"] for n in out][::2]
+    assert again[3]["id"] == out[3]["id"]
+    assert again[1]["id"] != out[1]["id"]
+    relay()
+    assert queue.pending() - before == 4
+
+def test_summary_view_never_reads_raw_text():
+    from sqlalchemy import event
+
+    from app.db import session
+    from app.schemas.note import NOTE_PREVIEW_CHARS
+
+    engine = session.async_engine.sync_engine if session.async_engine is not None else session.engine
+
+    _signup(email="lean@example.com")
+    headers = _auth_headers(_login(email="lean@example.com").json()["access_token"])
+    body = "lorem ipsum " * 5000
+    note_id = client.post("/api/v1/notes", json={"raw_text": body}, headers=headers).json()["id"]
+
+    statements = []
+    def capture(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        r = client.get("/api/v1/notes?view=summary&limit=1", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert r.status_code == 200, r.text
+    [item] = r.json()
+    assert item["id"] == note_id and "raw_text" not in item
+    assert item["preview"] == body[:NOTE_PREVIEW_CHARS]
+    notes_sql = [s for s in statements if "FROM notes" in s]
+    assert notes_sql and all("raw_text" not in s.replace("substr(notes.raw_text", "") for s in notes_sql)
+
+    admin = _admin_headers()
+    r = client.get("/api/v1/notes/all?view=summary&limit=5", headers=admin)
+    assert r.status_code == 200 and all("raw_text" not in n for n in r.json())
+    assert "raw_text" in client.get("/api/v1/notes/all?limit=1", headers=admin).json()[0]
+
+    r = client.get("/api/v1/notes/grouped-by-user?view=summary&format=ndjson&notes_per_user=1", headers=admin)
+    mine = next(u for u in map(json.loads, r.text.splitlines()) if u["user"]["email"] == "lean@example.com")
+    assert [n["preview"] for n in mine["notes"]] == [body[:NOTE_PREVIEW_CHARS]]
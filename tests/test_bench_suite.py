@@ -0,0 +1,20 @@
+# tests/test_bench_suite.py
+from bench.suite import compare
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"results": {
+        "note_create": {"rps": 100.0, "p95_ms": 50.0},
+        "list_cursor": {"rps": 200.0, "p95_ms": 2.0},
+        "worker_drain": {"rps": 400.0, "p95_ms": 20.0},
+    }}
+    current = {"results": {
+        "note_create": {"rps": 70.0, "p95_ms": 55.0},   # throughput -30%: regression
+        "list_cursor": {"rps": 210.0, "p95_ms": 2.6},   # +30% but only 0.6ms: noise
+        "worker_drain": {"rps": 500.0, "p95_ms": 30.0},  # p95 +50%: regression
+    }}
+    failures = compare(baseline, current, threshold=0.2, metrics=["rps", "p95_ms"], min_delta_ms=1.0)
+    assert [f.split(":")[0] for f in failures] == ["note_create.rps", "worker_drain.p95_ms"]
+
+    del current["results"]["worker_drain"]
+    assert compare(baseline, current, 0.2, ["rps"])[-1] == "worker_drain: missing from this run"
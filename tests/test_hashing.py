@@ -0,0 +1,38 @@
+# tests/test_hashing.py
+import threading
+
+from passlib.context import CryptContext
+
+from app.auth import hashing
+from app.db import models
+from app.db.session import SessionLocal
+from tests.test_auth_notes import client, _login
+
+
+def test_login_rehashes_outdated_bcrypt_cost():
+    old = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("Passw0rd!")
+    db = SessionLocal()
+    try:
+        db.add(models.User(email="rehash@example.com", password_hash=old))
+        db.commit()
+    finally:
+        db.close()
+
+    assert _login(email="rehash@example.com").status_code == 200
+
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.email == "rehash@example.com").one()
+        assert user.password_hash != old
+        assert not hashing._pwd.needs_update(user.password_hash)
+    finally:
+        db.close()
+
+
+def test_saturated_hasher_returns_503(monkeypatch):
+    monkeypatch.setattr(hashing, "_slots", threading.BoundedSemaphore(1))
+    hashing._slots.acquire()  # every slot taken
+
+    r = client.post("/api/v1/auth/signup", json={"email": "busy@example.com", "password": "Passw0rd!"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
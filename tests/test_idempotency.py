@@ -0,0 +1,51 @@
+# tests/test_idempotency.py
+import threading
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.base import Base
+from app.services.notes import create_note_idempotent
+
+
+def test_same_key_from_many_threads_creates_one_note(tmp_path):
+    # A file DB so every thread gets its own connection and transactions really race.
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}", connect_args={"timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _wal(dbapi_conn, _):
+        dbapi_conn.execute("PRAGMA journal_mode=WAL")
+
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        user = models.User(email="race@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        user_id = user.id
+
+    threads_n = 16
+    barrier = threading.Barrier(threads_n)
+    results, errors = [], []
+
+    def worker(i: int):
+        barrier.wait()
+        try:
+            with Session() as db:
+                results.append(create_note_idempotent(db, user_id, f"attempt {i}", "same-key"))
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(threads_n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert len({note.id for note, _ in results}) == 1
+    assert sum(created for _, created in results) == 1
+    with Session() as db:
+        assert db.scalar(select(func.count()).select_from(models.Note)) == 1
+    engine.dispose()
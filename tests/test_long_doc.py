@@ -0,0 +1,49 @@
+# tests/test_long_doc.py
+from app.services.long_doc import split_tokens, summarize_long
+
+
+class _WordTokenizer:
+    """One token per whitespace-separated word; enough to exercise the windowing."""
+
+    def __init__(self):
+        self.vocab: dict[str, int] = {}
+        self.words: list[str] = []
+
+    def encode(self, text, add_special_tokens=False):
+        ids = []
+        for w in text.split():
+            if w not in self.vocab:
+                self.vocab[w] = len(self.words)
+                self.words.append(w)
+            ids.append(self.vocab[w])
+        return ids
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(self.words[i] for i in ids)
+
+
+def test_split_tokens_overlaps_and_covers_everything():
+    chunks = split_tokens(list(range(25)), chunk_tokens=10, overlap=3)
+    assert chunks[0] == list(range(10))
+    assert chunks[1][:3] == chunks[0][-3:]
+    assert chunks[-1][-1] == 24
+    assert all(len(c) <= 10 for c in chunks)
+
+
+def test_long_notes_are_map_reduced_in_batched_calls():
+    calls = []
+
+    def summarize_batch(texts):
+        calls.append(list(texts))
+        return [" ".join(t.split()[:3]) for t in texts]  # "summary" = first 3 words
+
+    long_text = " ".join(f"w{i}" for i in range(100))
+    texts = ["short note", long_text]
+    out = summarize_long(texts, summarize_batch, _WordTokenizer(), chunk_tokens=24, overlap=5, batch_size=64)
+
+    assert out[0] == "short note"
+    assert len(calls) == 2              # one map pass (all chunks + the short note), one reduce
+    assert len(calls[0]) == 5 + 1       # 100 words / step 19 -> 5 windows, plus the short note
+    # the tail of the note reached the reduce step instead of being truncated away
+    (reduce_input,) = calls[1]
+    assert "w76 w77 w78" in reduce_input
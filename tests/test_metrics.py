@@ -0,0 +1,50 @@
+# tests/test_metrics.py
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.deps import get_redis
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_metrics_use_route_templates_and_count_db_queries(monkeypatch):
+    for c in metrics._custom_collectors:
+        monkeypatch.setattr(c, "redis_factory", app.dependency_overrides[get_redis])
+
+    client.post("/api/v1/auth/signup", json={"email": "m@e.com", "password": "Passw0rd!"})
+    token = client.post("/api/v1/auth/login", json={"email": "m@e.com", "password": "Passw0rd!"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    note_id = client.post("/api/v1/notes", json={"raw_text": "metrics " * 20}, headers=headers).json()["id"]
+    assert client.get(f"/api/v1/notes/{note_id}", headers=headers).status_code == 200
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    body = r.text
+    # the template, never the concrete id
+    assert 'route="/api/v1/notes/{note_id}"' in body or 'route="/api/v1/notes/{note_id:int}"' in body
+    assert f"/api/v1/notes/{note_id}\"" not in body
+    assert 'status="2xx"' in body
+    assert "db_queries_per_request_count{" in body
+    assert 'rq_queue_depth{queue="' in body
+
+
+def test_pool_checkout_wait_and_saturation(tmp_path):
+    from sqlalchemy import create_engine, text
+
+    from app.db.session import pool_stats
+    from app.metrics import DB_POOL_WAIT_SECONDS, TimedQueuePool
+
+    def waits() -> float:
+        return next(s.value for s in DB_POOL_WAIT_SECONDS.collect()[0].samples if s.name.endswith("_count"))
+
+    eng = create_engine(f"sqlite:///{tmp_path}/pool.db", poolclass=TimedQueuePool, pool_size=5, max_overflow=10)
+    before = waits()
+    with eng.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        stats = pool_stats(eng)
+        assert stats["checked_out"] == 1 and stats["capacity"] == 15
+        assert stats["saturation"] == 1 / 15
+    assert waits() == before + 1
+    assert pool_stats(eng)["checked_out"] == 0
+    eng.dispose()
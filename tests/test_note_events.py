@@ -0,0 +1,81 @@
+# tests/test_note_events.py
+import asyncio
+import json
+
+import fakeredis
+import fakeredis.aioredis
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.schemas.note import NoteEvent
+from app.services.note_events import NoteEventBroker, stream_note_events
+from app.worker_jobs import summarize_note_job
+import app.worker_jobs as worker_jobs
+
+
+def test_worker_status_changes_reach_the_owners_stream(monkeypatch):
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(worker_jobs, "get_redis", lambda: fakeredis.FakeStrictRedis(server=server, decode_responses=True))
+    broker = NoteEventBroker(redis_factory=lambda: fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+
+    db = SessionLocal()
+    try:
+        owner = models.User(email="sse-owner@example.com", password_hash="x")
+        other = models.User(email="sse-other@example.com", password_hash="x")
+        db.add_all([owner, other])
+        db.flush()
+        note = models.Note(user_id=owner.id, raw_text="stream me")
+        db.add(note)
+        db.commit()
+        owner_id, other_id, note_id = owner.id, other.id, note.id
+        pending = [NoteEvent.model_validate(note)]
+    finally:
+        db.close()
+
+    async def snapshot():
+        return pending
+
+    async def scenario():
+        stream = stream_note_events(owner_id, snapshot, broker=broker, heartbeat=0.05)
+        other_q = await broker.subscribe(other_id)
+        assert await stream.__anext__() == "retry: 3000\n\n"
+        first = await stream.__anext__()
+        assert json.loads(first.split("data: ", 1)[1])["status"] == "queued"
+
+        await asyncio.to_thread(summarize_note_job, note_id)
+
+        statuses = []
+        while len(statuses) < 2:
+            chunk = await asyncio.wait_for(stream.__anext__(), timeout=5)
+            if chunk.startswith("event: note"):
+                ev = json.loads(chunk.split("data: ", 1)[1])
+                assert ev["id"] == note_id
+                statuses.append(ev["status"])
+        assert statuses == ["processing", "done"]
+        assert other_q.empty()
+
+        await stream.aclose()
+        broker.unsubscribe(other_id, other_q)
+        assert broker.connections == 0
+        await broker.close()
+
+    asyncio.run(scenario())
+
+
+def test_stream_ends_when_redis_is_unreachable():
+    class DownRedis:
+        def pubsub(self, **_kw):
+            raise ConnectionError("redis down")
+
+    broker = NoteEventBroker(redis_factory=DownRedis, subscribe_timeout=0.05)
+
+    async def snapshot():
+        raise AssertionError("no snapshot without a subscription")
+
+    async def scenario():
+        chunks = [c async for c in stream_note_events(1, snapshot, broker=broker)]
+        assert chunks == ["retry: 3000\n\n"]
+        assert broker.connections == 0
+        await broker.close()
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
@@ -0,0 +1,89 @@
+# tests/test_outbox.py
+import pytest
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rq import Queue
+from sqlalchemy import select
+
+import app.outbox as outbox
+from app.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.deps import get_redis
+from app.jobs import BULK, INTERACTIVE, bulk_queue, lane_queue_name, note_job_id
+from app.main import app
+
+client = TestClient(app)
+
+
+def _headers(email: str) -> dict:
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "Passw0rd!"})
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": "Passw0rd!"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _outbox_note_ids() -> set[int]:
+    with SessionLocal() as db:
+        return set(db.scalars(select(models.JobOutbox.note_id)))
+
+
+def test_create_commits_job_to_outbox_and_relay_dedups_by_note_id(monkeypatch):
+    monkeypatch.setattr(settings, "sched_enabled", True)
+    r = app.dependency_overrides[get_redis]()
+    queue = Queue(lane_queue_name(INTERACTIVE), connection=r)
+    with SessionLocal() as db:
+        outbox.drain(db, r)  # jobs left by other tests' notes
+    before = queue.count
+
+    note_id = client.post("/api/v1/notes", json={"raw_text": "outbox"}, headers=_headers("outbox@example.com")).json()["id"]
+    assert note_id in _outbox_note_ids()
+    assert queue.count == before  # the request never touched Redis
+
+    # Redis down: nothing is lost, the row waits for the next attempt
+    def redis_down(*_a, **_kw):
+        raise RedisConnectionError("down")
+
+    monkeypatch.setattr(outbox, "push_jobs", redis_down)
+    with SessionLocal() as db, pytest.raises(RedisConnectionError):
+        outbox.relay_once(db, r)
+    assert note_id in _outbox_note_ids()
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "sched_enabled", True)
+
+    with SessionLocal() as db:
+        assert outbox.drain(db, r) >= 1
+    assert note_id not in _outbox_note_ids()
+    assert queue.count == before + 1
+    assert note_job_id(note_id) in queue.job_ids
+
+    # relay died after pushing but before deleting: the redelivered row is dropped
+    with SessionLocal() as db:
+        outbox.stage_jobs(db, [note_id], lane=INTERACTIVE, user_id=1)
+        db.commit()
+        assert outbox.relay_once(db, r) == 1
+        assert outbox.outbox_stats(db)["pending"] == 0
+    assert queue.count == before + 1
+
+
+def test_relay_dedups_redelivered_bulk_lane_rows(monkeypatch):
+    monkeypatch.setattr(settings, "sched_enabled", True)
+    r = app.dependency_overrides[get_redis]()
+    headers = _headers("outbox-bulk@example.com")
+    with SessionLocal() as db:
+        outbox.drain(db, r)
+    fq = bulk_queue(r)
+    before = fq.pending()
+
+    created = client.post("/api/v1/notes/bulk", json={"items": [{"raw_text": "b1"}, {"raw_text": "b2"}]}, headers=headers)
+    note_ids = [n["id"] for n in created.json()]
+    with SessionLocal() as db:
+        assert outbox.drain(db, r) == 2
+    assert fq.pending() == before + 2
+
+    # bulk items have no RQ job yet: only the sent markers catch the redelivery
+    with SessionLocal() as db:
+        user_id = db.get(models.Note, note_ids[0]).user_id
+        outbox.stage_jobs(db, note_ids, lane=BULK, user_id=user_id)
+        db.commit()
+        assert outbox.drain(db, r) == 2
+    assert fq.pending() == before + 2
@@ -0,0 +1,120 @@
+# tests/test_pg_queue.py
+from datetime import datetime, timedelta
+
+import fakeredis
+from fastapi.testclient import TestClient
+from rq import Queue
+
+import app.worker_jobs as worker_jobs
+from app.config import settings
+from app.db import models
+from app.db.session import SessionLocal
+from app.deps import get_redis
+from app.jobs import INTERACTIVE, lane_queue_name
+from app.main import app
+from app.pg_queue import work_once
+
+client = TestClient(app)
+
+
+def _drain(batch_size: int = 4) -> int:
+    total = 0
+    while n := work_once("test-worker", batch_size):
+        total += n
+    return total
+
+
+def _notes(ids: list[int]) -> dict[int, models.Note]:
+    with SessionLocal() as db:
+        return {n.id: n for n in db.query(models.Note).filter(models.Note.id.in_(ids))}
+
+
+def test_claims_queued_and_expired_notes_only(monkeypatch):
+    monkeypatch.setattr(worker_jobs, "get_redis", lambda: fakeredis.FakeStrictRedis(decode_responses=True))
+    monkeypatch.setattr(settings, "pg_queue_max_attempts", 3)
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        user = models.User(email="pgq@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        queued = [models.Note(user_id=user.id, raw_text=f"queued {i}") for i in range(5)]
+        # a worker died mid-batch: lease ran out
+        crashed = models.Note(user_id=user.id, raw_text="crashed", status="processing", attempts=1,
+                              lease_expires_at=now - timedelta(minutes=1))
+        # someone is still working on this one
+        leased = models.Note(user_id=user.id, raw_text="leased", status="processing", attempts=1,
+                             lease_expires_at=now + timedelta(minutes=5))
+        # expired again after its last allowed attempt
+        poison = models.Note(user_id=user.id, raw_text="poison", status="processing", attempts=3,
+                             lease_expires_at=now - timedelta(minutes=1))
+        db.add_all([*queued, crashed, leased, poison])
+        db.commit()
+        ids = [n.id for n in queued]
+        crashed_id, leased_id, poison_id = crashed.id, leased.id, poison.id
+
+    assert _drain() >= 6
+    notes = _notes([*ids, crashed_id, leased_id, poison_id])
+    assert all(notes[i].status == "done" and notes[i].attempts == 1 for i in ids)
+    assert all(notes[i].lease_expires_at is None and notes[i].locked_by is None for i in ids)
+    assert notes[crashed_id].status == "done" and notes[crashed_id].attempts == 2
+    assert notes[leased_id].status == "processing" and notes[leased_id].attempts == 1
+    assert notes[poison_id].status == "failed"
+
+
+def test_failed_batch_is_retried_then_pg_backend_skips_rq(monkeypatch):
+    monkeypatch.setattr(worker_jobs, "get_redis", lambda: fakeredis.FakeStrictRedis(decode_responses=True))
+    monkeypatch.setattr(settings, "queue_backend", "pg")
+    client.post("/api/v1/auth/signup", json={"email": "pgq-api@example.com", "password": "Passw0rd!"})
+    token = client.post("/api/v1/auth/login", json={"email": "pgq-api@example.com", "password": "Passw0rd!"}).json()["access_token"]
+
+    r = app.dependency_overrides[get_redis]()
+    interactive = Queue(lane_queue_name(INTERACTIVE), connection=r)
+    before = interactive.count
+    note_id = client.post("/api/v1/notes", json={"raw_text": "retry me"}, headers={"Authorization": f"Bearer {token}"}).json()["id"]
+    assert interactive.count == before  # the row is the job
+
+    def broken(texts):
+        raise RuntimeError("model down")
+
+    monkeypatch.setattr(worker_jobs, "_summarize_batch_with_retry", broken)
+    _drain()
+    note = _notes([note_id])[note_id]
+    assert note.status == "queued" and note.attempts == 1
+    assert note.lease_expires_at > datetime.utcnow()  # backing off, not retried in a hot loop
+
+    monkeypatch.undo()
+    monkeypatch.setattr(worker_jobs, "get_redis", lambda: fakeredis.FakeStrictRedis(decode_responses=True))
+    with SessionLocal() as db:
+        db.get(models.Note, note_id).lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+    _drain()
+    note = _notes([note_id])[note_id]
+    assert note.status == "done" and note.attempts == 2 and note.summary
+
+
+def test_result_is_dropped_when_the_lease_was_lost(monkeypatch):
+    monkeypatch.setattr(worker_jobs, "get_redis", lambda: fakeredis.FakeStrictRedis(decode_responses=True))
+    with SessionLocal() as db:
+        user = models.User(email="pgq-lease@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        slow, fast = models.Note(user_id=user.id, raw_text="slow"), models.Note(user_id=user.id, raw_text="fast")
+        db.add_all([slow, fast])
+        db.commit()
+        slow_id, fast_id = slow.id, fast.id
+
+    real = worker_jobs._summarize_batch_with_retry
+
+    def reclaimed_meanwhile(texts):
+        # the lease on "slow" ran out mid-batch and another worker claimed it
+        with SessionLocal() as db:
+            db.get(models.Note, slow_id).locked_by = "other-worker"
+            db.commit()
+        return real(texts)
+
+    monkeypatch.setattr(worker_jobs, "_summarize_batch_with_retry", reclaimed_meanwhile)
+    _drain()
+    notes = _notes([slow_id, fast_id])
+    assert notes[fast_id].status == "done" and notes[fast_id].locked_by is None
+    assert notes[slow_id].status == "processing" and notes[slow_id].summary is None
+    assert notes[slow_id].locked_by == "other-worker"
@@ -0,0 +1,79 @@
+# tests/test_profiling.py
+import json
+
+from fastapi.testclient import TestClient
+
+from app import profiling
+from app.config import settings
+from app.deps import get_redis, get_redis_async
+from app.db import models
+from app.db.session import SessionLocal
+from app.main import app
+from app.worker_jobs import summarize_notes_batch
+
+client = TestClient(app)
+
+
+def _use_test_redis(monkeypatch):
+    # the middleware and jobs call the factories directly, outside dependency overrides
+    monkeypatch.setattr(profiling, "get_redis_async", app.dependency_overrides[get_redis_async])
+    monkeypatch.setattr(profiling, "get_redis", app.dependency_overrides[get_redis])
+
+
+def _token(email: str, admin: bool = False) -> str:
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "Passw0rd!"})
+    if admin:
+        with SessionLocal() as db:
+            user = db.query(models.User).filter_by(email=email).one()
+            user.role = models.UserRole.ADMIN.value
+            db.commit()
+    return client.post("/api/v1/auth/login", json={"email": email, "password": "Passw0rd!"}).json()["access_token"]
+
+
+def test_admin_header_profiles_request_including_sync_endpoint(monkeypatch):
+    _use_test_redis(monkeypatch)
+    monkeypatch.setattr(settings, "profile_interval_ms", 0.1)  # a cached list query can finish inside 1ms
+    admin = {"Authorization": f"Bearer {_token('prof-admin@e.com', admin=True)}"}
+    agent = {"Authorization": f"Bearer {_token('prof-agent@e.com')}"}
+
+    # non-admins can't turn it on
+    r = client.get("/api/v1/notes", headers={**agent, "X-Profile": "1"})
+    assert r.status_code == 200 and "x-profile-id" not in r.headers
+
+    r = client.get("/api/v1/notes", headers={**admin, "X-Profile": "1"})
+    assert r.status_code == 200
+    profile_id = r.headers["x-profile-id"]
+
+    listed = client.get("/api/v1/admin/profiles", headers=admin).json()
+    assert listed[0]["id"] == profile_id
+    assert listed[0]["name"] == "GET /api/v1/notes" and listed[0]["trigger"] == "header"
+
+    r = client.get(f"/api/v1/admin/profiles/{profile_id}", headers=admin)
+    assert r.status_code == 200
+    frames = {f["name"] for f in json.loads(r.content)["shared"]["frames"]}
+    if not settings.db_async:
+        assert "list_my_notes" in frames  # the threadpool side of the request was captured
+
+    assert client.get("/api/v1/admin/profiles", headers=agent).status_code == 403
+    assert client.get("/api/v1/admin/profiles/nope", headers=admin).status_code == 404
+
+
+def test_armed_jobs_are_profiled(monkeypatch):
+    _use_test_redis(monkeypatch)
+    admin = {"Authorization": f"Bearer {_token('prof-jobs@e.com', admin=True)}"}
+    assert client.post("/api/v1/admin/profiles/jobs", json={"count": 1}, headers=admin).json() == {"armed": 1}
+
+    with SessionLocal() as db:
+        user = db.query(models.User).filter_by(email="prof-jobs@e.com").one()
+        notes = [models.Note(user_id=user.id, raw_text=t) for t in ("one", "two")]
+        db.add_all(notes)
+        db.commit()
+        ids = [n.id for n in notes]
+
+    summarize_notes_batch(ids[:1])
+    summarize_notes_batch(ids[1:])  # only one was armed
+    assert not app.dependency_overrides[get_redis]().exists(profiling.ARMED_JOBS_KEY)  # dropped at zero
+
+    jobs = [p for p in client.get("/api/v1/admin/profiles", headers=admin).json() if p["kind"] == "job"]
+    assert len(jobs) == 1
+    assert jobs[0]["name"] == f"summarize_notes_batch([{ids[0]}])" and jobs[0]["status"] == "ok"
@@ -0,0 +1,73 @@
+# tests/test_ratelimit.py
+import asyncio
+
+import fakeredis
+import fakeredis.aioredis
+from fastapi.testclient import TestClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.config import settings
+from app.main import app
+from app.ratelimit import RateLimiter, Rule, match_rule, load_rules
+
+
+def _limiter(**kw) -> RateLimiter:
+    server = fakeredis.FakeServer()
+    return RateLimiter(
+        rules=[Rule("t", "*", "/", rate=1, burst=10)],
+        redis_factory=lambda: fakeredis.aioredis.FakeRedis(server=server),
+        **kw,
+    )
+
+
+def test_rules_match_longest_prefix_and_method():
+    rules = load_rules("")
+    assert match_rule(rules, "POST", "/api/v1/auth/login").name == "login"
+    assert match_rule(rules, "POST", "/api/v1/notes/bulk").name == "create_note"
+    assert match_rule(rules, "GET", "/api/v1/notes").name == "api"
+    assert match_rule(rules, "GET", "/health") is None
+
+
+def test_bucket_limits_and_leases_cut_redis_calls():
+    limiter = _limiter(lease_max=4)
+    rule = limiter.rules[0]
+
+    async def run():
+        return [await limiter.hit(rule, "user:1") for _ in range(12)]
+
+    results = asyncio.run(run())
+    allowed = [ok for ok, _ in results]
+    # burst of 10 (plus at most a token of refill), then 429 with a retry hint
+    assert 10 <= sum(allowed) <= 11
+    assert not allowed[-1] and results[-1][1] > 0
+    assert limiter.stats["local"] > 0
+    assert limiter.stats["redis"] < sum(allowed)
+
+
+def test_limiter_fails_open_when_redis_is_down():
+    def broken():
+        raise RedisConnectionError("down")
+
+    limiter = RateLimiter(rules=[Rule("t", "*", "/", rate=1, burst=1)], redis_factory=broken)
+    ok = asyncio.run(limiter.hit(limiter.rules[0], "ip:1"))
+    assert ok == (True, 0.0)
+    assert asyncio.run(limiter.hit(limiter.rules[0], "ip:1")) == (True, 0.0)
+    assert limiter.stats["failopen"] == 2
+
+
+def test_middleware_returns_429_with_retry_after(monkeypatch):
+    from app import ratelimit
+
+    limiter = _limiter(lease_max=1)
+    limiter.rules = [Rule("login", "POST", "/api/v1/auth/login", rate=0.1, burst=2, by_ip=True)]
+    monkeypatch.setattr(ratelimit, "rate_limiter", limiter)
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+
+    client = TestClient(app)
+    creds = {"email": "nobody@example.com", "password": "wrong"}
+    codes = [client.post("/api/v1/auth/login", json=creds).status_code for _ in range(3)]
+    assert codes[:2] == [401, 401]
+    r = client.post("/api/v1/auth/login", json=creds)
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+    assert client.get("/health").status_code == 200  # unmatched paths aren't limited
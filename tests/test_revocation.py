@@ -0,0 +1,56 @@
+# tests/test_revocation.py
+import time
+
+import fakeredis
+
+from app.auth import revocation as rv
+from tests.test_auth_notes import client, _signup, _login, _auth_headers
+
+
+def test_filter_buckets_expire_with_tokens():
+    f = rv.RevocationFilter(capacity=1000, error_rate=0.001, bucket_seconds=60)
+    assert f.might_be_revoked("anything")  # not synced yet -> always ask Redis
+
+    f.ready = True
+    f.add("jti-1", exp=1_000_030)
+    assert f.might_be_revoked("jti-1")
+    assert not any(f.might_be_revoked(f"other-{i}") for i in range(200))
+
+    f.prune(now=1_000_100)
+    assert not f.might_be_revoked("jti-1")
+
+
+def test_stream_sync_replays_and_tails():
+    server = fakeredis.FakeServer()
+    factory = lambda: fakeredis.FakeStrictRedis(server=server, decode_responses=True)  # noqa: E731
+    exp = int(time.time()) + 600
+    rv.revoke_token(factory(), "before-start", exp, 600)
+
+    rv.revocation_filter.ready = False
+    stop = rv.start_revocation_sync(factory)
+    try:
+        deadline = time.time() + 5
+        while not rv.revocation_filter.ready and time.time() < deadline:
+            time.sleep(0.01)
+        assert rv.revocation_filter.might_be_revoked("before-start")
+
+        # published by "another replica": only the stream carries it here
+        factory().xadd(rv.REVOKED_STREAM, {"jti": "after-start", "exp": exp})
+        while not rv.revocation_filter.might_be_revoked("after-start") and time.time() < deadline:
+            time.sleep(0.01)
+        assert rv.revocation_filter.might_be_revoked("after-start")
+    finally:
+        stop.set()
+        deadline = time.time() + 5
+        while rv.revocation_filter.ready and time.time() < deadline:
+            time.sleep(0.01)
+
+
+def test_logout_revokes_token():
+    _signup(email="logout@example.com")
+    headers = _auth_headers(_login(email="logout@example.com").json()["access_token"])
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+    r = client.get("/api/v1/auth/me", headers=headers)
+    assert r.status_code == 401
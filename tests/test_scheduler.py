@@ -0,0 +1,95 @@
+# tests/test_scheduler.py
+import fakeredis
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rq import Queue
+
+import app.scheduler as scheduler
+
+from app.config import settings
+from app.fair_queue import FairQueue
+from app.jobs import BULK, INTERACTIVE, enqueue_summaries, lane_queue_name
+from app.queue_metrics import record_job_waits
+from app.scheduler import LEADER_KEY, _hold_lease, feed_once, lane_stats, recover
+
+
+def _redis():
+    return fakeredis.FakeStrictRedis(server=fakeredis.FakeServer())
+
+
+def test_fair_queue_round_robins_across_users():
+    fq = FairQueue(_redis(), prefix="t")
+    fq.push(1, [f"a{i}" for i in range(100)])  # a big import...
+    fq.push(2, ["b0", "b1"])                   # ...doesn't starve a small one
+    fq.push(3, ["c0"])
+    fq.set_weight(3, 2)
+
+    first = fq.pop(6)
+    assert [uid for uid, _ in first[:4]] == ["1", "2", "3", "1"]
+    assert ("2", "b1") in first
+
+    rest = fq.pop(1000)
+    assert len(first) + len(rest) == 103
+    assert fq.pending() == 0 and fq.users() == 0
+
+
+def test_interactive_lane_bypasses_bulk_backlog(monkeypatch):
+    r = _redis()
+    monkeypatch.setattr(settings, "sched_bulk_low_water", 4)
+    monkeypatch.setattr(settings, "outbox_enabled", False)  # enqueue directly, no relay
+    enqueue_summaries(r, list(range(1, 51)), lane=BULK, user_id=7)
+    enqueue_summaries(r, list(range(100, 103)), lane=BULK, user_id=8)
+    enqueue_summaries(r, [999])
+
+    interactive = Queue(lane_queue_name(INTERACTIVE), connection=r)
+    bulk = Queue(lane_queue_name(BULK), connection=r)
+    assert interactive.count == 1
+    assert bulk.count == 0
+
+    assert feed_once(r) == 4
+    assert feed_once(r) == 0  # queue is at the low-water mark
+    released = [j.args[0] for j in bulk.get_jobs()]
+    assert released == [1, 100, 2, 101]
+
+    record_job_waits(r, bulk.get_jobs() + interactive.get_jobs())
+    stats = lane_stats(r)
+    assert stats[BULK]["count"] == 4 and stats[INTERACTIVE]["count"] == 1
+    assert stats[BULK]["fair_queue_pending"] == 49
+
+
+def test_feeder_crash_leaves_items_in_flight_for_recovery(monkeypatch):
+    r = _redis()
+    monkeypatch.setattr(settings, "sched_bulk_low_water", 3)
+    monkeypatch.setattr(settings, "outbox_enabled", False)
+    enqueue_summaries(r, [1, 2, 3, 4], lane=BULK, user_id=7)
+    bulk = Queue(lane_queue_name(BULK), connection=r)
+
+    def crash(*_a, **_kw):
+        raise RedisConnectionError("feeder died")
+
+    monkeypatch.setattr(scheduler, "enqueue_lane", crash)
+    with pytest.raises(RedisConnectionError):
+        feed_once(r, "host-a:1")
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "sched_bulk_low_water", 3)
+
+    assert bulk.count == 0
+    assert recover(r) == 3
+    assert [j.args[0] for j in bulk.get_jobs()] == [1, 2, 3]
+    assert recover(r) == 0  # acked
+
+    assert feed_once(r, "host-b:2") == 0  # at the low-water mark
+    bulk.empty()
+    assert feed_once(r, "host-b:2") == 1
+
+
+def test_feeder_lease_is_only_renewed_by_its_holder():
+    r = _redis()
+    assert _hold_lease(r, "host-a:1")
+    assert _hold_lease(r, "host-a:1")  # renewal
+    assert not _hold_lease(r, "host-b:2")
+
+    r.delete(LEADER_KEY)  # a's lease expired...
+    assert _hold_lease(r, "host-b:2")  # ...and b took it
+    assert not _hold_lease(r, "host-a:1")
+    assert r.get(LEADER_KEY) == b"host-b:2" and r.pttl(LEADER_KEY) > 0
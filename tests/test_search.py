@@ -0,0 +1,59 @@
+# tests/test_search.py
+from fastapi.testclient import TestClient
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+
+def _headers(email: str, admin: bool = False) -> dict:
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "Passw0rd!"})
+    if admin:
+        with SessionLocal() as db:
+            db.query(models.User).filter_by(email=email).one().role = models.UserRole.ADMIN.value
+            db.commit()
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": "Passw0rd!"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _create(headers: dict, text: str) -> int:
+    return client.post("/api/v1/notes", json={"raw_text": text}, headers=headers).json()["id"]
+
+
+def test_search_ranks_pages_and_respects_tenancy():
+    alice = _headers("search-alice@example.com")
+    bob = _headers("search-bob@example.com")
+    admin = _headers("search-admin@example.com", admin=True)
+
+    weak = _create(alice, "Kettle descaling reminder for the office kitchen")
+    strong = _create(alice, "Gearbox invoice overdue: the gearbox supplier wants payment for the gearbox")
+    summarized = _create(alice, "Long call with the supplier about payment terms")
+    other = _create(bob, "Bob's gearbox notes")
+    with SessionLocal() as db:
+        db.get(models.Note, summarized).summary = "Supplier asks about the gearbox invoice."
+        db.commit()
+
+    r = client.get("/api/v1/notes/search?q=gearboxes", headers=alice)  # stemmed
+    assert r.status_code == 200, r.text
+    ids = [n["id"] for n in r.json()]
+    assert set(ids) == {strong, summarized}  # only the caller's notes; summaries are searched too
+    assert weak not in ids and other not in ids
+
+    # keyset pages on (rank, id) walk the same order without repeats
+    seen, cursor = [], None
+    while True:
+        url = "/api/v1/notes/search?q=gearbox&limit=1" + (f"&cursor={cursor}" if cursor else "")
+        r = client.get(url, headers=alice)
+        seen += [n["id"] for n in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == ids
+
+    everyone = {n["id"] for n in client.get("/api/v1/notes/search?q=gearbox&limit=100", headers=admin).json()}
+    assert {strong, summarized, other} <= everyone
+
+    assert client.get("/api/v1/notes/search?q=%22%20OR%20*", headers=alice).json() == []  # no FTS syntax injection
+    assert client.get("/api/v1/notes/search?q=gearbox&cursor=bogus", headers=alice).status_code == 400
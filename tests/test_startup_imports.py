@@ -0,0 +1,18 @@
+# tests/test_startup_imports.py
+from bench.bench_startup import import_profile
+
+from app import worker_jobs
+from app.jobs import SUMMARIZE_JOB
+
+
+def test_api_import_graph_excludes_ml_stack():
+    # the summarizer backend setting must not matter: the API never imports a backend
+    profile = import_profile("app.main", env={"SUMMARIZER_BACKEND": "llm"})
+    assert profile["forbidden"] == {}
+    modules = {row[0] for row in profile["rows"]}
+    assert "app.worker_jobs" not in modules and "app.services.summarize" not in modules
+
+
+def test_enqueued_path_resolves_to_the_job():
+    module, _, name = SUMMARIZE_JOB.rpartition(".")
+    assert module == worker_jobs.__name__ and getattr(worker_jobs, name) is worker_jobs.summarize_note_job
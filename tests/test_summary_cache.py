@@ -0,0 +1,70 @@
+# tests/test_summary_cache.py
+import fakeredis
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.services import summarize
+from app.services.summary_cache import SummaryCache, cache_key, normalize_text
+from app.worker_jobs import summarize_notes_batch
+
+
+def _key(text: str) -> str:
+    return cache_key(text, model_id="m", max_tokens=128, min_tokens=20)
+
+
+def test_key_ignores_whitespace_but_not_params():
+    assert normalize_text("  hello \n\t world ") == "hello world"
+    assert _key("hello   world") == _key("hello world\n")
+    assert _key("hello world") != cache_key("hello world", model_id="m", max_tokens=64, min_tokens=20)
+
+
+def test_two_tiers_and_bounded_redis():
+    r = fakeredis.FakeStrictRedis(decode_responses=True)
+    writer = SummaryCache(redis_factory=lambda: r, local_size=2, redis_max_entries=3)
+    keys = [_key(f"note {i}") for i in range(5)]
+
+    assert writer.get_many(keys[:1]) == [None]
+    for i, k in enumerate(keys):
+        writer.put_many({k: f"s{i}"}, now=1000.0 + i)
+
+    # only the newest 3 survive in Redis
+    assert r.zcard("sumcache:index") == 3
+    assert r.get(keys[0]) is None and r.get(keys[4]) == "s4"
+
+    # a second process starts cold locally and is served by Redis
+    reader = SummaryCache(redis_factory=lambda: r, local_size=2)
+    assert reader.get_many([keys[4], keys[0]]) == ["s4", None]
+    assert reader.get_many([keys[4]]) == ["s4"]
+    s = reader.stats()
+    assert (s["local_hits"], s["redis_hits"], s["misses"]) == (1, 1, 1)
+    assert reader.shared_stats() == {"lookups": 4, "hits": 2, "misses": 2}
+
+
+def test_cache_hit_skips_the_model(monkeypatch):
+    r = fakeredis.FakeStrictRedis(decode_responses=True)
+    monkeypatch.setattr(summarize, "BACKEND", "llm")
+    monkeypatch.setattr(summarize, "SUM_CACHE_ENABLED", True)
+    monkeypatch.setattr(summarize, "SUM_LONG_DOC_ENABLED", False)
+    monkeypatch.setattr(summarize, "summary_cache", SummaryCache(redis_factory=lambda: r))
+    monkeypatch.setattr(summarize, "_summarize_batch", lambda texts: ["model summary" for _ in texts])
+
+    with SessionLocal() as db:
+        user = models.User(email="sumcache-job@example.com", password_hash="x")
+        db.add(user)
+        db.flush()
+        first = models.Note(user_id=user.id, raw_text="same boilerplate")
+        dup = models.Note(user_id=user.id, raw_text=" same  boilerplate\n")
+        db.add_all([first, dup])
+        db.commit()
+        first_id, dup_id = first.id, dup.id
+
+    summarize_notes_batch([first_id])
+
+    def model_down(texts):
+        raise AssertionError("the model must not run on a cache hit")
+
+    monkeypatch.setattr(summarize, "_summarize_batch", model_down)
+    assert summarize_notes_batch([dup_id]) == [dup_id]
+    with SessionLocal() as db:
+        note = db.get(models.Note, dup_id)
+        assert note.status == "done" and note.summary == "model summary"
@@ -0,0 +1,64 @@
+# tests/test_user_cache.py
+import time
+
+import fakeredis
+import pytest
+
+from app.auth import user_cache as uc
+from app.db import models
+from app.db.session import SessionLocal
+
+
+@pytest.fixture
+def listening_cache():
+    uc.user_cache.clear()
+    uc.user_cache.listening = True
+    yield uc.user_cache
+    uc.user_cache.listening = False
+    uc.user_cache.clear()
+
+
+def test_commit_that_bumps_token_version_evicts(listening_cache):
+    db = SessionLocal()
+    try:
+        user = models.User(email="cache@example.com", password_hash="x")
+        db.add(user)
+        db.commit()
+        listening_cache.put(uc.CurrentUser.from_model(user))
+        assert listening_cache.get(user.id) is not None
+
+        user.email = "cache2@example.com"  # unrelated change keeps the entry
+        db.commit()
+        assert listening_cache.get(user.id) is not None
+
+        user.token_version += 1
+        db.commit()
+        assert listening_cache.get(user.id) is None
+    finally:
+        db.close()
+
+
+def test_pubsub_invalidation_reaches_listener():
+    server = fakeredis.FakeServer()
+    factory = lambda: fakeredis.FakeStrictRedis(server=server, decode_responses=True)  # noqa: E731
+    stop = uc.start_invalidation_listener(factory)
+    try:
+        deadline = time.time() + 5
+        while not uc.user_cache.listening and time.time() < deadline:
+            time.sleep(0.01)
+        assert uc.user_cache.listening
+
+        snap = uc.CurrentUser(id=987654, email="p@example.com", role="AGENT", token_version=0,
+                              created_at=None, updated_at=None)
+        uc.user_cache.put(snap)
+        assert uc.user_cache.get(987654) == snap
+
+        uc.publish_invalidation(factory(), [987654])
+        while uc.user_cache.get(987654) is not None and time.time() < deadline:
+            time.sleep(0.01)
+        assert uc.user_cache.get(987654) is None
+    finally:
+        stop.set()
+        deadline = time.time() + 5
+        while uc.user_cache.listening and time.time() < deadline:
+            time.sleep(0.01)
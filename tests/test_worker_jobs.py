@@ -0,0 +1,99 @@
+# tests/test_worker_jobs.py
+import fakeredis
+from rq import Queue
+from rq.registry import StartedJobRegistry
+
+import app.worker_jobs as worker_jobs
+from app.batch_worker import SUMMARIZE_FUNC_NAME, collect_batch, process_batch, requeue_abandoned
+from app.db import models
+from app.db.session import SessionLocal
+from app.worker_jobs import summarize_notes_batch
+
+
+def _make_notes(email: str, texts: list[str]) -> list[int]:
+    db = SessionLocal()
+    try:
+        user = models.User(email=email, password_hash="x")
+        db.add(user)
+        db.flush()
+        notes = [models.Note(user_id=user.id, raw_text=t) for t in texts]
+        db.add_all(notes)
+        db.commit()
+        return [n.id for n in notes]
+    finally:
+        db.close()
+
+
+def test_summarize_notes_batch_writes_all_results():
+    ids = _make_notes("batch@example.com", ["short one", "x" * 400, "another"])
+
+    done = summarize_notes_batch(ids)
+    assert sorted(done) == sorted(ids)
+
+    db = SessionLocal()
+    try:
+        notes = {n.id: n for n in db.query(models.Note).filter(models.Note.id.in_(ids))}
+        assert all(n.status == "done" for n in notes.values())
+        assert notes[ids[0]].summary == "short one"
+        assert notes[ids[1]].summary.endswith("...")
+    finally:
+        db.close()
+
+    # already done -> no-op
+    assert summarize_notes_batch(ids) == []
+
+
+def test_collect_batch_returns_partial_batch_when_queue_empties():
+    conn = fakeredis.FakeStrictRedis()
+    queue = Queue("collect_test", connection=conn)
+    jobs = [queue.enqueue(SUMMARIZE_FUNC_NAME, i) for i in (1, 2)]
+
+    batch = collect_batch(conn, [queue], batch_size=8, max_wait_ms=20)
+    assert [j.id for j in batch] == [j.id for j in jobs]
+    assert collect_batch(conn, [queue], batch_size=8, max_wait_ms=0) == []
+
+
+def test_one_failing_note_does_not_fail_its_batch_neighbours(monkeypatch):
+    ids = _make_notes("batch-fallback@example.com", ["good one", "bad", "good two"])
+    real = worker_jobs._summarize_batch_with_retry
+
+    def fail_on_bad(texts):
+        if "bad" in texts:
+            raise RuntimeError("model choked")
+        return real(texts)
+
+    monkeypatch.setattr(worker_jobs, "_summarize_batch_with_retry", fail_on_bad)
+    events = []
+    monkeypatch.setattr(worker_jobs, "publish_note_events", lambda _r, notes: events.extend((n.id, n.status) for n in notes))
+    conn = fakeredis.FakeStrictRedis()
+    queue = Queue("fallback_test", connection=conn)
+    jobs = [queue.enqueue(SUMMARIZE_FUNC_NAME, i) for i in ids]
+
+    process_batch(conn, collect_batch(conn, [queue], batch_size=8, max_wait_ms=0))
+
+    assert [j.get_status(refresh=True) for j in jobs] == ["finished", "failed", "finished"]
+    with SessionLocal() as db:
+        status = {n.id: n.status for n in db.query(models.Note).filter(models.Note.id.in_(ids))}
+    assert [status[i] for i in ids] == ["done", "failed", "done"]
+    # each note's final status is published once, after its own attempt
+    assert [e for e in events if e[1] != "processing"] == list(zip(ids, ["done", "failed", "done"]))
+
+
+def test_jobs_of_a_dead_batch_worker_are_requeued():
+    ids = _make_notes("batch-reaper@example.com", ["lost one", "lost two"])
+    conn = fakeredis.FakeStrictRedis()
+    queue = Queue("reaper_test", connection=conn)
+    jobs = [queue.enqueue(SUMMARIZE_FUNC_NAME, i) for i in ids]
+    registry = StartedJobRegistry(queue=queue)
+
+    collect_batch(conn, [queue], batch_size=8, max_wait_ms=0)  # ...and the worker dies here
+    assert queue.count == 0 and set(registry.get_job_ids()) == {j.id for j in jobs}
+    assert requeue_abandoned(conn, [queue]) == 0  # still within the lease
+
+    conn.zadd(registry.key, {j.id: i + 1 for i, j in enumerate(jobs)})  # leases ran out, oldest first
+    assert requeue_abandoned(conn, [queue]) == 2
+    assert queue.job_ids == [j.id for j in jobs] and registry.count == 0
+
+    process_batch(conn, collect_batch(conn, [queue], batch_size=8, max_wait_ms=0))
+    assert registry.count == 0
+    assert [j.get_status(refresh=True) for j in jobs] == ["finished", "finished"]
@@ -0,0 +1,34 @@
+# tests/test_worker_pool.py
+import sys
+import time
+
+from app.worker_pool import Supervisor, thread_budget
+
+
+def _exit_immediately(index: int) -> None:
+    sys.exit(3)
+
+
+def test_thread_budget_splits_cores_between_workers(monkeypatch):
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    assert thread_budget(4) == 2
+    assert thread_budget(16) == 1
+    assert thread_budget(4, override=3) == 3
+
+
+def test_supervisor_restarts_dead_children():
+    sup = Supervisor(_exit_immediately, concurrency=1)
+    sup.start()
+    try:
+        deadline = time.monotonic() + 20
+        slowest = 0.0
+        while sup.restarts < 2 and time.monotonic() < deadline:
+            time.sleep(0.1)
+            started = time.monotonic()
+            sup.check()
+            slowest = max(slowest, time.monotonic() - started)
+        assert sup.restarts >= 2
+        assert slowest < 0.9  # the 1s second backoff is waited out between checks, not inside one
+    finally:
+        sup.stop()
+    assert sup.alive() == 0